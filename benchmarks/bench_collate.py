@@ -0,0 +1,89 @@
+"""Benchmark throughput of collating ``TrajectoryDataset`` batches.
+
+Compares :func:`~traja.datasets.dataset.seq_collate` with
+:class:`~traja.datasets.dataset.SeqCollator` in batches per second, both
+collating items fetched beforehand and through a ``DataLoader``. ``SeqCollator``
+concatenates items into reused buffers, or, given the dataset (``gather``),
+gathers batches of sequence indices from its tensors.
+
+Usage::
+
+    python benchmarks/bench_collate.py --batch-size 128
+
+"""
+import argparse
+import time
+
+import numpy as np
+import torch
+from torch.utils.data import DataLoader
+
+from traja.datasets.dataset import SeqCollator, seq_collate, sequence_arrays
+
+
+class ArrayDataset:
+    """Items of ``TrajectoryDataset`` from synthetic sequences of 2 to 60 pedestrians."""
+
+    def __init__(self, num_seq, obs_len=8, pred_len=12, seed=0):
+        rng = np.random.default_rng(seed)
+        num_peds = rng.integers(2, 60, num_seq)
+        seqs = rng.standard_normal((num_peds.sum(), 2, obs_len + pred_len))
+        arrays = sequence_arrays(seqs.cumsum(axis=2), num_peds, obs_len, 0.002)
+        self.names = list(arrays)[:-1]
+        for name in self.names:
+            setattr(self, name, torch.from_numpy(arrays[name]))
+        self.seq_start_end = arrays["seq_start_end"].tolist()
+
+    def __len__(self):
+        return len(self.seq_start_end)
+
+    def __getitem__(self, index):
+        start, end = self.seq_start_end[index]
+        return [getattr(self, name)[start:end] for name in self.names]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sequences", type=int, default=20_000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--num-workers", type=int, default=0)
+    args = parser.parse_args()
+
+    dataset = ArrayDataset(args.sequences)
+    order = np.random.default_rng(0).permutation(len(dataset))
+    indices = [
+        order[start : start + args.batch_size].tolist()
+        for start in range(0, len(order), args.batch_size)
+    ]
+    items = [[dataset[i] for i in batch] for batch in indices]
+    collators = {
+        "seq_collate": (seq_collate, dataset, items),
+        "SeqCollator": (SeqCollator(), dataset, items),
+        "gather": (SeqCollator(dataset), range(len(dataset)), indices),
+    }
+    for name, (collate, source, batches) in collators.items():
+        for out, expected in zip(collate(batches[0]), seq_collate(items[0])):
+            assert torch.equal(out, expected) and out.shape == expected.shape
+
+        start = time.perf_counter()
+        for batch in batches:
+            collate(batch)
+        elapsed = time.perf_counter() - start
+        print(f"{name:>12}: {len(batches) / elapsed:.0f} batches/s collating")
+
+        loader = DataLoader(
+            source,
+            batch_size=args.batch_size,
+            shuffle=True,
+            num_workers=args.num_workers,
+            collate_fn=collate,
+        )
+        start = time.perf_counter()
+        for batch in loader:
+            pass
+        elapsed = time.perf_counter() - start
+        print(f"{name:>12}: {len(loader) / elapsed:.0f} batches/s from DataLoader")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Benchmark construction time of ``traja.datasets.dataset.TrajectoryDataset``.
+
+Writes synthetic pedestrian datasets in the ETH/UCY format, <frame_id> <ped_id>
+<x> <y>, and times building sequences with the previous per-frame and
+per-pedestrian loops (``legacy``) and with the sorted windowing of
+``seq_windows``, and loading from a warm ``cache_dir``.
+
+Usage::
+
+    python benchmarks/bench_dataset.py --frames 2000 --peds 1000 --files 8 --n-jobs -1
+
+"""
+import argparse
+import math
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from traja.datasets.dataset import TrajectoryDataset, poly_fit, read_file
+
+
+def legacy(data_dir, obs_len=8, pred_len=12, skip=1, threshold=0.002, min_ped=1):
+    """Sequences as built by the previous ``TrajectoryDataset.__init__``."""
+    seq_len = obs_len + pred_len
+    num_peds_in_seq = []
+    seq_list = []
+    non_linear_ped = []
+    for path in [os.path.join(data_dir, p) for p in os.listdir(data_dir)]:
+        data = read_file(path, "\t")
+        frames = np.unique(data[:, 0]).tolist()
+        frame_data = []
+        for frame in frames:
+            frame_data.append(data[frame == data[:, 0], :])
+        num_sequences = int(math.ceil((len(frames) - seq_len + 1) / skip))
+        for idx in range(0, num_sequences * skip + 1, skip):
+            curr_seq_data = np.concatenate(frame_data[idx : idx + seq_len], axis=0)
+            peds_in_curr_seq = np.unique(curr_seq_data[:, 1])
+            curr_seq = np.zeros((len(peds_in_curr_seq), 2, seq_len))
+            num_peds_considered = 0
+            _non_linear_ped = []
+            for ped_id in peds_in_curr_seq:
+                curr_ped_seq = curr_seq_data[curr_seq_data[:, 1] == ped_id, :]
+                curr_ped_seq = np.around(curr_ped_seq, decimals=4)
+                pad_front = frames.index(curr_ped_seq[0, 0]) - idx
+                pad_end = frames.index(curr_ped_seq[-1, 0]) - idx + 1
+                if pad_end - pad_front != seq_len:
+                    continue
+                curr_ped_seq = np.transpose(curr_ped_seq[:, 2:])
+                curr_seq[num_peds_considered, :, pad_front:pad_end] = curr_ped_seq
+                _non_linear_ped.append(poly_fit(curr_ped_seq, pred_len, threshold))
+                num_peds_considered += 1
+            if num_peds_considered > min_ped:
+                non_linear_ped += _non_linear_ped
+                num_peds_in_seq.append(num_peds_considered)
+                seq_list.append(curr_seq[:num_peds_considered])
+    return np.concatenate(seq_list), num_peds_in_seq
+
+
+def generate(path: str, n_frames: int, n_peds: int, seed: int = 0):
+    """Writes pedestrians walking through the scene for 20 to 100 frames."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for ped in range(n_peds):
+        duration = rng.integers(20, 100)
+        enter = rng.integers(0, max(n_frames - duration, 1))
+        frames = np.arange(enter, min(enter + duration, n_frames)) * 10.0
+        xy = rng.normal(0, 0.1, (len(frames), 2)).cumsum(axis=0)
+        rows.append(np.column_stack([frames, np.full(len(frames), ped), xy]))
+    data = np.concatenate(rows)
+    data = data[np.argsort(data[:, 0], kind="stable")]
+    np.savetxt(path, data, fmt=["%.1f", "%.1f", "%.4f", "%.4f"], delimiter="\t")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=1000)
+    parser.add_argument("--peds", type=int, default=500)
+    parser.add_argument("--files", type=int, default=2)
+    parser.add_argument("--n-jobs", type=int, default=1)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        for i in range(args.files):
+            generate(os.path.join(data_dir, f"{i}.txt"), args.frames, args.peds, i)
+
+        start = time.perf_counter()
+        dataset = TrajectoryDataset(data_dir, n_jobs=args.n_jobs)
+        elapsed = time.perf_counter() - start
+        print(f"TrajectoryDataset: {elapsed:.2f}s, {len(dataset)} sequences")
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            for label in ["cold cache", "warm cache"]:
+                start = time.perf_counter()
+                TrajectoryDataset(data_dir, cache_dir=cache_dir)
+                print(f"{label:>17}: {time.perf_counter() - start:.3f}s")
+
+        if not args.skip_legacy:
+            start = time.perf_counter()
+            seqs, num_peds_in_seq = legacy(data_dir)
+            elapsed_legacy = time.perf_counter() - start
+            print(
+                f"           legacy: {elapsed_legacy:.2f}s, {len(num_peds_in_seq)} "
+                f"sequences ({elapsed_legacy / elapsed:.0f}x slower)"
+            )
+            assert np.allclose(seqs[:, :, :8], dataset.obs_traj.numpy(), atol=1e-4)
+
+
+if __name__ == "__main__":
+    main()
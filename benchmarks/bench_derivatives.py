@@ -0,0 +1,99 @@
+"""Benchmark peak memory of ``traja.get_derivatives``.
+
+Each measurement runs in a fresh interpreter, which builds a trajectory of
+``--rows`` rows and reports the growth of its peak resident set size (RSS)
+while calculating derivatives. ``legacy`` is the previous implementation,
+which merged intermediate dataframes.
+
+Usage::
+
+    python benchmarks/bench_derivatives.py --rows 10000000
+
+"""
+import argparse
+import subprocess
+import sys
+
+SETUP = """
+import resource, sys, time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import traja
+
+def legacy(trj):
+    derivs = traja.calc_derivatives(trj)
+    d = derivs["displacement"]
+    t = derivs["displacement_time"]
+    v = d[1 : len(d)] / t.diff()
+    vt = t[1 : len(t)].rename("speed_times")
+    a = v.diff() / vt.diff().rename("acceleration")
+    at = vt[1 : len(vt)].rename("accleration_times")
+    data = dict(speed=v, speed_times=vt, acceleration=a, acceleration_times=at)
+    derivs = derivs.merge(pd.DataFrame(data), left_index=True, right_index=True)
+    return derivs.replace([np.inf, -np.inf], np.nan)
+
+rng = np.random.default_rng(0)
+n = int(sys.argv[1])
+trj = traja.TrajaDataFrame(
+    {
+        "x": rng.standard_normal(n).cumsum(),
+        "y": rng.standard_normal(n).cumsum(),
+        "time": np.arange(n) * 0.02,
+    }
+)
+"""
+
+RUN = {
+    "legacy": "legacy(trj)",
+    "float64": "traja.get_derivatives(trj)",
+    "float32": "traja.get_derivatives(trj, dtype=np.float32)",
+}
+
+MEASURE = """
+scale = 1024 if sys.platform != "darwin" else 1
+try:
+    # Current, rather than peak, RSS excludes temporaries of the setup
+    with open("/proc/self/statm") as f:
+        before = int(f.read().split()[1]) * resource.getpagesize() / scale
+except OSError:
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+derivs = {run}
+elapsed = time.perf_counter() - start
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print((peak - before) * scale / 2 ** 20, elapsed)
+"""
+
+
+def measure(name: str, rows: int):
+    code = SETUP + MEASURE.format(run=RUN[name])
+    out = subprocess.run(
+        [sys.executable, "-c", code, str(rows)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    peak, elapsed = map(float, out.stdout.strip().splitlines()[-1].split())
+    return peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument(
+        "--run", nargs="+", choices=sorted(RUN), default=["legacy", "float64", "float32"]
+    )
+    args = parser.parse_args()
+
+    output = args.rows * 6 * 8 / 2 ** 20
+    print(f"get_derivatives, {args.rows} rows ({output:.0f} MiB float64 output)")
+    for name in args.run:
+        peak, elapsed = measure(name, args.rows)
+        print(f"{name:>8}: peak RSS +{peak:.0f} MiB, {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Benchmark ``import traja`` time in fresh interpreters.
+
+Usage::
+
+    python benchmarks/bench_import.py --repeat 10 --max-seconds 1.0
+
+Exits with a non-zero status if the median import time exceeds
+``--max-seconds``, so it can be used as a regression guard in CI.
+
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+CODE = "import time; t = time.perf_counter(); import traja; print(time.perf_counter() - t)"
+
+
+def import_time() -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", CODE], capture_output=True, text=True, check=True
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--max-seconds", type=float, default=None)
+    args = parser.parse_args()
+
+    times = [import_time() for _ in range(args.repeat)]
+    median = statistics.median(times)
+    print(
+        f"import traja: median {median:.3f}s, min {min(times):.3f}s, "
+        f"max {max(times):.3f}s ({args.repeat} runs)"
+    )
+    if args.max_seconds is not None and median > args.max_seconds:
+        print(f"Import time regression: {median:.3f}s > {args.max_seconds:.3f}s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
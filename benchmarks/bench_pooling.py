@@ -0,0 +1,62 @@
+"""Benchmark forward and backward passes of the pooling modules of ``traja.models.nn``.
+
+Batches hold ``--seqs`` sequences of 2 to ``--max-peds`` pedestrians. Each module
+pools the sequences of a batch in turn (``loop``) or all at once (``batched``), in
+evaluation mode, or with ``--train`` in training mode, where batch normalization uses
+the statistics of each sequence.
+
+Usage::
+
+    python benchmarks/bench_pooling.py --seqs 256 --train
+
+"""
+import argparse
+import time
+
+import torch
+
+from traja.models.nn import PoolHiddenNet, SocialPooling
+
+MODULES = {
+    "PoolHiddenNet": lambda h_dim: PoolHiddenNet(
+        embedding_dim=16, h_dim=h_dim, bottleneck_dim=64
+    ),
+    "SocialPooling": lambda h_dim: SocialPooling(h_dim=h_dim, grid_size=8),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seqs", type=int, default=256)
+    parser.add_argument("--max-peds", type=int, default=20)
+    parser.add_argument("--h-dim", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--module", nargs="+", choices=sorted(MODULES), default=list(MODULES))
+    parser.add_argument("--train", action="store_true")
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    seq_peds = torch.randint(2, args.max_peds + 1, (args.seqs,))
+    ends = torch.cumsum(seq_peds, 0)
+    seq_start_end = torch.stack([ends - seq_peds, ends], dim=1)
+    num_peds = int(ends[-1])
+    h_states = torch.randn(1, num_peds, args.h_dim, requires_grad=True)
+    end_pos = torch.randn(num_peds, 2) * 2
+    print(f"{args.seqs} sequences, {num_peds} pedestrians")
+
+    for name in args.module:
+        module = MODULES[name](args.h_dim).train(args.train)
+        for mode, forward in [
+            ("loop", module._forward_sequences),
+            ("batched", module.forward),
+        ]:
+            times = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                forward(h_states, seq_start_end, end_pos).sum().backward()
+                times.append(time.perf_counter() - start)
+            print(f"{name:>14} {mode:>7}: {min(times) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Benchmark memory, throughput and accuracy of float32 and float64 calculations.
+
+Each precision runs in a fresh interpreter with :func:`traja.use_dtype`, and
+reports the growth of peak resident set size (RSS) and the time of
+kinematics (``get_derivatives``), gridding (``grid_coordinates``) and
+rediscretization (``rediscretize_points``) on a trajectory of ``--rows`` rows.
+float32 results are compared with float64.
+
+Usage::
+
+    python benchmarks/bench_precision.py --rows 10000000
+
+"""
+import argparse
+import subprocess
+import sys
+
+CODE = """
+import resource, sys, time
+
+import numpy as np
+
+import traja
+
+n, dtype, task, out = int(sys.argv[1]), sys.argv[2], sys.argv[3], sys.argv[4]
+rng = np.random.default_rng(0)
+trj = traja.TrajaDataFrame(
+    {
+        # A random walk far from the origin, where float32 resolution is coarsest
+        "x": 1000 + rng.standard_normal(n).cumsum(),
+        "y": 1000 + rng.standard_normal(n).cumsum(),
+        "time": np.arange(n) * 0.02,
+    }
+)
+tasks = {
+    "get_derivatives": lambda: traja.get_derivatives(trj).to_numpy(),
+    "grid_coordinates": lambda: traja.grid_coordinates(trj, bins=(256, 256)).to_numpy(),
+    "rediscretize_points": lambda: traja.rediscretize_points(trj, R=2.0).to_numpy(),
+}
+
+scale = 1024 if sys.platform != "darwin" else 1
+try:
+    with open("/proc/self/statm") as f:
+        before = int(f.read().split()[1]) * resource.getpagesize() / scale
+except OSError:
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+with traja.use_dtype(np.dtype(dtype)):
+    start = time.perf_counter()
+    result = tasks[task]()
+    elapsed = time.perf_counter() - start
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+np.save(out, result.astype(float))
+print((peak - before) * scale / 2 ** 20, elapsed)
+"""
+
+TASKS = ["get_derivatives", "grid_coordinates", "rediscretize_points"]
+
+
+def measure(rows: int, dtype: str, task: str, out: str):
+    proc = subprocess.run(
+        [sys.executable, "-c", CODE, str(rows), dtype, task, out],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    peak, elapsed = map(float, proc.stdout.strip().splitlines()[-1].split())
+    return peak, elapsed
+
+
+def main():
+    import os
+    import tempfile
+
+    import numpy as np
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--task", nargs="+", choices=TASKS, default=TASKS)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for task in args.task:
+            results = {}
+            for dtype in ["float64", "float32"]:
+                out = os.path.join(tmp, f"{task}_{dtype}.npy")
+                peak, elapsed = measure(args.rows, dtype, task, out)
+                results[dtype] = np.load(out)
+                rate = args.rows / elapsed / 1e6
+                print(
+                    f"{task:>20} {dtype}: peak RSS +{peak:.0f} MiB, "
+                    f"{elapsed:.2f}s ({rate:.1f}M rows/s)"
+                )
+            expected, actual = results["float64"], results["float32"]
+            if expected.shape == actual.shape:
+                # Errors relative to the magnitude of each column, as relative errors
+                # of values close to zero, eg, acceleration, are meaningless
+                scale = np.nanmax(np.abs(expected), axis=0)
+                error = np.nanmax(np.abs(actual - expected) / scale)
+                changed = np.mean(~np.isclose(actual, expected, equal_nan=True))
+                print(
+                    f"{task:>20} max error {error:.1e} of column magnitude, "
+                    f"{changed:.2%} of values changed"
+                )
+            else:
+                # Rediscretization is path dependent, so compare path lengths
+                difference = abs(len(actual) - len(expected)) / len(expected)
+                print(f"{task:>20} number of steps differs by {difference:.1e}")
+
+
+if __name__ == "__main__":
+    main()
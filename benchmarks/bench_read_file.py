@@ -0,0 +1,68 @@
+"""Benchmark parsing throughput of ``traja.datasets.dataset.read_file``.
+
+Writes ``--lines`` lines in the ETH/UCY format, <frame_id> <ped_id> <x> <y>, and
+times the bulk parser against the previous line-by-line parser (``legacy``).
+
+Usage::
+
+    python benchmarks/bench_read_file.py --lines 10000000
+
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from traja.datasets.dataset import read_file
+
+
+def legacy(_path, delim="\t"):
+    """Rows as parsed by the previous ``read_file``."""
+    data = []
+    with open(_path, "r") as f:
+        for line in f:
+            line = line.strip().split(delim)
+            line = [float(i) for i in line]
+            data.append(line)
+    return np.asarray(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=2_000_000)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    n = args.lines
+    data = np.column_stack(
+        [
+            np.arange(n) // 20 * 10.0,
+            rng.integers(0, 1000, n),
+            rng.normal(0, 10, (n, 2)).round(8),
+        ]
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "peds.txt")
+        np.savetxt(path, data, fmt=["%.1f", "%.1f", "%.8f", "%.8f"], delimiter="\t")
+        size = os.path.getsize(path) / 2 ** 20
+        print(f"{n} lines, {size:.0f} MiB")
+
+        runs = {"read_file": read_file}
+        if not args.skip_legacy:
+            runs["legacy"] = legacy
+        for name, run in runs.items():
+            start = time.perf_counter()
+            parsed = run(path, "\t")
+            elapsed = time.perf_counter() - start
+            assert np.array_equal(parsed, data)
+            print(
+                f"{name:>9}: {elapsed:.2f}s, {n / elapsed / 1e6:.1f}M lines/s, "
+                f"{size / elapsed:.0f} MiB/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
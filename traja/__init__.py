@@ -1,15 +1,64 @@
-from . import models
-from . import datasets
+import importlib
+import logging
 
 from .accessor import TrajaAccessor
+from .config import get_dtype, set_dtype, use_dtype
 from .frame import TrajaDataFrame, TrajaCollection
 from .parsers import read_file, from_df
-from .plotting import *
 from .trajectory import *
 
-import logging
-
 __author__ = "justinshenk"
 __version__ = "0.2.3"
 
-logging.basicConfig(level=logging.INFO)
+logging.getLogger("traja").addHandler(logging.NullHandler())
+
+# Heavy subpackages (matplotlib, torch, ...) are imported on first access
+# to keep ``import traja`` fast for processes which only need kinematics.
+_LAZY_SUBMODULES = ("datasets", "models", "plotting")
+# Names of ``traja.plotting.__all__``, so other names do not import matplotlib
+_PLOTTING_EXPORTS = (
+    "_get_after_plot_args",
+    "_label_axes",
+    "_polar_bar",
+    "_process_after_plot_args",
+    "animate",
+    "bar_plot",
+    "color_dark",
+    "fill_ci",
+    "find_runs",
+    "plot",
+    "plot_3d",
+    "plot_actogram",
+    "plot_autocorrelation",
+    "plot_collection",
+    "plot_contour",
+    "plot_clustermap",
+    "plot_flow",
+    "plot_quiver",
+    "plot_periodogram",
+    "plot_stream",
+    "plot_surface",
+    "plot_transition_graph",
+    "plot_transition_matrix",
+    "plot_xy",
+    "polar_bar",
+    "predict",
+    "sans_serif",
+    "stylize_axes",
+    "trip_grid",
+)
+
+
+def __getattr__(name):
+    if name in _LAZY_SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    if name in _PLOTTING_EXPORTS:
+        plotting = importlib.import_module(".plotting", __name__)
+        attr = getattr(plotting, name)
+        globals()[name] = attr
+        return attr
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_SUBMODULES))
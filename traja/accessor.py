@@ -1,5 +1,6 @@
 from typing import Union
 
+import numpy as np
 import pandas as pd
 from pandas.api.types import is_datetime64_any_dtype
 
@@ -128,6 +129,64 @@ class TrajaAccessor(object):
         """
         return traja.trajectory.resample_time(self._obj, step_time=step_time)
 
+    def find_gaps(self, max_gap=None):
+        """Returns table of gaps, runs of rows with missing ``x`` or ``y``.
+
+        Args:
+          max_gap (int or str, optional): Longest gap to mark as fillable, as number of
+            rows or as duration, eg, ``"1s"``
+
+        Returns:
+          gaps (:class:`~pandas.DataFrame`): Table of gaps
+
+        """
+        id_col = getattr(self._obj, "_id_col", None)
+        if id_col not in self._obj:
+            id_col = None
+        return traja.trajectory.find_gaps(self._obj, id_col=id_col, max_gap=max_gap)
+
+    def fill_in_traj(self, method: str = "linear", max_gap=None):
+        """Returns trajectory with gaps of missing ``x`` and ``y`` filled in.
+
+        Trajectories of a :class:`~traja.frame.TrajaCollection` are filled separately.
+
+        Args:
+          method (str): ``"linear"``, ``"cubic"`` or ``"constant_velocity"``
+          max_gap (int or str, optional): Longest gap to fill, as number of rows or as
+            duration, eg, ``"1s"``
+
+        Returns:
+          trj (:class:`~traja.frame.TrajaDataFrame`): Trajectory
+
+        """
+        id_col = getattr(self._obj, "_id_col", None)
+        if id_col not in self._obj:
+            id_col = None
+        trj = traja.trajectory.fill_in_traj(
+            self._obj, method=method, max_gap=max_gap, id_col=id_col
+        )
+        self._transfer_metavars(trj)
+        return trj
+
+    def resample_interp(self, step_time, method: str = "linear"):
+        """Returns trajectory interpolated at consistent ``step_time`` intervals.
+
+        Trajectories of a :class:`~traja.frame.TrajaCollection` are resampled separately.
+
+        Args:
+           step_time (float or str): Step time
+           method (str): ``"linear"`` or ``"cubic"``
+
+        Returns:
+            trj (:class:`~traja.frame.TrajaDataFrame`): Dataframe resampled.
+        """
+        id_col = getattr(self._obj, "_id_col", None)
+        if id_col not in self._obj:
+            id_col = None
+        return traja.trajectory.resample_interp(
+            self._obj, step_time, method=method, id_col=id_col
+        )
+
     def rediscretize_points(self, R, **kwargs):
         """Rediscretize points"""
         return traja.trajectory.rediscretize_points(self, _obj, R=R, **kwargs)
@@ -199,10 +258,8 @@ class TrajaAccessor(object):
             collection (:class:`~matplotlib.collections.PathCollection`): collection that was plotted
 
         .. note::
-            Takes a while to plot large trajectories. Consider using first::
-            
-                rt = trj.traja.rediscretize(R=1.) # Replace R with appropriate step length
-                rt.traja.plot_3d()
+            Large trajectories are simplified to `max_segments` (default 5000)
+            segments before plotting, see :func:`traja.plotting.plot_3d`.
 
         """
         ax = traja.plotting.plot_3d(trj=self._obj, **kwargs)
@@ -311,23 +368,24 @@ class TrajaAccessor(object):
             self._obj = trj
         return derivs
 
-    def get_derivatives(self) -> pd.DataFrame:
+    def get_derivatives(self, dtype=None) -> pd.DataFrame:
         """Returns derivatives as DataFrame."""
-        derivs = traja.trajectory.get_derivatives(self._obj)
+        derivs = traja.trajectory.get_derivatives(self._obj, dtype=dtype)
         return derivs
 
     def speed_intervals(
         self,
-        faster_than: Union[float, int] = None,
-        slower_than: Union[float, int] = None,
+        faster_than: Union[float, int, np.ndarray] = None,
+        slower_than: Union[float, int, np.ndarray] = None,
     ):
         """Returns ``TrajaDataFrame`` with speed time intervals.
 
         Returns a dataframe of time intervals where speed is slower and/or faster than specified values.
+        Trajectories of a :class:`~traja.frame.TrajaCollection` are processed separately.
 
         Args:
-          faster_than (float, optional): Minimum speed threshold. (Default value = None)
-          slower_than (float or int, optional): Maximum speed threshold. (Default value = None)
+          faster_than (float or array-like, optional): Minimum speed threshold. (Default value = None)
+          slower_than (float or array-like, optional): Maximum speed threshold. (Default value = None)
 
         Returns:
           result (:class:`~pandas.DataFrame`) -- time intervals as dataframe
@@ -337,7 +395,12 @@ class TrajaAccessor(object):
             Implementation ported to Python, heavily inspired by Jim McLean's trajr package.
 
         """
-        result = traja.trajectory.speed_intervals(self._obj, faster_than, slower_than)
+        id_col = getattr(self._obj, "_id_col", None)
+        if id_col not in self._obj:
+            id_col = None
+        result = traja.trajectory.speed_intervals(
+            self._obj, faster_than, slower_than, id_col=id_col
+        )
         return result
 
     def to_shapely(self):
@@ -464,6 +527,63 @@ class TrajaAccessor(object):
         self._transfer_metavars(rt)
         return rt
 
+    def simplify(
+        self, epsilon: float = None, n_points: int = None, method: str = "rdp"
+    ):
+        """Simplify trajectory with the Ramer-Douglas-Peucker or Visvalingam-Whyatt algorithm.
+
+        Trajectories of a :class:`~traja.frame.TrajaCollection` are simplified separately.
+
+        Args:
+          epsilon (float, optional): Maximum distance between the original and the simplified path
+          n_points (int, optional): Maximum number of points kept per trajectory
+          method (str): ``"rdp"`` or ``"vw"``, see :func:`traja.trajectory.simplify`
+
+        Returns:
+          trj (:class:`traja.TrajaDataFrame`): simplified trajectory, with time and other
+            columns preserved
+
+        .. doctest::
+
+            >>> df = traja.TrajaDataFrame({'x':[0,1,2,3],'y':[0,0.1,0,0]})
+            >>> df.traja.simplify(0.5)
+               x    y
+            0  0  0.0
+            3  3  0.0
+
+        """
+        id_col = getattr(self._obj, "_id_col", None)
+        if id_col not in self._obj:
+            id_col = None
+        trj = traja.trajectory.simplify(
+            self._obj, epsilon, id_col=id_col, n_points=n_points, method=method
+        )
+        self._transfer_metavars(trj)
+        return trj
+
+    def rolling_features(self, window=100, step: int = 1, features=None, n_jobs=1):
+        """Returns features of rolling windows of the trajectory.
+
+        Trajectories of a :class:`~traja.frame.TrajaCollection` are processed separately.
+
+        Args:
+          window (int or str): Number of rows per window, or duration of windows (eg, ``"10s"``)
+          step (int): Number of rows between the starts of consecutive windows
+          features (tuple of str, optional): Features to compute, default is all, see
+            :func:`traja.trajectory.rolling_features`
+          n_jobs (int): Number of trajectories processed in parallel
+
+        Returns:
+          features (:class:`~pandas.DataFrame`): Features of each window
+
+        """
+        id_col = getattr(self._obj, "_id_col", None)
+        if id_col not in self._obj:
+            id_col = None
+        return traja.trajectory.rolling_features(
+            self._obj, window, step, features=features, id_col=id_col, n_jobs=n_jobs
+        )
+
     def grid_coordinates(self, **kwargs):
         return traja.grid_coordinates(self._obj, **kwargs)
 
@@ -0,0 +1,84 @@
+"""Global settings of traja.
+
+The floating point precision of calculations on very large trajectories can be lowered
+from the default ``float64`` to ``float32``, halving their memory use::
+
+    traja.set_dtype(np.float32)
+
+or only within a block::
+
+    with traja.use_dtype(np.float32):
+        derivs = traja.get_derivatives(df)
+
+The precision is honored by kinematics (:func:`~traja.trajectory.calc_displacement`,
+:func:`~traja.trajectory.calc_derivatives`, :func:`~traja.trajectory.get_derivatives`),
+gridding (:func:`~traja.trajectory.grid_coordinates`) and rediscretization
+(:func:`~traja.trajectory.rediscretize`), and by :func:`~traja.parsers.read_file` for
+float columns. The default, ``None``, keeps the behavior of each function unchanged.
+
+"""
+from contextlib import contextmanager
+from typing import Optional
+
+import numpy as np
+
+__all__ = ["get_dtype", "set_dtype", "use_dtype"]
+
+_dtype = None
+
+
+def get_dtype() -> Optional[np.dtype]:
+    """Returns the floating point type of calculations, or ``None`` for the defaults.
+
+    .. doctest::
+
+        >>> traja.get_dtype() is None
+        True
+
+    """
+    return _dtype
+
+
+def set_dtype(dtype=None):
+    """Sets the floating point type of calculations.
+
+    Args:
+      dtype (optional): ``np.float32`` or ``np.float64``, or ``None`` to restore the
+        default precision of each function
+
+    """
+    global _dtype
+    if dtype is not None:
+        dtype = np.dtype(dtype)
+        if dtype not in (np.float32, np.float64):
+            raise ValueError(f"dtype must be float32 or float64, got {dtype}")
+    _dtype = dtype
+
+
+@contextmanager
+def use_dtype(dtype=None):
+    """Context manager setting the floating point type of calculations within a block.
+
+    Args:
+      dtype (optional): ``np.float32`` or ``np.float64``
+
+    .. doctest::
+
+        >>> with traja.use_dtype(np.float32):
+        ...     traja.get_dtype()
+        dtype('float32')
+
+    """
+    previous = get_dtype()
+    set_dtype(dtype)
+    try:
+        yield
+    finally:
+        set_dtype(previous)
+
+
+def _float_dtype(dtype=None, default=np.float64) -> np.dtype:
+    """Returns `dtype`, else the configured floating point type, else `default`."""
+    if dtype is None:
+        dtype = _dtype if _dtype is not None else default
+    return np.dtype(dtype)
@@ -19,6 +19,7 @@ the following conditions:
 The above copyright notice and this permission notice shall be included
 in all copies or substantial portions of the Software.
 """
+import heapq
 from functools import partial
 from typing import Union, Callable
 
@@ -45,6 +46,58 @@ def pldist(point: np.ndarray, start: np.ndarray, end: np.ndarray):
     )
 
 
+def pldist_vec(points: np.ndarray, start: np.ndarray, end: np.ndarray):
+    """
+    Calculates the distances from all ``points`` to the lines given
+    by the points ``start`` and ``end`` at once.
+    :param points: an array of points
+    :type points: numpy array with shape ``(n,d)``
+    :param start: a point of the line, or one point per row of ``points``
+    :type start: numpy array with shape ``(d,)`` or ``(n,d)``
+    :param end: another point of the line, or one point per row of ``points``
+    :type end: numpy array with shape ``(d,)`` or ``(n,d)``
+    """
+    rel = points - start
+    direction = np.broadcast_to(end - start, rel.shape)
+    norm2 = np.einsum("ij,ij->i", direction, direction)
+    # Lines with coinciding ends fall back to the distance to ``start``
+    degenerate = norm2 == 0
+    t = np.einsum("ij,ij->i", rel, direction) / np.where(degenerate, 1, norm2)
+    perp = rel - t[:, None] * direction
+    return np.sqrt(np.einsum("ij,ij->i", perp, perp))
+
+
+def _segment_argmax(M, start_index, last_index, dist=pldist):
+    """Returns index and distance of the point farthest from segment
+    ``M[start_index]``, ``M[last_index]``."""
+    if last_index - start_index < 2:
+        return start_index, 0.0
+    if dist is pldist and M.shape[1] == 2:
+        # Planar fast path: rank by cross product, normalize only the maximum
+        (x0, y0), (x1, y1) = M[start_index], M[last_index]
+        dx, dy = x1 - x0, y1 - y0
+        inner = M[start_index + 1 : last_index]
+        norm = np.hypot(dx, dy)
+        if norm == 0:
+            dists = np.hypot(inner[:, 0] - x0, inner[:, 1] - y0)
+        else:
+            dists = np.abs(dx * (inner[:, 1] - y0) - dy * (inner[:, 0] - x0))
+        offset = int(np.argmax(dists))
+        dmax = dists[offset] / norm if norm else dists[offset]
+        return start_index + 1 + offset, dmax
+    if dist is pldist:
+        dists = pldist_vec(M[start_index + 1 : last_index], M[start_index], M[last_index])
+    else:
+        dists = np.array(
+            [
+                dist(M[i], M[start_index], M[last_index])
+                for i in range(start_index + 1, last_index)
+            ]
+        )
+    offset = int(np.argmax(dists))
+    return start_index + 1 + offset, dists[offset]
+
+
 def rdp_rec(M, epsilon, dist=pldist):
     """
     Simplifies a given array of points.
@@ -56,15 +109,7 @@ def rdp_rec(M, epsilon, dist=pldist):
     :param dist: distance function
     :type dist: function with signature ``f(point, start, end)`` -- see :func:`rdp.pldist`
     """
-    dmax = 0.0
-    index = -1
-
-    for i in range(1, M.shape[0]):
-        d = dist(M[i], M[0], M[-1])
-
-        if d > dmax:
-            index = i
-            dmax = d
+    index, dmax = _segment_argmax(M, 0, M.shape[0] - 1, dist)
 
     if dmax > epsilon:
         r1 = rdp_rec(M[: index + 1], epsilon, dist)
@@ -75,7 +120,7 @@ def rdp_rec(M, epsilon, dist=pldist):
         return np.vstack((M[0], M[-1]))
 
 
-def _rdp_iter(M, start_index, last_index, epsilon, dist=pldist):
+def _rdp_iter_custom(M, start_index, last_index, epsilon, dist):
     stk = []
     stk.append([start_index, last_index])
     global_start_index = start_index
@@ -84,26 +129,116 @@ def _rdp_iter(M, start_index, last_index, epsilon, dist=pldist):
     while stk:
         start_index, last_index = stk.pop()
 
-        dmax = 0.0
-        index = start_index
-
-        for i in range(index + 1, last_index):
-            if indices[i - global_start_index]:
-                d = dist(M[i], M[start_index], M[last_index])
-                if d > dmax:
-                    index = i
-                    dmax = d
+        index, dmax = _segment_argmax(M, start_index, last_index, dist)
 
         if dmax > epsilon:
             stk.append([start_index, index])
             stk.append([index, last_index])
         else:
-            for i in range(start_index + 1, last_index):
-                indices[i - global_start_index] = False
+            indices[
+                start_index + 1 - global_start_index : last_index - global_start_index
+            ] = False
+
+    return indices
+
+
+def _rdp_segments(M, starts, ends, epsilon):
+    """Returns mask of points to keep when simplifying each of the disjoint
+    segments ``M[starts[i]:ends[i] + 1]`` independently."""
+    M = np.asarray(M, dtype=float)
+    indices = np.zeros(len(M), dtype=bool)
+    starts = np.asarray(starts, dtype=int)
+    ends = np.asarray(ends, dtype=int)
+    indices[starts] = True
+    indices[ends] = True
+
+    # All segments of one refinement level are searched together: distances
+    # of every inner point to its own segment are computed in a single pass
+    # and reduced per segment.
+    while len(starts):
+        lengths = ends - starts - 1
+        has_inner = lengths > 0
+        starts, ends, lengths = starts[has_inner], ends[has_inner], lengths[has_inner]
+        if not len(starts):
+            break
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        segment = np.repeat(np.arange(len(starts)), lengths)
+        inner = starts[segment] + 1 + np.arange(lengths.sum()) - offsets[segment]
+
+        dists = pldist_vec(M[inner], M[starts[segment]], M[ends[segment]])
+        dmax = np.maximum.reduceat(dists, offsets)
+        # First point reaching the maximum, as in the sequential search
+        candidates = np.where(dists == dmax[segment], np.arange(len(dists)), len(dists))
+        index = inner[np.minimum.reduceat(candidates, offsets)]
+
+        split = dmax > epsilon
+        index = index[split]
+        indices[index] = True
+        starts, ends = (
+            np.concatenate((starts[split], index)),
+            np.concatenate((index, ends[split])),
+        )
 
     return indices
 
 
+def _rdp_iter(M, start_index, last_index, epsilon, dist=pldist):
+    if dist is not pldist:
+        return _rdp_iter_custom(M, start_index, last_index, epsilon, dist)
+    M = np.asarray(M)[start_index : last_index + 1]
+    return _rdp_segments(M, [0], [len(M) - 1], epsilon)
+
+
+def rdp_n_points(
+    M: Union[list, np.ndarray],
+    n_points: int,
+    epsilon: float = 0,
+    dist: Callable = pldist,
+    return_mask: bool = False,
+):
+    """
+    Simplifies a given array of points to at most ``n_points`` points.
+    The segment with the farthest point is always split first, so the
+    result is the best ``n_points`` approximation reachable by the
+    Ramer-Douglas-Peucker refinement. Splitting also stops once no point
+    is farther than ``epsilon`` from the simplified line.
+    :param M: an array
+    :type M: numpy array
+    :param n_points: maximum number of points to keep (at least 2)
+    :type n_points: int
+    :param epsilon: epsilon in the rdp algorithm
+    :type epsilon: float
+    :param dist: distance function
+    :type dist: function with signature ``f(point, start, end)`` -- see :func:`rdp.pldist`
+    :param return_mask: return the mask of points to keep instead
+    :type return_mask: bool
+    """
+    M = np.asarray(M)
+    mask = np.zeros(len(M), dtype=bool)
+    if len(M):
+        mask[[0, -1]] = True
+
+    heap = []
+
+    def push(start_index, last_index):
+        index, dmax = _segment_argmax(M, start_index, last_index, dist)
+        if dmax > epsilon:
+            heapq.heappush(heap, (-dmax, start_index, last_index, index))
+
+    push(0, len(M) - 1)
+    kept = mask.sum()
+    while heap and kept < n_points:
+        _, start_index, last_index, index = heapq.heappop(heap)
+        mask[index] = True
+        kept += 1
+        push(start_index, index)
+        push(index, last_index)
+
+    if return_mask:
+        return mask
+    return M[mask]
+
+
 def rdp_iter(
     M: Union[list, np.ndarray],
     epsilon: float,
@@ -140,6 +275,7 @@ def rdp(
     dist: Callable = pldist,
     algo: str = "iter",
     return_mask: bool = False,
+    n_points: int = None,
 ):
     """
     Simplifies a given array of points using the Ramer-Douglas-Peucker
@@ -180,12 +316,20 @@ def rdp(
     :type algo: string
     :param return_mask: return mask instead of simplified array
     :type return_mask: bool
+    :param n_points: keep at most ``n_points`` points, see :func:`rdp.rdp_n_points`
+    :type n_points: int
 
     .. note::
         Yanked from Fabian Hirschmann's PyPI package ``rdp``.
 
     """
 
+    if n_points is not None:
+        algo = partial(rdp_n_points, n_points=n_points, return_mask=return_mask)
+        if "numpy" in str(type(M)):
+            return algo(M, epsilon=epsilon, dist=dist)
+        return algo(np.array(M), epsilon=epsilon, dist=dist).tolist()
+
     if algo == "iter":
         algo = partial(rdp_iter, return_mask=return_mask)
     elif algo == "rec":
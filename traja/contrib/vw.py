@@ -0,0 +1,122 @@
+"""
+vw
+~~
+Visvalingam-Whyatt line simplification.
+
+Points are removed in order of increasing effective area, the area of the
+triangle a point forms with its current neighbours, using a heap so that
+simplification runs in O(n log n).
+
+**Reference**: Visvalingam, M., & Whyatt, J. D. (1993). Line generalisation
+by repeated elimination of points. The Cartographic Journal, 30(1), 46-51.
+"""
+import heapq
+from typing import Union
+
+import numpy as np
+
+
+def triangle_areas(M: np.ndarray):
+    """
+    Calculates the area of the triangles formed by each inner point of
+    ``M`` with its neighbours.
+    :param M: an array of 2D points
+    :type M: numpy array with shape ``(n,2)``
+    """
+    a, b, c = M[:-2], M[1:-1], M[2:]
+    return 0.5 * np.abs(
+        (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1])
+        - (c[:, 0] - a[:, 0]) * (b[:, 1] - a[:, 1])
+    )
+
+
+def vw_mask(M: np.ndarray, epsilon: float = None, n_points: int = None):
+    """
+    Returns the mask of points kept by Visvalingam-Whyatt simplification.
+    Points are removed while their effective area is smaller than
+    ``epsilon`` or while more than ``n_points`` points are left.
+    :param M: an array of 2D points
+    :type M: numpy array with shape ``(n,2)``
+    :param epsilon: minimum effective area of kept points
+    :type epsilon: float
+    :param n_points: maximum number of points to keep (at least 2)
+    :type n_points: int
+    """
+    if epsilon is None and n_points is None:
+        raise ValueError("At least one of epsilon and n_points must be provided.")
+    M = np.asarray(M, dtype=float)
+    if M.ndim != 2 or M.shape[1] != 2:
+        raise ValueError(f"Expected an N x 2 array of points, got shape {M.shape}")
+    n = len(M)
+    mask = np.ones(n, dtype=bool)
+    if n <= 2:
+        return mask
+
+    xs = M[:, 0].tolist()
+    ys = M[:, 1].tolist()
+    prev = list(range(-1, n - 1))
+    nxt = list(range(1, n + 1))
+    areas = [np.inf] + triangle_areas(M).tolist() + [np.inf]
+    heap = [(area, i) for i, area in enumerate(areas[1:-1], 1)]
+    heapq.heapify(heap)
+
+    remaining = n
+    while heap:
+        area, i = heapq.heappop(heap)
+        if not mask[i] or area != areas[i]:
+            # Stale entry of a removed point or of an updated area
+            continue
+        must_remove = n_points is not None and remaining > n_points
+        may_remove = epsilon is not None and area < epsilon
+        if not (must_remove or may_remove):
+            break
+        mask[i] = False
+        remaining -= 1
+
+        p, q = prev[i], nxt[i]
+        nxt[p] = q
+        prev[q] = p
+        for j in (p, q):
+            if j == 0 or j == n - 1:
+                continue
+            a, c = prev[j], nxt[j]
+            new_area = 0.5 * abs(
+                (xs[j] - xs[a]) * (ys[c] - ys[a]) - (xs[c] - xs[a]) * (ys[j] - ys[a])
+            )
+            # Effective areas never decrease, so removal order stays consistent
+            areas[j] = max(new_area, area)
+            heapq.heappush(heap, (areas[j], j))
+
+    return mask
+
+
+def vw(
+    M: Union[list, np.ndarray],
+    epsilon: float = None,
+    n_points: int = None,
+    return_mask: bool = False,
+):
+    """
+    Simplifies a given array of points using the Visvalingam-Whyatt
+    algorithm.
+    Example:
+    >>> from traja.contrib.vw import vw
+    >>> vw([[0, 0], [1, 0.1], [2, 0], [3, 3]], n_points=3)
+    [[0.0, 0.0], [2.0, 0.0], [3.0, 3.0]]
+    :param M: a series of points
+    :type M: numpy array with shape ``(n,2)``
+    :param epsilon: minimum effective area of kept points
+    :type epsilon: float
+    :param n_points: maximum number of points to keep (at least 2)
+    :type n_points: int
+    :param return_mask: return mask instead of simplified array
+    :type return_mask: bool
+    """
+    is_array = isinstance(M, np.ndarray)
+    M = np.asarray(M, dtype=float)
+    mask = vw_mask(M, epsilon=epsilon, n_points=n_points)
+    if return_mask:
+        return mask
+    if is_array:
+        return M[mask]
+    return M[mask].tolist()
@@ -1,22 +1,75 @@
 from torch.utils.data import DataLoader
 
-from ..datasets.dataset import TrajectoryDataset, seq_collate
+from ..datasets.dataset import (
+    BucketBatchSampler,
+    SeqCollator,
+    TrajectoryDataset,
+    TrajectoryIterableDataset,
+    seq_collate,
+)
+
+
+class _EpochDataLoader(DataLoader):
+    """Sets the epoch of its dataset each time it is iterated.
+
+    Workers iterate copies of the dataset, so epochs advanced in workers are lost.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(_EpochDataLoader, self).__init__(*args, **kwargs)
+        self.epoch = 0
+
+    def __iter__(self):
+        self.dataset.set_epoch(self.epoch)
+        self.epoch += 1
+        return super(_EpochDataLoader, self).__iter__()
 
 
 def data_loader(args, path):
-    dset = TrajectoryDataset(
-        path,
-        obs_len=args.obs_len,
-        pred_len=args.pred_len,
-        skip=args.skip,
-        delim=args.delim,
-    )
+    if getattr(args, "streaming", False):
+        # Streamed sequences are shuffled in a buffer rather than by the loader
+        dset = TrajectoryIterableDataset(
+            path,
+            obs_len=args.obs_len,
+            pred_len=args.pred_len,
+            skip=args.skip,
+            delim=args.delim,
+            shuffle_buffer=getattr(args, "shuffle_buffer", 1024),
+        )
+        batching = dict(batch_size=args.batch_size, shuffle=False)
+        source, collate, loader_cls = dset, seq_collate, _EpochDataLoader
+    else:
+        dset = TrajectoryDataset(
+            path,
+            obs_len=args.obs_len,
+            pred_len=args.pred_len,
+            skip=args.skip,
+            delim=args.delim,
+            cache_dir=getattr(args, "cache_dir", None),
+            n_jobs=getattr(args, "n_jobs", 1),
+        )
+        max_cost = getattr(args, "max_ped_cost", None)
+        if max_cost is not None or getattr(args, "bucket_batches", False):
+            # Batches of sequences with similar numbers of pedestrians, either of
+            # `batch_size` sequences or within a budget of squared pedestrians
+            sampler = BucketBatchSampler.from_dataset(
+                dset,
+                batch_size=args.batch_size if max_cost is None else None,
+                max_cost=max_cost,
+            )
+            batching = dict(batch_sampler=sampler)
+        else:
+            batching = dict(batch_size=args.batch_size, shuffle=True)
+        source, collate, loader_cls = dset, seq_collate, DataLoader
+        if getattr(args, "gather_batches", False):
+            # Batches of indices are gathered from the tensors of the dataset
+            source = range(len(dset))
+            collate = SeqCollator(dset, pin_memory=getattr(args, "pin_memory", False))
 
-    loader = DataLoader(
-        dset,
-        batch_size=args.batch_size,
-        shuffle=True,
+    loader = loader_cls(
+        source,
         num_workers=args.loader_num_workers,
-        collate_fn=seq_collate,
+        collate_fn=collate,
+        **batching,
     )
     return dset, loader
@@ -1,11 +1,13 @@
 import subprocess
 import glob
 import os
+from functools import partial
 from typing import List
 
 import pandas as pd
 
 import traja
+from traja.parallel import map_jobs
 
 
 def load_ped_datasets() -> List[str]:
@@ -22,7 +24,11 @@ def load_ped_datasets() -> List[str]:
     return glob.glob(f"datasets/*/*")
 
 
-def load_ped_data(dataset_name=None, aspaths=False) -> dict:
+def _read_ped_file(path: str, names: List[str]) -> pd.DataFrame:
+    return pd.read_csv(path, sep="\t", names=names)
+
+
+def load_ped_data(dataset_name=None, aspaths=False, n_jobs=1) -> dict:
     """Returns pedestrian (ETH, Zara1, Zara2, Univ, Hotel) datasets as dataframe or as paths.
 
     Args:
@@ -33,6 +39,7 @@ def load_ped_data(dataset_name=None, aspaths=False) -> dict:
                         univ
                         hotel
         aspaths: (bool) - Returns paths only
+        n_jobs: (int) - Number of files read in parallel processes, ``-1`` for all CPUs
 
     Returns:
         paths/dfs (dict) - train/val/test split for paths or dfs, depending on `aspaths` value
@@ -50,19 +57,22 @@ def load_ped_data(dataset_name=None, aspaths=False) -> dict:
     val_dir = [path for path in paths if "val" in path][0]
     test_dir = [path for path in paths if "test" in path][0]
 
-    train_paths = glob.glob(os.path.join(train_dir, "*.txt"))
-    val_paths = glob.glob(os.path.join(val_dir, "*.txt"))
-    test_paths = glob.glob(os.path.join(test_dir, "*.txt"))
+    train_paths = sorted(glob.glob(os.path.join(train_dir, "*.txt")))
+    val_paths = sorted(glob.glob(os.path.join(val_dir, "*.txt")))
+    test_paths = sorted(glob.glob(os.path.join(test_dir, "*.txt")))
 
     paths = {"train": train_paths, "val": val_paths, "test": test_paths}
     if aspaths:
         return paths
 
+    # Every file is read once, in parallel across splits
     col_names = ["frame_id", "ped_id", "x", "y"]
+    all_paths = train_paths + val_paths + test_paths
+    read = partial(_read_ped_file, names=col_names)
+    frames = iter(map_jobs(read, all_paths, n_jobs, processes=True))
     dfs = {
-        "train": [pd.read_csv(path, sep="\t", names=col_names) for path in train_paths],
-        "val": [pd.read_csv(path, sep="\t", names=col_names) for path in train_paths],
-        "test": [pd.read_csv(path, sep="\t", names=col_names) for path in train_paths],
+        split: [next(frames) for _ in split_paths]
+        for split, split_paths in paths.items()
     }
     return dfs
 
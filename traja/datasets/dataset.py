@@ -2,17 +2,37 @@
 Modified from https://github.com/agrimgupta92/sgan/blob/master/sgan/data/trajectories.py.
 
 """
+import hashlib
+import itertools
 import logging
 import os
-import math
+import shutil
+import tempfile
+from functools import partial
 
 import numpy as np
+import pandas as pd
 
 import torch
-from torch.utils.data import Dataset
+from torch.utils.data import Dataset, IterableDataset, Sampler, get_worker_info
+
+from traja.parallel import map_jobs
 
 logger = logging.getLogger(__name__)
 
+# Bump when the preprocessing changes, so caches of older versions are rebuilt
+CACHE_VERSION = 1
+
+_ARRAYS = (
+    "obs_traj",
+    "pred_traj",
+    "obs_traj_rel",
+    "pred_traj_rel",
+    "non_linear_ped",
+    "loss_mask",
+    "seq_start_end",
+)
+
 
 def seq_collate(data):
     (
@@ -52,18 +72,129 @@ def seq_collate(data):
     return tuple(out)
 
 
+class SeqCollator:
+    """Collates batches like :func:`seq_collate` into preallocated, reused buffers.
+
+    Given a :class:`TrajectoryDataset`, batches are lists of sequence indices, and
+    the rows of their index ranges are gathered from the tensors of the dataset with
+    one ``index_select`` per tensor, skipping the slicing of every sequence by
+    ``__getitem__``::
+
+        collate = SeqCollator(dataset)
+        loader = DataLoader(range(len(dataset)), batch_size=64, collate_fn=collate)
+
+    Without a dataset, batches of items are concatenated into the buffers.
+
+    Buffers grow to the largest batch and are reused in a ring of `num_buffers`, so
+    a batch is only valid until `num_buffers` more batches are collated. In
+    ``DataLoader`` worker processes, whose batches are sent through shared memory,
+    new buffers are allocated for every batch.
+    """
+
+    def __init__(self, dataset=None, num_buffers=2, pin_memory=False):
+        """
+        Args:
+        - dataset: Optional :class:`TrajectoryDataset` whose sequences are gathered
+        by index
+        - num_buffers: Number of batches whose buffers are in use at the same time,
+        eg, 2 to copy a batch to the GPU while the next one is collated
+        - pin_memory: Allocate buffers in page-locked memory for faster copies to
+        CUDA devices, ignored without CUDA
+        """
+        self.tensors = None
+        if dataset is not None:
+            self.tensors = [getattr(dataset, name) for name in _ARRAYS[:-1]]
+            seq_start_end = torch.as_tensor(dataset.seq_start_end, dtype=torch.long)
+            self.starts = seq_start_end[:, 0]
+            self.lengths = seq_start_end[:, 1] - seq_start_end[:, 0]
+        self.num_buffers = num_buffers
+        self.pin_memory = pin_memory and torch.cuda.is_available()
+        self._buffers = [{} for _ in range(num_buffers)]
+        self._next = 0
+
+    def _buffer(self, buffers, key, shape, dtype):
+        """Returns a view of shape `shape` of a buffer, growing it if needed."""
+        buffer = buffers.get(key) if buffers is not None else None
+        if (
+            buffer is None
+            or len(buffer) < shape[0]
+            or buffer.shape[1:] != shape[1:]
+            or buffer.dtype != dtype
+        ):
+            # Grow geometrically, so buffers settle after a few batches
+            capacity = shape[0] if buffer is None else max(shape[0], 2 * len(buffer))
+            buffer = torch.empty(
+                (capacity, *shape[1:]), dtype=dtype, pin_memory=self.pin_memory
+            )
+            if buffers is not None:
+                buffers[key] = buffer
+        return buffer[: shape[0]]
+
+    def __call__(self, data):
+        if len(data) == 0:
+            raise ValueError("Cannot collate an empty batch")
+        buffers = None
+        if get_worker_info() is None:
+            buffers = self._buffers[self._next]
+            self._next = (self._next + 1) % self.num_buffers
+
+        if self.tensors is not None:
+            indices = torch.as_tensor(data, dtype=torch.long)
+            lengths = self.lengths[indices]
+        else:
+            columns = list(zip(*data))
+            lengths = torch.tensor([len(seq) for seq in columns[0]])
+        cum_end_idx = lengths.cumsum(0)
+        num_peds = int(cum_end_idx[-1])
+
+        if self.tensors is not None:
+            # Row i of the batch is row i + offset of its sequence in the dataset
+            offsets = self.starts[indices] - (cum_end_idx - lengths)
+            rows = torch.repeat_interleave(offsets, lengths, output_size=num_peds)
+            rows += torch.arange(num_peds)
+
+        out = []
+        for i in range(len(_ARRAYS) - 1):
+            if self.tensors is not None:
+                tensor = self.tensors[i]
+                shape = (num_peds, *tensor.shape[1:])
+                buffer = self._buffer(buffers, i, shape, tensor.dtype)
+                torch.index_select(tensor, 0, rows, out=buffer)
+            else:
+                seqs = columns[i]
+                shape = (num_peds, *seqs[0].shape[1:])
+                buffer = self._buffer(buffers, i, shape, seqs[0].dtype)
+                torch.cat(seqs, dim=0, out=buffer)
+            # Trajectories in LSTM input format: seq_len, batch, input_size
+            out.append(buffer.permute(2, 0, 1) if i < 4 else buffer)
+        seq_start_end = torch.stack([cum_end_idx - lengths, cum_end_idx], dim=1)
+        out.append(seq_start_end)
+        return tuple(out)
+
+
 def read_file(_path, delim="\t"):
-    data = []
+    """Returns the rows of a delimited file of numbers as a float64 array.
+
+    The file is parsed in bulk by the C engine of :func:`pandas.read_csv`. Values with
+    more than 15 significant digits may differ from ``float`` in the last bit.
+
+    Input:
+    - _path: Path of the file
+    - delim: Delimiter, or ``"tab"`` or ``"space"``. Whitespace delimiters also
+      ignore leading and trailing whitespace of lines
+    Output:
+    - Numpy array of shape (num_lines, num_columns)
+    """
     if delim == "tab":
         delim = "\t"
     elif delim == "space":
         delim = " "
-    with open(_path, "r") as f:
-        for line in f:
-            line = line.strip().split(delim)
-            line = [float(i) for i in line]
-            data.append(line)
-    return np.asarray(data)
+    sep = r"\s+" if delim.isspace() else delim
+    try:
+        df = pd.read_csv(_path, sep=sep, header=None, dtype=np.float64, engine="c")
+    except pd.errors.EmptyDataError:
+        return np.empty((0, 0))
+    return df.to_numpy()
 
 
 def poly_fit(traj, traj_len, threshold):
@@ -84,6 +215,182 @@ def poly_fit(traj, traj_len, threshold):
         return 0.0
 
 
+def poly_fit_batch(trajs, traj_len, threshold):
+    """Batched :func:`poly_fit`, with one least-squares projection for all trajectories.
+
+    Input:
+    - trajs: Numpy array of shape (num_trajs, 2, seq_len)
+    - traj_len: Len of trajectory
+    - threshold: Minimum error to be considered for non linear traj
+    Output:
+    - Numpy array of shape (num_trajs,): 1 -> Non Linear 0-> Linear
+    """
+    if traj_len <= 3:
+        # Quadratics fit exactly
+        return np.zeros(len(trajs))
+    t = np.linspace(0, traj_len - 1, traj_len)
+    A = np.vander(t, 3)
+    # Residuals of the least-squares fit are the part orthogonal to the columns of A
+    residual_maker = np.eye(traj_len) - A @ np.linalg.pinv(A)
+    residuals = trajs[:, :, -traj_len:] @ residual_maker
+    res = (residuals ** 2).sum(axis=(1, 2))
+    return (res >= threshold).astype(float)
+
+
+def seq_windows(data, seq_len, skip=1, min_ped=1):
+    """Returns sequences of pedestrians present throughout windows of `seq_len` frames.
+
+    Rows are sorted once by pedestrian and frame, so a pedestrian's sequence in a
+    window starting at one of its rows is the next `seq_len` rows.
+
+    Input:
+    - data: Numpy array of rows <frame_id> <ped_id> <x> <y>
+    - seq_len: Number of frames per window
+    - skip: Number of frames between the starts of windows
+    - min_ped: Windows need more than `min_ped` pedestrians
+    Output:
+    - seqs: Numpy array of shape (num_peds, 2, seq_len), ordered by window, then
+      pedestrian id
+    - num_peds_in_seq: Numpy array of number of pedestrians in each window
+    """
+    frame_pos = np.unique(data[:, 0], return_inverse=True)[1]
+    ped = data[:, 1]
+    order = np.lexsort((frame_pos, ped))
+    frame_pos, ped = frame_pos[order], ped[order]
+    xy = np.around(data[order, 2:4], decimals=4)
+
+    # Candidate first row of each pedestrian's sequence, and its last row
+    n = len(order)
+    start = np.arange(max(n - seq_len + 1, 0))
+    stop = start + seq_len - 1
+    new = np.ones(n + 1, dtype=bool)
+    new[1:n] = (ped[1:] != ped[:-1]) | (frame_pos[1:] != frame_pos[:-1])
+    # Number of rows followed by the next frame of the same pedestrian, before each row
+    steps = np.zeros(n, dtype=np.int64)
+    steps[1:] = np.cumsum((ped[1:] == ped[:-1]) & (np.diff(frame_pos) == 1))
+    valid = (
+        new[start]
+        # Every frame of the window once, and not beyond
+        & (steps[stop] - steps[start] == seq_len - 1)
+        & new[stop + 1]
+        & (frame_pos[start] % skip == 0)
+    )
+    start = start[valid]
+    window = frame_pos[start]
+    by_window = np.lexsort((ped[start], window))
+    start, window = start[by_window], window[by_window]
+
+    num_peds_in_seq = np.unique(window, return_counts=True)[1]
+    keep = num_peds_in_seq > min_ped
+    start = start[np.repeat(keep, num_peds_in_seq)]
+    seqs = xy[start[:, None] + np.arange(seq_len)]
+    return seqs.transpose(0, 2, 1), num_peds_in_seq[keep]
+
+
+def _data_files(data_dir):
+    """Returns the sorted paths of the dataset files in `data_dir`.
+
+    Directories, eg, a `cache_dir` inside `data_dir` and its entries, are skipped.
+    """
+    paths = [os.path.join(data_dir, _path) for _path in sorted(os.listdir(data_dir))]
+    return [_path for _path in paths if os.path.isfile(_path)]
+
+
+def _file_windows(path, delim, seq_len, skip, min_ped):
+    """Returns :func:`seq_windows` of the file at `path`."""
+    return seq_windows(read_file(path, delim), seq_len, skip, min_ped)
+
+
+def sequence_arrays(seq_list, num_peds_in_seq, obs_len, threshold):
+    """Returns the float32 arrays of :class:`TrajectoryDataset` for sequences, by name.
+
+    Input:
+    - seq_list: Numpy array of shape (num_peds, 2, seq_len) from :func:`seq_windows`
+    - num_peds_in_seq: Numpy array of number of pedestrians in each window
+    - obs_len: Number of time-steps in input trajectories
+    - threshold: Minimum error to be considered for non linear traj
+    Output:
+    - dict: obs_traj, pred_traj, obs_traj_rel, pred_traj_rel, non_linear_ped,
+      loss_mask and seq_start_end arrays
+    """
+    seq_len = seq_list.shape[2]
+    # Make coordinates relative
+    seq_list_rel = np.zeros(seq_list.shape)
+    seq_list_rel[:, :, 1:] = np.diff(seq_list, axis=2)
+    # Linear vs Non-Linear Trajectory
+    non_linear_ped = poly_fit_batch(seq_list, seq_len - obs_len, threshold)
+    loss_mask_list = np.ones((len(seq_list), seq_len))
+    cum_start_idx = np.concatenate([[0], np.cumsum(num_peds_in_seq)]).astype(np.int64)
+
+    def as_float(array):
+        return np.ascontiguousarray(array, dtype=np.float32)
+
+    return {
+        "obs_traj": as_float(seq_list[:, :, :obs_len]),
+        "pred_traj": as_float(seq_list[:, :, obs_len:]),
+        "obs_traj_rel": as_float(seq_list_rel[:, :, :obs_len]),
+        "pred_traj_rel": as_float(seq_list_rel[:, :, obs_len:]),
+        "non_linear_ped": as_float(non_linear_ped),
+        "loss_mask": as_float(loss_mask_list),
+        "seq_start_end": np.column_stack([cum_start_idx[:-1], cum_start_idx[1:]]),
+    }
+
+
+def cache_key(paths, **params):
+    """Returns a hex digest of the contents of `paths` and preprocessing `params`.
+
+    Input:
+    - paths: Dataset files
+    - params: Preprocessing arguments, eg, obs_len
+    Output:
+    - str: SHA-256 digest, changing with the file contents, `params` and
+      `CACHE_VERSION`
+    """
+    key = hashlib.sha256(f"traja-trajectories-v{CACHE_VERSION}".encode())
+    for path in sorted(paths):
+        file_hash = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                file_hash.update(block)
+        key.update(f"{os.path.basename(path)}:{file_hash.hexdigest()}".encode())
+    for name, value in sorted(params.items()):
+        key.update(f"{name}={value!r}".encode())
+    return key.hexdigest()
+
+
+def save_arrays(cache_dir, key, arrays):
+    """Writes `arrays` to ``<cache_dir>/<key>/<name>.npy`` atomically.
+
+    Arrays are written to a temporary directory, which is renamed once complete, so
+    concurrent readers never see partial caches. If another process wrote the same
+    key first, its cache is kept.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=f".{key}-", dir=cache_dir)
+    try:
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp, f"{name}.npy"), array)
+        os.rename(tmp, os.path.join(cache_dir, key))
+    except OSError:
+        if not os.path.isdir(os.path.join(cache_dir, key)):
+            raise
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def load_arrays(cache_dir, key, names):
+    """Returns arrays saved with :func:`save_arrays` as copy-on-write memory maps.
+
+    Pages are read lazily and shared between processes, eg, ``DataLoader``
+    workers. Returns ``None`` if there is no complete cache for `key`.
+    """
+    directory = os.path.join(cache_dir, key)
+    paths = [os.path.join(directory, f"{name}.npy") for name in names]
+    if not all(os.path.exists(path) for path in paths):
+        return None
+    return {name: np.load(path, mmap_mode="c") for name, path in zip(names, paths)}
+
+
 class TrajectoryDataset(Dataset):
     """Dataloader for the Trajectory datasets"""
 
@@ -96,6 +403,8 @@ class TrajectoryDataset(Dataset):
         threshold=0.002,
         min_ped=1,
         delim="\t",
+        cache_dir=None,
+        n_jobs=1,
     ):
         """
         Args:
@@ -108,6 +417,12 @@ class TrajectoryDataset(Dataset):
         when using a linear predictor
         - min_ped: Minimum number of pedestrians that should be in a seqeunce
         - delim: Delimiter in the dataset files
+        - cache_dir: Optional directory of preprocessed arrays, keyed by the file
+        contents and the arguments above. Cached arrays are memory-mapped instead of
+        parsing the files again. May be inside `data_dir`, as cache entries are
+        directories, which are not read as dataset files
+        - n_jobs: Number of files parsed and windowed in parallel processes, ``-1``
+        for all CPUs
         """
         super(TrajectoryDataset, self).__init__()
 
@@ -118,83 +433,55 @@ class TrajectoryDataset(Dataset):
         self.seq_len = self.obs_len + self.pred_len
         self.delim = delim
 
-        all_files = os.listdir(self.data_dir)
-        all_files = [os.path.join(self.data_dir, _path) for _path in all_files]
-        num_peds_in_seq = []
-        seq_list = []
-        seq_list_rel = []
-        loss_mask_list = []
-        non_linear_ped = []
-        for path in all_files:
-            data = read_file(path, delim)
-            frames = np.unique(data[:, 0]).tolist()
-            frame_data = []
-            for frame in frames:
-                frame_data.append(data[frame == data[:, 0], :])
-            num_sequences = int(math.ceil((len(frames) - self.seq_len + 1) / skip))
-
-            for idx in range(0, num_sequences * self.skip + 1, skip):
-                curr_seq_data = np.concatenate(
-                    frame_data[idx : idx + self.seq_len], axis=0
-                )
-                peds_in_curr_seq = np.unique(curr_seq_data[:, 1])
-                curr_seq_rel = np.zeros((len(peds_in_curr_seq), 2, self.seq_len))
-                curr_seq = np.zeros((len(peds_in_curr_seq), 2, self.seq_len))
-                curr_loss_mask = np.zeros((len(peds_in_curr_seq), self.seq_len))
-                num_peds_considered = 0
-                _non_linear_ped = []
-                for _, ped_id in enumerate(peds_in_curr_seq):
-                    curr_ped_seq = curr_seq_data[curr_seq_data[:, 1] == ped_id, :]
-                    curr_ped_seq = np.around(curr_ped_seq, decimals=4)
-                    pad_front = frames.index(curr_ped_seq[0, 0]) - idx
-                    pad_end = frames.index(curr_ped_seq[-1, 0]) - idx + 1
-                    if pad_end - pad_front != self.seq_len:
-                        continue
-                    curr_ped_seq = np.transpose(curr_ped_seq[:, 2:])
-                    curr_ped_seq = curr_ped_seq
-                    # Make coordinates relative
-                    rel_curr_ped_seq = np.zeros(curr_ped_seq.shape)
-                    rel_curr_ped_seq[:, 1:] = curr_ped_seq[:, 1:] - curr_ped_seq[:, :-1]
-                    _idx = num_peds_considered
-                    curr_seq[_idx, :, pad_front:pad_end] = curr_ped_seq
-                    curr_seq_rel[_idx, :, pad_front:pad_end] = rel_curr_ped_seq
-                    # Linear vs Non-Linear Trajectory
-                    _non_linear_ped.append(poly_fit(curr_ped_seq, pred_len, threshold))
-                    curr_loss_mask[_idx, pad_front:pad_end] = 1
-                    num_peds_considered += 1
-
-                if num_peds_considered > min_ped:
-                    non_linear_ped += _non_linear_ped
-                    num_peds_in_seq.append(num_peds_considered)
-                    loss_mask_list.append(curr_loss_mask[:num_peds_considered])
-                    seq_list.append(curr_seq[:num_peds_considered])
-                    seq_list_rel.append(curr_seq_rel[:num_peds_considered])
-
-        self.num_seq = len(seq_list)
-        seq_list = np.concatenate(seq_list, axis=0)
-        seq_list_rel = np.concatenate(seq_list_rel, axis=0)
-        loss_mask_list = np.concatenate(loss_mask_list, axis=0)
-        non_linear_ped = np.asarray(non_linear_ped)
-
-        # Convert numpy -> Torch Tensor
-        self.obs_traj = torch.from_numpy(seq_list[:, :, : self.obs_len]).type(
-            torch.float
-        )
-        self.pred_traj = torch.from_numpy(seq_list[:, :, self.obs_len :]).type(
-            torch.float
+        all_files = _data_files(self.data_dir)
+        params = dict(
+            obs_len=obs_len,
+            pred_len=pred_len,
+            skip=skip,
+            threshold=threshold,
+            min_ped=min_ped,
+            delim=delim,
         )
-        self.obs_traj_rel = torch.from_numpy(seq_list_rel[:, :, : self.obs_len]).type(
-            torch.float
+
+        arrays = None
+        if cache_dir is not None:
+            key = cache_key(all_files, **params)
+            arrays = load_arrays(cache_dir, key, _ARRAYS)
+            if arrays is None:
+                logger.info(f"Preprocessing {data_dir} into cache {key}")
+        if arrays is None:
+            arrays = self._preprocess(all_files, n_jobs=n_jobs, **params)
+            if cache_dir is not None:
+                save_arrays(cache_dir, key, arrays)
+                arrays = load_arrays(cache_dir, key, _ARRAYS)
+
+        # Tensors share memory with the arrays
+        self.obs_traj = torch.from_numpy(arrays["obs_traj"])
+        self.pred_traj = torch.from_numpy(arrays["pred_traj"])
+        self.obs_traj_rel = torch.from_numpy(arrays["obs_traj_rel"])
+        self.pred_traj_rel = torch.from_numpy(arrays["pred_traj_rel"])
+        self.loss_mask = torch.from_numpy(arrays["loss_mask"])
+        self.non_linear_ped = torch.from_numpy(arrays["non_linear_ped"])
+        self.seq_start_end = [tuple(row) for row in arrays["seq_start_end"].tolist()]
+        self.num_seq = len(self.seq_start_end)
+
+    def _preprocess(
+        self, all_files, obs_len, pred_len, skip, threshold, min_ped, delim, n_jobs=1
+    ):
+        """Returns float32 arrays of sequences in `all_files`, by name."""
+        seq_len = obs_len + pred_len
+        windows = partial(
+            _file_windows, delim=delim, seq_len=seq_len, skip=skip, min_ped=min_ped
         )
-        self.pred_traj_rel = torch.from_numpy(seq_list_rel[:, :, self.obs_len :]).type(
-            torch.float
+        # Results are merged in the order of `all_files`, whichever finishes first
+        results = map_jobs(windows, all_files, n_jobs, processes=True)
+        seq_list, num_peds_in_seq = zip(*results)
+        return sequence_arrays(
+            np.concatenate(seq_list, axis=0),
+            np.concatenate(num_peds_in_seq),
+            obs_len,
+            threshold,
         )
-        self.loss_mask = torch.from_numpy(loss_mask_list).type(torch.float)
-        self.non_linear_ped = torch.from_numpy(non_linear_ped).type(torch.float)
-        cum_start_idx = [0] + np.cumsum(num_peds_in_seq).tolist()
-        self.seq_start_end = [
-            (start, end) for start, end in zip(cum_start_idx, cum_start_idx[1:])
-        ]
 
     def __len__(self):
         return self.num_seq
@@ -210,3 +497,206 @@ class TrajectoryDataset(Dataset):
             self.loss_mask[start:end, :],
         ]
         return out
+
+
+class TrajectoryIterableDataset(IterableDataset):
+    """Streams the sequences of :class:`TrajectoryDataset` one file at a time.
+
+    Only the windows of the file being read, and the shuffle buffer, are held in
+    memory, so corpora of any size can be iterated. Files are sharded across
+    ``DataLoader`` workers, and items have the format of
+    :meth:`TrajectoryDataset.__getitem__`, so batches are collated with
+    :func:`seq_collate`.
+    """
+
+    def __init__(
+        self,
+        data_dir,
+        obs_len=8,
+        pred_len=12,
+        skip=1,
+        threshold=0.002,
+        min_ped=1,
+        delim="\t",
+        shuffle_buffer=0,
+        seed=None,
+    ):
+        """
+        Args:
+        - data_dir: Directory containing dataset files in the format
+        <frame_id> <ped_id> <x> <y>, or a list of such files
+        - obs_len, pred_len, skip, threshold, min_ped, delim: See
+        :class:`TrajectoryDataset`
+        - shuffle_buffer: Number of sequences shuffled in a buffer. File order is
+        shuffled too. ``0`` streams files in sorted order, and sequences in the
+        order of :class:`TrajectoryDataset`
+        - seed: Seed of shuffling, shared by workers. It is combined with the epoch,
+        which advances after each iteration, so epochs are shuffled differently.
+        ``DataLoader`` workers iterate copies of the dataset, so call
+        :meth:`set_epoch` before each epoch, as :func:`traja.data.loader.data_loader`
+        does
+        """
+        super(TrajectoryIterableDataset, self).__init__()
+
+        if isinstance(data_dir, (str, os.PathLike)):
+            self.files = _data_files(data_dir)
+        else:
+            self.files = sorted(data_dir)
+        self.obs_len = obs_len
+        self.pred_len = pred_len
+        self.skip = skip
+        self.seq_len = self.obs_len + self.pred_len
+        self.threshold = threshold
+        self.min_ped = min_ped
+        self.delim = delim
+        self.shuffle_buffer = shuffle_buffer
+        # Workers must agree on the file order to shard it
+        self.seed = seed if seed is not None else int(np.random.SeedSequence().entropy)
+        self.epoch = 0
+
+    def set_epoch(self, epoch):
+        """Sets the epoch of the next iteration, which is combined with the seed of
+        shuffling."""
+        self.epoch = epoch
+
+    def _sequences(self, path):
+        seqs, num_peds = _file_windows(
+            path, self.delim, self.seq_len, self.skip, self.min_ped
+        )
+        arrays = sequence_arrays(seqs, num_peds, self.obs_len, self.threshold)
+        tensors = [torch.from_numpy(arrays[name]) for name in _ARRAYS[:-1]]
+        for start, end in arrays["seq_start_end"].tolist():
+            yield [tensor[start:end] for tensor in tensors]
+
+    def __iter__(self):
+        worker = get_worker_info()
+        worker_id, num_workers = (0, 1)
+        if worker is not None:
+            worker_id, num_workers = worker.id, worker.num_workers
+        epoch = self.epoch
+        self.epoch += 1
+        files = self.files
+        if self.shuffle_buffer:
+            rng = np.random.default_rng([self.seed, epoch])
+            files = [files[i] for i in rng.permutation(len(files))]
+        sequences = itertools.chain.from_iterable(
+            map(self._sequences, files[worker_id::num_workers])
+        )
+        if not self.shuffle_buffer:
+            yield from sequences
+            return
+
+        rng = np.random.default_rng([self.seed, epoch, worker_id])
+        buffer = []
+        for seq in sequences:
+            # Copies release the arrays of files once their sequences are yielded
+            seq = [tensor.clone() for tensor in seq]
+            if len(buffer) < self.shuffle_buffer:
+                buffer.append(seq)
+                continue
+            i = rng.integers(len(buffer))
+            yield buffer[i]
+            buffer[i] = seq
+        rng.shuffle(buffer)
+        yield from buffer
+
+
+class BucketBatchSampler(Sampler):
+    """Batches sequences with similar numbers of pedestrians.
+
+    The pooling of social models costs O(num_peds ** 2) per sequence, so batches
+    mixing sequences of 2 and 60 pedestrians are imbalanced. Sequences are sorted
+    by their number of pedestrians, with ties in random order, split into batches,
+    and the order of batches is shuffled.
+
+    Batches hold `batch_size` sequences, or, with `max_cost`, as many sequences
+    as fit within a budget of ``sum(num_peds ** 2) <= max_cost``. A sequence
+    exceeding the budget on its own is batched alone.
+
+    .. doctest::
+
+        >>> from traja.datasets.dataset import BucketBatchSampler
+        >>> sampler = BucketBatchSampler([2, 60, 3, 58], batch_size=2, shuffle=False)
+        >>> list(sampler)
+        [[0, 2], [3, 1]]
+
+    """
+
+    def __init__(
+        self,
+        num_peds,
+        batch_size=None,
+        max_cost=None,
+        shuffle=True,
+        drop_last=False,
+        seed=None,
+    ):
+        """
+        Args:
+        - num_peds: Number of pedestrians of each sequence, eg,
+        ``[end - start for start, end in dataset.seq_start_end]``
+        - batch_size: Number of sequences per batch
+        - max_cost: Maximum sum of squared numbers of pedestrians per batch,
+        instead of `batch_size`
+        - shuffle: Shuffle sequences of equal numbers of pedestrians and batches
+        - drop_last: Drop the last batch if smaller than `batch_size`
+        - seed: Seed of shuffling. It is combined with the epoch, which advances
+        after each iteration, so epochs are shuffled differently
+        """
+        if (batch_size is None) == (max_cost is None):
+            raise ValueError("Pass one of batch_size and max_cost")
+        self.num_peds = np.asarray(num_peds, dtype=np.int64)
+        self.batch_size = batch_size
+        self.max_cost = max_cost
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.seed = seed if seed is not None else int(np.random.SeedSequence().entropy)
+        self.epoch = 0
+
+    @classmethod
+    def from_dataset(cls, dataset, **kwargs):
+        """Returns a sampler of the sequences of a :class:`TrajectoryDataset`."""
+        return cls([end - start for start, end in dataset.seq_start_end], **kwargs)
+
+    def set_epoch(self, epoch):
+        """Sets the epoch of the next iteration, which is combined with the seed of
+        shuffling."""
+        self.epoch = epoch
+
+    def _batches(self, rng=None):
+        order = np.arange(len(self.num_peds))
+        if rng is not None:
+            order = rng.permutation(order)
+        order = order[np.argsort(self.num_peds[order], kind="stable")]
+
+        if self.batch_size is not None:
+            stops = np.arange(self.batch_size, len(order), self.batch_size)
+            batches = np.split(order, stops)
+            if self.drop_last and batches and len(batches[-1]) < self.batch_size:
+                batches = batches[:-1]
+        else:
+            cum_cost = np.cumsum(self.num_peds[order] ** 2)
+            # Costs are sorted, so each batch greedily takes the longest run of
+            # sequences within the budget
+            batches = []
+            start, spent = 0, 0
+            while start < len(order):
+                stop = np.searchsorted(cum_cost, spent + self.max_cost, "right")
+                stop = max(stop, start + 1)
+                batches.append(order[start:stop])
+                start, spent = stop, cum_cost[stop - 1]
+        return [batch.tolist() for batch in batches if len(batch)]
+
+    def __iter__(self):
+        if not self.shuffle:
+            yield from self._batches()
+            return
+        rng = np.random.default_rng([self.seed, self.epoch])
+        self.epoch += 1
+        batches = self._batches(rng)
+        for i in rng.permutation(len(batches)):
+            yield batches[i]
+
+    def __len__(self):
+        # Batches depend only on the sorted numbers of pedestrians
+        return len(self._batches())
@@ -1,5 +1,4 @@
 import copy
-import logging
 from typing import Optional, List, Union, Tuple
 
 import numpy as np
@@ -9,8 +8,6 @@ from pandas.api.types import is_numeric_dtype
 
 import traja
 
-logging.basicConfig(format="%(levelname)s:%(message)s", level=logging.ERROR)
-
 
 class TrajaDataFrame(pd.DataFrame):
     """A TrajaDataFrame object is a subclass of pandas :class:`<~pandas.dataframe.DataFrame>`.
@@ -2,6 +2,7 @@
 """Pytorch visualization code modified from Chad Jensen's implementation
 (https://discuss.pytorch.org/t/lstm-for-sequence-prediction/22021/3)."""
 import logging
+import time
 
 import matplotlib.pyplot as plt
 import numpy as np
@@ -14,9 +15,7 @@ except ImportError:
     )
 import torch.nn as nn
 import torch.optim as optim
-
-
-nb_steps = 10
+from torch.utils.data import DataLoader
 
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
@@ -36,54 +35,113 @@ class LSTM(nn.Module):
 
 
 class TrajectoryLSTM:
+    """Trains an LSTM predicting the next position of windows of `nb_steps` steps.
+
+    Args:
+      xy (np.ndarray): Array of shape (N, 2) of positions
+      nb_steps (int): Number of steps of each window
+      epochs (int): Number of epochs trained by :meth:`train`
+      batch_size (int): Number of windows per batch
+      criterion: Loss function
+      lr (float): Learning rate of the Adam optimizer, which persists across calls
+        of :meth:`train`
+
+    """
+
     def __init__(
-        self, xy, nb_steps=10, epochs=1000, batch_size=1, criterion=nn.MSELoss()
+        self,
+        xy,
+        nb_steps=10,
+        epochs=1000,
+        batch_size=1,
+        criterion=nn.MSELoss(),
+        lr=1e-3,
     ):
         fig, ax = plt.subplots(2, 1)
         self.fig = fig
         self.ax = ax
-        assert xy.shape[1] is 2, f"xy should be an N x 2 array, but is {xy.shape}"
+        xy = np.asarray(xy)
+        assert xy.shape[1] == 2, f"xy should be an N x 2 array, but is {xy.shape}"
         self.xy = xy
         self.nb_steps = nb_steps
         self.epochs = epochs
         self.batch_size = batch_size
         self.criterion = criterion
         self.rnn = LSTM()
+        self.optimizer = optim.Adam(self.rnn.parameters(), lr)
+        self._xy = torch.from_numpy(xy).float()
+        self._steps = torch.arange(nb_steps).view(-1, 1)
 
-    def load_batch(self, batch_size=32):
-        t_1_b = np.zeros((self.nb_steps, self.batch_size, 2))
-        t_b = np.zeros((self.nb_steps * self.batch_size, 2))
-
-        inds = np.random.randint(0, len(self.xy) - self.nb_steps, (self.batch_size))
-        for i, ind in enumerate(inds):
-            t_1_b[:, i] = self.xy[ind : ind + self.nb_steps]
-            t_b[i * nb_steps : (i + 1) * self.nb_steps] = self.xy[
-                ind + 1 : ind + nb_steps + 1
-            ]
-        return torch.from_numpy(t_1_b).float(), torch.from_numpy(t_b).float()
+    def load_batch(self, batch_size=None, starts=None):
+        """Returns inputs and targets of windows starting at `starts`, or random ones.
 
-    def train(self):
-        self.mean_loss = 0.0
-        for epoch in range(1, self.epochs + 1):
-            t_1_b, t_b = self.load_batch(self.batch_size)
+        Args:
+          batch_size (int, optional): Number of random windows, defaults to
+            `batch_size`
+          starts (optional): Indices of the first positions of windows
 
-            def closure():
-                global loss
-                optimizer.zero_grad()
-                pred = self.rnn(t_1_b)
-                shaped_pred = pred.reshape(-1, 2)
-                loss = self.criterion(abs(shaped_pred), abs(t_b))
-                loss.backward()
+        Returns:
+          inputs (torch.Tensor): Tensor of shape (nb_steps, batch_size, 2)
+          targets (torch.Tensor): Tensor of shape (nb_steps * batch_size, 2) of the
+            next positions, ordered like the predictions of the LSTM
 
-                return loss
+        """
+        if starts is None:
+            batch_size = batch_size or self.batch_size
+            starts = np.random.randint(0, len(self.xy) - self.nb_steps, batch_size)
+        # Rows of positions of all windows, step-major like the LSTM input
+        rows = self._steps + torch.as_tensor(starts).view(1, -1)
+        t_1_b = self._xy[rows]
+        t_b = self._xy[rows + 1].view(-1, 2)
+        return t_1_b, t_b
+
+    def _step(self, t_1_b, t_b):
+        def closure():
+            self.optimizer.zero_grad()
+            pred = self.rnn(t_1_b)
+            shaped_pred = pred.reshape(-1, 2)
+            loss = self.criterion(abs(shaped_pred), abs(t_b))
+            loss.backward()
+            return loss
+
+        return self.optimizer.step(closure).item()
+
+    def train(self, epochs=None, full_epochs=False, log_every=100):
+        """Trains the LSTM, reporting mean loss and samples/s every `log_every` epochs.
+
+        Args:
+          epochs (int, optional): Number of epochs, defaults to `epochs`
+          full_epochs (bool): Train on all windows in shuffled mini-batches of
+            `batch_size` in each epoch, rather than on one random batch
+          log_every (int): Number of epochs between reports
 
-            optimizer = optim.Adam(self.rnn.parameters(), 1e-3)
-            optimizer.step(closure)
-            self.mean_loss += loss.item()
+        """
+        epochs = epochs or self.epochs
+        loader = None
+        if full_epochs:
+            num_windows = len(self.xy) - self.nb_steps
+            loader = DataLoader(
+                torch.arange(num_windows), batch_size=self.batch_size, shuffle=True
+            )
 
-            if epoch % 100 == 0:
-                print("Epoch: {} | Loss: {:.6f}".format(epoch, self.mean_loss))
-                self.mean_loss = 0
+        self.mean_loss = 0.0
+        losses, samples, start = [], 0, time.perf_counter()
+        for epoch in range(1, epochs + 1):
+            batches = loader if loader is not None else [None]
+            for starts in batches:
+                t_1_b, t_b = self.load_batch(starts=starts)
+                losses.append(self._step(t_1_b, t_b))
+                samples += t_1_b.shape[1]
+
+            if epoch % log_every == 0:
+                self.mean_loss = np.mean(losses)
+                rate = samples / (time.perf_counter() - start)
+                print(
+                    "Epoch: {} | Loss: {:.6f} | {:.0f} samples/s".format(
+                        epoch, self.mean_loss, rate
+                    )
+                )
+                losses, samples, start = [], 0, time.perf_counter()
 
     def savefig(self, filepath):
         self.fig.savefig(filepath)
@@ -285,8 +343,101 @@ class Decoder(nn.Module):
         return pred_traj_fake_rel, state_tuple[0]
 
 
+def seq_pairs(seq_start_end):
+    """Returns all ordered pairs of pedestrians within each sequence of a batch.
+
+    Pairs are ordered by sequence, then pedestrian, then other pedestrian, as in
+    the loops over sequences of the pooling modules, so that results of all
+    sequences are computed at once.
+
+    Inputs:
+    - seq_start_end: Tensor of shape (num_seqs, 2) which delimits sequences within
+      batch
+    Output:
+    - ped: Tensor of shape (num_pairs,), index of the pedestrian in the batch
+    - other: Tensor of shape (num_pairs,), index of the other pedestrian in the batch
+    - row: Tensor of shape (num_pairs,), index of the pedestrian in the concatenated
+      output of all sequences
+    - num_peds: Number of pedestrians in all sequences
+    """
+    seq_start_end = torch.as_tensor(seq_start_end)
+    starts = seq_start_end[:, 0]
+    peds_per_seq = seq_start_end[:, 1] - starts
+    pairs_per_seq = peds_per_seq * peds_per_seq
+    # The only synchronization with the device
+    totals = torch.stack([peds_per_seq.sum(), pairs_per_seq.sum()])
+    num_peds, num_pairs = totals.tolist()
+
+    seq = torch.repeat_interleave(
+        torch.arange(len(peds_per_seq), device=seq_start_end.device),
+        pairs_per_seq,
+        output_size=num_pairs,
+    )
+    pair = torch.arange(num_pairs, device=seq_start_end.device)
+    pair -= (torch.cumsum(pairs_per_seq, 0) - pairs_per_seq)[seq]
+    n = peds_per_seq[seq]
+    first_row = torch.cumsum(peds_per_seq, 0) - peds_per_seq
+    ped = starts[seq] + pair // n
+    other = starts[seq] + pair % n
+    row = first_row[seq] + pair // n
+    return ped, other, row, num_peds
+
+
+def seq_chunks(seq_start_end, max_pairs):
+    """Returns chunks of consecutive sequences of up to `max_pairs` pedestrian pairs.
+
+    Chunks keep the pairs of batched pooling in cache. Sequences with more pairs are
+    chunked alone.
+
+    Inputs:
+    - seq_start_end: Tensor of shape (num_seqs, 2) which delimits sequences within
+      batch
+    - max_pairs: Maximum number of ordered pairs of pedestrians per chunk
+    Output:
+    - bounds: List of (first, last + 1) sequences of each chunk
+    """
+    peds_per_seq = seq_start_end[:, 1] - seq_start_end[:, 0]
+    cum_pairs = np.cumsum((peds_per_seq * peds_per_seq).tolist())
+    bounds = []
+    first, spent = 0, 0
+    while first < len(cum_pairs):
+        last = np.searchsorted(cum_pairs, spent + max_pairs, "right")
+        last = max(int(last), first + 1)
+        bounds.append((first, last))
+        first, spent = last, cum_pairs[last - 1]
+    return bounds
+
+
+def segment_batch_norm(bn, x, counts):
+    """Applies batch normalization `bn` to each segment of consecutive rows of `x`.
+
+    In training mode, or without running statistics, each segment is normalized with
+    its own statistics, and running statistics are updated once per segment, as when
+    applying `bn` to each segment in turn. Otherwise, `bn` is applied to all rows at
+    once. Only normalization is per segment, so layers around it are batched.
+
+    Inputs:
+    - bn: :class:`torch.nn.BatchNorm1d` module
+    - x: Tensor of shape (num_rows, num_features)
+    - counts: List of the number of rows of each segment
+    Output:
+    - out: Tensor of shape (num_rows, num_features)
+    """
+    if not bn.training and bn.running_mean is not None:
+        return bn(x)
+    # Native batch norm of each segment is faster than scattered statistics
+    return torch.cat([bn(rows) for rows in x.split(counts)], dim=0)
+
+
 class PoolHiddenNet(nn.Module):
-    """Pooling module as proposed in our paper"""
+    """Pooling module as proposed in our paper
+
+    By default, sequences of a batch are pooled together (`batched`), in chunks of up
+    to `max_pairs` pairs of pedestrians. In training mode with `batch_norm`, the pairs
+    of each sequence are normalized with their own statistics by
+    :func:`segment_batch_norm`. Results equal those of pooling each sequence in turn,
+    with ``batched=False``.
+    """
 
     def __init__(
         self,
@@ -297,9 +448,13 @@ class PoolHiddenNet(nn.Module):
         activation="relu",
         batch_norm=True,
         dropout=0.0,
+        batched=True,
+        max_pairs=2048,
     ):
         super(PoolHiddenNet, self).__init__()
 
+        self.batched = batched
+        self.max_pairs = max_pairs
         self.mlp_dim = 1024
         self.h_dim = h_dim
         self.bottleneck_dim = bottleneck_dim
@@ -338,6 +493,37 @@ class PoolHiddenNet(nn.Module):
         Output:
         - pool_h: Tensor of shape (batch, bottleneck_dim)
         """
+        if not self.batched:
+            return self._forward_sequences(h_states, seq_start_end, end_pos)
+
+        hidden = h_states.view(-1, self.h_dim)
+        seq_start_end = torch.as_tensor(seq_start_end)
+        pool_h = []
+        for first, last in seq_chunks(seq_start_end, self.max_pairs):
+            chunk = seq_start_end[first:last]
+            ped, other, _, num_peds = seq_pairs(chunk)
+            rel_pos = end_pos[other] - end_pos[ped]
+            rel_embedding = self.spatial_embedding(rel_pos)
+            pair_pool_h = torch.cat([rel_embedding, hidden[other]], dim=1)
+            peds_per_seq = chunk[:, 1] - chunk[:, 0]
+            # Batch normalization over the pairs of each sequence
+            pairs_per_seq = (peds_per_seq * peds_per_seq).tolist()
+            for layer in self.mlp_pre_pool:
+                if isinstance(layer, nn.BatchNorm1d):
+                    pair_pool_h = segment_batch_norm(layer, pair_pool_h, pairs_per_seq)
+                else:
+                    pair_pool_h = layer(pair_pool_h)
+            # Max over the other pedestrians of each pedestrian, whose pairs are
+            # consecutive
+            others = torch.repeat_interleave(
+                peds_per_seq, peds_per_seq, output_size=num_peds
+            )
+            pool_h.append(torch.segment_reduce(pair_pool_h, "max", lengths=others))
+        pool_h = torch.cat(pool_h, dim=0)
+        return pool_h
+
+    def _forward_sequences(self, h_states, seq_start_end, end_pos):
+        """Pools each sequence in turn, see :meth:`forward`."""
         pool_h = []
         for _, (start, end) in enumerate(seq_start_end):
             start = start.item()
@@ -363,7 +549,12 @@ class PoolHiddenNet(nn.Module):
 
 class SocialPooling(nn.Module):
     """Current state of the art pooling mechanism:
-    http://cvgl.stanford.edu/papers/CVPR16_Social_LSTM.pdf"""
+    http://cvgl.stanford.edu/papers/CVPR16_Social_LSTM.pdf
+
+    By default, grids of all sequences of a batch are pooled with one scatter
+    (`batched`). Results equal those of pooling each sequence in turn, with
+    ``batched=False``.
+    """
 
     def __init__(
         self,
@@ -374,8 +565,10 @@ class SocialPooling(nn.Module):
         neighborhood_size=2.0,
         grid_size=8,
         pool_dim=None,
+        batched=True,
     ):
         super(SocialPooling, self).__init__()
+        self.batched = batched
         self.h_dim = h_dim
         self.grid_size = grid_size
         self.neighborhood_size = neighborhood_size
@@ -431,6 +624,37 @@ class SocialPooling(nn.Module):
         Output:
         - pool_h: Tensor of shape (batch, h_dim)
         """
+        if not self.batched:
+            return self._forward_sequences(h_states, seq_start_end, end_pos)
+
+        ped, other, row, num_peds = seq_pairs(seq_start_end)
+        hidden = h_states.view(-1, self.h_dim)
+        top_left, bottom_right = self.get_bounds(end_pos)
+        top_left, bottom_right = top_left[ped], bottom_right[ped]
+        other_pos = end_pos[other]
+        # Other pedestrians strictly within the neighborhood of each pedestrian
+        within_bound = (
+            (other_pos[:, 0] < bottom_right[:, 0])
+            & (other_pos[:, 0] > top_left[:, 0])
+            & (other_pos[:, 1] < top_left[:, 1])
+            & (other_pos[:, 1] > bottom_right[:, 1])
+            & (ped != other)
+        )
+        pairs = within_bound.nonzero().view(-1)
+        grid_pos = self.get_grid_locations(top_left[pairs], other_pos[pairs]).long()
+
+        # Sum hidden states of others in each cell of the grid of each pedestrian
+        total_grid_size = self.grid_size * self.grid_size
+        grid_pos += row[pairs] * total_grid_size
+        other_hidden = hidden[other[pairs]]
+        grid_pos = grid_pos.view(-1, 1).expand_as(other_hidden)
+        pool_h = hidden.new_zeros((num_peds * total_grid_size, self.h_dim))
+        pool_h = pool_h.scatter_add(0, grid_pos, other_hidden)
+        pool_h = self.mlp_pool(pool_h.view(num_peds, -1))
+        return pool_h
+
+    def _forward_sequences(self, h_states, seq_start_end, end_pos):
+        """Pools each sequence in turn, see :meth:`forward`."""
         pool_h = []
         for _, (start, end) in enumerate(seq_start_end):
             start = start.item()
@@ -0,0 +1,41 @@
+"""Parallel map shared by trajectory and dataset processing.
+
+Work is spread over threads, which suits NumPy and pandas code releasing the GIL, or
+over processes for pure Python code such as parsing files::
+
+    from traja.parallel import map_jobs
+
+    lengths = map_jobs(len, paths, n_jobs=-1)
+
+"""
+import os
+from typing import Callable, Optional
+
+__all__ = ["map_jobs"]
+
+
+def map_jobs(
+    func: Callable, items: list, n_jobs: Optional[int] = 1, processes: bool = False
+) -> list:
+    """Applies `func` to `items` with `n_jobs` workers, ``-1`` or ``None`` for all CPUs.
+
+    Threads are used unless `processes` is True, which requires `func` and `items` to
+    be picklable but also parallelizes pure Python code. Results are in the order of
+    `items`.
+
+    .. doctest::
+
+        >>> from traja.parallel import map_jobs
+        >>> map_jobs(abs, [-1, 2, -3], n_jobs=2)
+        [1, 2, 3]
+
+    """
+    if n_jobs is None or n_jobs < 0:
+        n_jobs = os.cpu_count() or 1
+    if n_jobs == 1 or len(items) < 2:
+        return [func(item) for item in items]
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    Executor = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with Executor(max_workers=min(n_jobs, len(items))) as executor:
+        return list(executor.map(func, items))
@@ -5,6 +5,7 @@ import pandas as pd
 from pandas.core.dtypes.common import is_datetime64_any_dtype, is_timedelta64_dtype
 
 from traja import TrajaDataFrame
+from traja.config import _float_dtype
 
 
 def from_df(df: pd.DataFrame, xcol=None, ycol=None, time_col=None, **kwargs):
@@ -101,9 +102,11 @@ def read_file(
     stripped_cols = {c: lambda x: x.strip() for c in whitespace_cols}
     converters = {**stripped_cols, **kwargs.pop("converters", {})}
 
-    # Downcast to float32 # TODO: Benchmark float32 vs float64 for very big datasets
-    float_cols = df_test.select_dtypes(include=[np.float]).columns
-    float32_cols = {c: np.float32 for c in float_cols}
+    # Downcast to float32 unless another precision is configured, see
+    # benchmarks/bench_precision.py for memory and throughput of both
+    float_cols = df_test.select_dtypes(include=[np.floating]).columns
+    float_dtype = _float_dtype(default=np.float32)
+    float32_cols = {c: float_dtype for c in float_cols}
 
     # Convert string columns to categories
     string_cols = [c for c in df_test if df_test[c].dtype == str]
@@ -6,7 +6,7 @@ from typing import Union, Optional, Tuple, List
 import matplotlib
 import matplotlib.pyplot as plt
 from matplotlib.axes import Axes
-from matplotlib.collections import PathCollection
+from matplotlib.collections import LineCollection, PathCollection
 from matplotlib import dates as md
 from matplotlib.figure import Figure
 import numpy as np
@@ -71,12 +71,95 @@ def sans_serif():
     plt.rc("font", family="serif")
 
 
-def _rolling(df, window, step):
-    count = 0
-    df_length = len(df)
-    while count < (df_length - window):
-        yield count, df[count : window + count]
-        count += step
+def _lod_indices(
+    xy: np.ndarray, ax: Axes, breaks: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns indices of the points of a path worth drawing in the current view of `ax`.
+
+    Segments outside of the axes limits are culled. Of each run of consecutive points
+    falling into the same display pixel column, only the first, last, lowest and
+    highest are kept, as they determine the drawn extent of the run. Points are kept
+    in path order, so paths crossing a column several times are drawn in each pass.
+    Dense paths are hence drawn with at most 4 points per pixel column and pass,
+    rather than every point of the path.
+
+    Args:
+      xy (:class:`numpy.ndarray`): Path coordinates with shape ``(n, 2)``
+      ax (:class:`~matplotlib.axes.Axes`): Axes the path is drawn on
+      breaks (:class:`numpy.ndarray`, optional): Boolean mask of points starting a new
+        path, eg, the first point of each trajectory of a collection
+
+    Returns:
+      indices (:class:`numpy.ndarray`): Sorted indices of points to draw
+      starts (:class:`numpy.ndarray`): Boolean mask of `indices` starting a new path
+
+    """
+    x0, x1 = sorted(ax.get_xlim())
+    y0, y1 = sorted(ax.get_ylim())
+    inside = (xy[:, 0] >= x0) & (xy[:, 0] <= x1) & (xy[:, 1] >= y0) & (xy[:, 1] <= y1)
+    if breaks is not None:
+        # Keep both ends of each path so they are not joined
+        inside_prev = inside[:-1] & ~breaks[1:]
+        inside_next = inside[1:] & ~breaks[1:]
+    else:
+        inside_prev, inside_next = inside[:-1], inside[1:]
+    # Neighbours of visible points keep segments crossing the axes border
+    visible = inside.copy()
+    visible[1:] |= inside_prev
+    visible[:-1] |= inside_next
+    indices = np.flatnonzero(visible)
+    starts = np.ones(len(indices), dtype=bool)
+    starts[1:] = np.diff(indices) > 1
+    if breaks is not None:
+        starts[1:] |= breaks[indices[1:]]
+    if len(indices) < 3:
+        return indices, starts
+
+    pixels = ax.transData.transform(xy[indices])
+    columns = np.floor(pixels[:, 0]).astype(np.int64)
+    # Runs of consecutive points of a path in the same pixel column
+    run_starts = starts.copy()
+    run_starts[1:] |= columns[1:] != columns[:-1]
+    first = np.flatnonzero(run_starts)
+    last = np.append(first[1:], len(indices)) - 1
+    # Points ordered by run, then height, so runs keep their positions
+    by_height = np.lexsort((pixels[:, 1], np.cumsum(run_starts)))
+
+    keep = np.zeros(len(indices), dtype=bool)
+    # Includes both ends of each path
+    keep[first] = True
+    keep[last] = True
+    keep[by_height[first]] = True
+    keep[by_height[last]] = True
+    return indices[keep], starts[keep]
+
+
+def _lod_split(indices: np.ndarray, starts: np.ndarray) -> List[np.ndarray]:
+    """Splits `indices` from :func:`_lod_indices` into separate paths."""
+    return np.split(indices, np.flatnonzero(starts)[1:])
+
+
+def _lod_markers(xy: np.ndarray, indices: np.ndarray, ax: Axes) -> np.ndarray:
+    """Returns the subset of `indices` drawn as markers, one per display pixel.
+
+    The latest point in each pixel is kept, as it is the one drawn on top.
+    """
+    if len(indices) < 2:
+        return indices
+    pixels = np.floor(ax.transData.transform(xy[indices])).astype(np.int64)
+    keys = pixels[:, 0] * (pixels[:, 1].max() - pixels[:, 1].min() + 1) + pixels[:, 1]
+    _, last = np.unique(keys[::-1], return_index=True)
+    return indices[np.sort(len(indices) - 1 - last)]
+
+
+def _connect_lod(ax: Axes, update):
+    """Calls `update` whenever the view of `ax` changes, eg, on zoom or pan."""
+
+    def on_lims_change(event_ax):
+        update()
+
+    ax.callbacks.connect("xlim_changed", on_lims_change)
+    ax.callbacks.connect("ylim_changed", on_lims_change)
 
 
 def predict(
@@ -87,7 +170,7 @@ def predict(
     model="lstm",
 ):  # pragma: no cover
     """Method for training and visualizing LSTM with trajectory datasets."""
-    if model is "lstm":
+    if model == "lstm":
         from traja.models.nn import TrajectoryLSTM
 
         TrajectoryLSTM(xy, nb_steps=nb_steps, epochs=epochs, batch_size=batch_size)
@@ -137,40 +220,34 @@ def bar_plot(trj: TrajaDataFrame, bins: Union[int, tuple] = None, **kwargs) -> A
 def plot_rolling_hull(trj: TrajaDataFrame, window=100, step=20, areas=False, **kwargs):
     """Plot rolling convex hull of trajectory. If `areas` is True, only
     areas over time is plotted.
-    
-    """
-    hulls = []
 
-    for offset, window in _rolling(trj, window=window, step=step):
-        if window.dropna().empty:
-            continue
-        shape = window.traja.to_shapely()
-        hull = shape.convex_hull
-        hulls.append(hull)
+    Hulls are computed with :func:`~traja.trajectory.rolling_hull_area`.
 
+    """
+    units = trj.__dict__.get("spatial_units", "m")
     if areas:
-        hull_areas = []
-        for idx, hull in enumerate(hulls):
-            hull_areas.append(hull.area)
-        plt.plot(hull_areas, **kwargs)
+        hull_areas, _ = traja.trajectory.rolling_hull_area(
+            trj, window=window, step=step
+        )
+        frames = np.arange(len(hull_areas)) * step
+        plt.plot(frames, hull_areas, **kwargs)
         plt.title(f"Rolling Trajectory Convex Hull Area\nWindow={window},Step={step}")
-        plt.ylabel(f"Area {trj.__dict__.get('spatial_units','m')}")
+        plt.ylabel(f"Area {units}")
         plt.xlabel("Frame")
     else:
-        xlim, ylim = traja.trajectory._get_xylim(trj)
-        plt.xlim = xlim
-        plt.ylim = ylim
-        for idx, hull in enumerate(hulls):
-            if hasattr(
-                hull, "exterior"
-            ):  # Occassionally a Point object without it reaches
-                plt.plot(*hull.exterior.xy, alpha=idx / len(hulls), c="k", **kwargs)
+        _, outlines = traja.trajectory._rolling_hulls(trj, window=window, step=step)
+        colors = np.zeros((len(outlines), 4))
+        colors[:, 3] = np.arange(len(outlines)) / max(len(outlines), 1)
         ax = plt.gca()
+        ax.add_collection(LineCollection(outlines, colors=colors, **kwargs))
+        xlim, ylim = traja.trajectory._get_xylim(trj)
+        ax.set_xlim(xlim)
+        ax.set_ylim(ylim)
         ax.set_aspect("equal")
         ax.set(
-            xlabel=f"x ({trj.__dict__.get('spatial_units','m')})",
-            ylabel=f"y ({trj.__dict__.get('spatial_units','m')})",
-            title="Rolling Trajectory Convex Hull\nWindow={window},Step={step}",
+            xlabel=f"x ({units})",
+            ylabel=f"y ({units})",
+            title=f"Rolling Trajectory Convex Hull\nWindow={window},Step={step}",
         )
 
 
@@ -203,34 +280,24 @@ def plot_period(trj: TrajaDataFrame, col="x", dark=(7, 19), **kwargs):
 
 
 def plot_rolling_hull_3d(trj: TrajaDataFrame, window=100, step=20, **kwargs):
-    from mpl_toolkits.mplot3d import Axes3D
-
-    hulls = []
+    from mpl_toolkits.mplot3d.art3d import Line3DCollection
 
     fig = plt.figure()
     ax = fig.add_subplot(111, projection="3d")
 
-    for offset, wind in _rolling(trj, window=window, step=step):
-        if wind.dropna().empty:
-            continue
-        shape = wind.traja.to_shapely()
-        hull = shape.convex_hull
-        hulls.append(hull)
+    _, outlines = traja.trajectory._rolling_hulls(trj, window=window, step=step)
 
-    xlim, ylim = traja.trajectory._get_xylim(trj)
-    plt.xlim = xlim
-    plt.ylim = ylim
-    outlines = []
-    for idx, hull in enumerate(hulls):
-        if hasattr(hull, "exterior"):  # Occassionally a Point object without it reaches
-            outlines.append(np.array(hull.exterior.xy))
-
-    # Add plots to axes
+    # Stack outlines along z, colored by their position in time
     NLINES = len(outlines)
+    outlines = [np.column_stack([xy, np.full(len(xy), z)]) for z, xy in enumerate(outlines)]
     cm = plt.get_cmap(kwargs.get("cmap", "plasma"))
-    ax.set_prop_cycle(color=[cm(1.0 * i / (NLINES)) for i in range(NLINES)])
-    for z, xy in enumerate(outlines):
-        ax.plot(*xy, z)
+    lines = Line3DCollection(outlines, colors=cm(np.arange(NLINES) / max(NLINES, 1)))
+    ax.add_collection3d(lines)
+
+    xlim, ylim = traja.trajectory._get_xylim(trj)
+    ax.set_xlim(xlim)
+    ax.set_ylim(ylim)
+    ax.set_zlim(0, max(NLINES - 1, 1))
 
     ax.set(
         xlabel=f"{trj.__dict__.get('spatial_units','m')}",
@@ -245,22 +312,22 @@ def plot_rolling_hull_3d(trj: TrajaDataFrame, window=100, step=20, **kwargs):
 def plot_3d(trj: TrajaDataFrame, **kwargs) -> matplotlib.collections.PathCollection:
     """Plot 3D trajectory for single identity over period.
 
+    The path is drawn as a single :class:`~mpl_toolkits.mplot3d.art3d.Line3DCollection`
+    colored by time.
+
     Args:
       trj (:class:`traja.TrajaDataFrame`): trajectory
-      n_coords (int, optional): Number of coordinates to plot
+      cmap (str): color map, default is "winter"
+      max_segments (int, optional): Simplify longer paths to `max_segments` segments
+        with :func:`~traja.trajectory.simplify_indices` before plotting, default is
+        5000. Pass ``None`` to plot all segments
       **kwargs: additional keyword arguments to :meth:`matplotlib.axes.Axes.scatter`
 
     Returns:
         ax (:class:`~matplotlib.collections.PathCollection`): Axes of plot
 
-    .. note::
-        Takes a while to plot large trajectories. Consider using first::
-        
-            rt = trj.traja.rediscretize(R=1.) # Replace R with appropriate step length
-            rt.traja.plot_3d()
-
     """
-    from mpl_toolkits.mplot3d import Axes3D
+    from mpl_toolkits.mplot3d.art3d import Line3DCollection
 
     fig = plt.figure()
     ax = fig.add_subplot(111, projection="3d")
@@ -269,13 +336,37 @@ def plot_3d(trj: TrajaDataFrame, **kwargs) -> matplotlib.collections.PathCollect
     ax.set_ylabel("y", fontsize=15)
     title = kwargs.pop("title", "Trajectory")
     ax.set_title(f"{title}", fontsize=20)
-    ax.plot(trj.x, trj.y, trj.index)
     cmap = kwargs.pop("cmap", "winter")
-    cm = plt.get_cmap(cmap)
-    NPOINTS = len(trj)
-    ax.set_prop_cycle(color=[cm(1.0 * i / (NPOINTS - 1)) for i in range(NPOINTS - 1)])
-    for i in range(NPOINTS - 1):
-        ax.plot(trj.x[i : i + 2], trj.y[i : i + 2], trj.index[i : i + 2])
+    max_segments = kwargs.pop("max_segments", 5000)
+
+    points = np.column_stack(
+        [trj.x.to_numpy(dtype=float), trj.y.to_numpy(dtype=float), trj.index]
+    ).astype(float)
+    n_points = len(points)
+    if max_segments is not None and n_points - 1 > max_segments:
+        indices = traja.trajectory.simplify_indices(
+            points[:, :2], n_points=max_segments + 1
+        )
+    else:
+        indices = np.arange(n_points)
+    points = points[indices]
+
+    # Color segments by their position in the full trajectory
+    segments = np.stack([points[:-1], points[1:]], axis=1)
+    lines = Line3DCollection(segments, cmap=plt.get_cmap(cmap))
+    lines.set_array(indices[:-1] / max(n_points - 1, 1))
+    lines.set_clim(0, 1)
+    ax.add_collection3d(lines)
+
+    # Collections do not update the data limits of 3D axes
+    if len(points):
+        lower = np.nanmin(points, axis=0)
+        upper = np.nanmax(points, axis=0)
+        for set_lim, low, high in zip(
+            (ax.set_xlim, ax.set_ylim, ax.set_zlim), lower, upper
+        ):
+            if low < high:
+                set_lim(low, high)
 
     dist = kwargs.pop("dist", None)
     if dist:
@@ -295,6 +386,7 @@ def plot(
     show_time: bool = False,
     accessor: Optional[traja.TrajaAccessor] = None,
     ax=None,
+    lod: bool = False,
     **kwargs,
 ) -> matplotlib.collections.PathCollection:
     """Plot trajectory for single animal over period.
@@ -305,6 +397,9 @@ def plot(
       show_time (bool): Show colormap as time
       accessor (:class:`~traja.accessor.TrajaAccessor`, optional): TrajaAccessor instance
       ax (:class:`~matplotlib.axes.Axes`): axes for plotting
+      lod (bool): Level-of-detail rendering. Only points distinguishable at the
+        current axes resolution are drawn, and they are recomputed on zoom. Use for
+        very long trajectories
       interactive (bool): show plot immediately
       **kwargs: additional keyword arguments to :meth:`matplotlib.axes.Axes.scatter`
 
@@ -347,32 +442,21 @@ def plot(
 
     n_coords = len(verts)
 
-    codes = [Path.MOVETO] + [Path.LINETO] * (len(verts) - 1)
-    path = Path(verts, codes)
-
     if not ax:
         fig, ax = plt.subplots(figsize=figsize)
         fig.canvas.draw()
 
-    patch = patches.PathPatch(path, edgecolor=GRAY, facecolor="none", lw=3, alpha=0.3)
-    ax.add_patch(patch)
-
-    xs, ys = zip(*verts)
-
-    if time_col == "index":
-        # DatetimeIndex determines color
-        colors = [ind for ind, x in enumerate(trj.index[:n_coords])]
-    elif time_col and time_col != "index":
-        # `time_col` determines color
-        colors = [ind for ind, x in enumerate(trj[time_col].iloc[:n_coords])]
+    if time_col:
+        # Position in `time_col` or DatetimeIndex determines color
+        colors = np.arange(n_coords)
     else:
         # Frame count determines color
-        colors = trj.index[:n_coords]
+        colors = np.asarray(trj.index[:n_coords])
 
     if time_col:
         # TODO: Calculate fps if not in datetime
-        vmin = min(colors)
-        vmax = max(colors)
+        vmin = colors.min()
+        vmax = colors.max()
         if is_datetime:
             # Show timestamps without units
             time_units = ""
@@ -384,10 +468,32 @@ def plot(
             time_units = ""
     label = f"Time ({time_units})" if time_units else ""
 
+    def lod_path(indices, starts):
+        codes = np.where(starts, Path.MOVETO, Path.LINETO).astype(Path.code_type)
+        return Path(verts[indices], codes)
+
+    if lod:
+        ax.set_xlim(xlim)
+        ax.set_ylim(ylim)
+        indices, starts = _lod_indices(verts, ax)
+        path = lod_path(indices, starts)
+        markers = _lod_markers(verts, indices, ax)
+    else:
+        markers = slice(None)
+        codes = [Path.MOVETO] + [Path.LINETO] * (len(verts) - 1)
+        path = Path(verts, codes)
+
+    patch = patches.PathPatch(path, edgecolor=GRAY, facecolor="none", lw=3, alpha=0.3)
+    if lod:
+        # Limits are fixed, skip the data limits update which iterates the path in Python
+        ax.add_artist(patch)
+    else:
+        ax.add_patch(patch)
+
     collection = ax.scatter(
-        xs,
-        ys,
-        c=colors,
+        verts[markers, 0],
+        verts[markers, 1],
+        c=colors[markers],
         s=kwargs.pop("s", 1),
         cmap=plt.cm.viridis,
         alpha=0.7,
@@ -396,6 +502,17 @@ def plot(
         **kwargs,
     )
 
+    if lod:
+
+        def update():
+            indices, starts = _lod_indices(verts, ax)
+            patch.set_path(lod_path(indices, starts))
+            markers = _lod_markers(verts, indices, ax)
+            collection.set_offsets(verts[markers])
+            collection.set_array(colors[markers])
+
+        _connect_lod(ax, update)
+
     ax.set_xlim(xlim)
     ax.set_ylim(ylim)
 
@@ -445,7 +562,7 @@ def plot(
         else:
             cbar_labels = trj.index[indices].values
         cbar_labels = np.round(cbar_labels, 6)
-        if fps is not None and fps > 0 and fps is not 1 and show_time:
+        if fps is not None and fps > 0 and fps != 1 and show_time:
             cbar_labels = cbar_labels / fps
 
     cbar.set_ticks(indices)
@@ -519,10 +636,13 @@ def plot_collection(
     trjs: Union[pd.DataFrame, TrajaDataFrame],
     id_col: str = "id",
     colors: Optional[Union[dict, List[str]]] = None,
+    lod: bool = False,
     **kwargs,
 ):
     """Plot trajectories of multiple subjects identified by `id`.
 
+    All trajectories are drawn as a single :class:`~matplotlib.collections.LineCollection`.
+
     Args:
         trjs: dataframe with multiple trajectories
         id_col: name of id_col, default is "id"
@@ -530,13 +650,18 @@ def plot_collection(
                                 - {"car0":"red","car1":"blue"}
                                 - {"car":"red","person":blue"}
                                 - ["car", "person"]
-        kwargs: kwargs to :meth:`matplotlib.axes.Axes.plot`
+        lod (bool): Level-of-detail rendering. Only points distinguishable at the
+            current axes resolution are drawn, and they are recomputed on zoom
+        kwargs: kwargs to :class:`matplotlib.collections.LineCollection`
 
     Returns:
-        lines (list of `~matplotlib.lines.Line2D` objects): lines of plot
+        lines (:class:`~matplotlib.collections.LineCollection`): lines of plot
 
     """
-    ids = trjs[id_col].unique()
+    import matplotlib.colors as mcolors
+    from matplotlib.lines import Line2D
+
+    codes, ids = pd.factorize(trjs[id_col])
 
     # Get plot keyword args
     colormap = kwargs.pop("cmap", "hsv")
@@ -562,28 +687,71 @@ def plot_collection(
                 raise Exception(f"No substring matching {id} in {colors}.")
         colors = color_lookup
     elif isinstance(colors, dict):
-        color_lookup = [colors.get(id) for id in ids]
+        # Ids missing from the lookup use the default color cycle
+        default_colors = plt.rcParams["axes.prop_cycle"].by_key()["color"]
+        color_lookup = [
+            colors.get(id) or default_colors[idx % len(default_colors)]
+            for idx, id in enumerate(ids)
+        ]
         colors = color_lookup
         labels = ids
+    colors = mcolors.to_rgba_array(colors, alpha=alpha)
+
+    # Order rows by id, keeping the order of rows within each trajectory
+    order = np.argsort(codes, kind="stable")
+    order = order[codes[order] >= 0]
+    xy = trjs[["x", "y"]].to_numpy(dtype=float)[order]
+    codes = codes[order]
+    breaks = np.ones(len(codes), dtype=bool)
+    breaks[1:] = codes[1:] != codes[:-1]
 
     fig, ax = plt.subplots()
-    lines = []
-    for idx, id in enumerate(ids):
-        trj = trjs[trjs[id_col] == id]
-        l = ax.plot(
-            trj.x,
-            trj.y,
-            linestyle=linestyle,
-            marker=marker,
-            c=colors[idx],
-            alpha=alpha,
-            label=labels[idx],
-            **kwargs,
-        )
-        lines.extend(l)
 
-    handles, labels = plt.gca().get_legend_handles_labels()
-    by_label = OrderedDict(zip(labels, handles))
+    def segments(indices, starts):
+        paths = [path for path in _lod_split(indices, starts) if len(path)]
+        return [xy[path] for path in paths], codes[[path[0] for path in paths]]
+
+    if lod:
+        ax.update_datalim(xy[np.isfinite(xy).all(axis=1)])
+        ax.autoscale_view()
+        indices, starts = _lod_indices(xy, ax, breaks)
+    else:
+        indices, starts = np.arange(len(xy)), breaks
+    paths, path_codes = segments(indices, starts)
+
+    lines = LineCollection(
+        paths, colors=colors[path_codes], linestyle=linestyle, **kwargs
+    )
+    ax.add_collection(lines)
+    points = None
+    if marker not in (None, "", "None", "none"):
+        markers = _lod_markers(xy, indices, ax) if lod else indices
+        points = ax.scatter(
+            xy[markers, 0], xy[markers, 1], c=colors[codes[markers]], marker=marker
+        )
+    ax.autoscale_view()
+
+    if lod:
+
+        def update():
+            indices, starts = _lod_indices(xy, ax, breaks)
+            paths, path_codes = segments(indices, starts)
+            lines.set_segments(paths)
+            lines.set_color(colors[path_codes])
+            if points is not None:
+                markers = _lod_markers(xy, indices, ax)
+                points.set_offsets(xy[markers])
+                points.set_facecolors(colors[codes[markers]])
+                points.set_edgecolors(colors[codes[markers]])
+
+        _connect_lod(ax, update)
+
+    by_label = OrderedDict()
+    for label, color in zip(labels, colors):
+        if label is not None and label not in by_label:
+            by_label[label] = Line2D(
+                [], [], color=color, linestyle=linestyle, marker=marker
+            )
     plt.legend(
         by_label.values(),
         by_label.keys(),
@@ -705,7 +873,7 @@ def plot_surface(
     Z = np.sqrt(U * U + V * V)
 
     fig = plt.figure()
-    ax = fig.gca(projection="3d")
+    ax = fig.add_subplot(111, projection="3d")
     ax.plot_surface(
         X, Y, Z, cmap=matplotlib.cm.coolwarm, linewidth=0, **surfaceplot_kws
     )
@@ -79,3 +79,16 @@ def test_calc_heading():
 def test_calc_turn_angle():
     turn_angle = df.traja.calc_turn_angle()
     assert isinstance(turn_angle, pd.Series)
+
+
+def test_simplify():
+    df_copy = df.copy()
+    simplified = df_copy.traja.simplify(1.0)
+    assert isinstance(simplified, traja.TrajaDataFrame)
+    assert "time" in simplified
+
+
+def test_rolling_features():
+    features = df.traja.rolling_features(window=5, features=["straightness"])
+    assert len(features) == len(df) - 4
+    assert features.straightness.between(0, 1).all()
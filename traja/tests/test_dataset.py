@@ -0,0 +1,385 @@
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import numpy.testing as npt
+import pytest
+from torch.utils.data import DataLoader
+
+import traja
+import traja.datasets
+from traja.data.loader import data_loader
+from traja.datasets.dataset import (
+    BucketBatchSampler,
+    SeqCollator,
+    TrajectoryDataset,
+    TrajectoryIterableDataset,
+    poly_fit,
+    poly_fit_batch,
+    read_file,
+    seq_collate,
+    seq_windows,
+)
+
+
+def _generate_peds(n_frames=60, n_peds=12, seed=0):
+    """Returns rows <frame_id> <ped_id> <x> <y> of pedestrians entering and leaving."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for ped in rng.permutation(n_peds):
+        enter = rng.integers(0, n_frames - 5)
+        leave = rng.integers(enter + 1, n_frames)
+        frames = np.arange(enter, leave) * 10.0
+        xy = rng.standard_normal((len(frames), 2)).cumsum(axis=0)
+        rows.append(np.column_stack([frames, np.full(len(frames), ped), xy]))
+    data = np.concatenate(rows)
+    # Rows of a frame are not sorted by pedestrian
+    return data[np.argsort(data[:, 0], kind="stable")]
+
+
+def _naive_windows(data, seq_len, skip, min_ped):
+    frames = np.unique(data[:, 0])
+    seqs, num_peds_in_seq = [], []
+    for idx in range(0, len(frames) - seq_len + 1, skip):
+        window = data[np.isin(data[:, 0], frames[idx : idx + seq_len])]
+        peds = []
+        for ped in np.unique(window[:, 1]):
+            rows = window[window[:, 1] == ped]
+            if len(np.unique(rows[:, 0])) == len(rows) == seq_len:
+                peds.append(np.around(rows[:, 2:], decimals=4).T)
+        if len(peds) > min_ped:
+            seqs.extend(peds)
+            num_peds_in_seq.append(len(peds))
+    return np.array(seqs), np.array(num_peds_in_seq)
+
+
+@pytest.mark.parametrize(
+    "delim,sep", [("\t", "\t"), ("tab", "\t"), ("space", " "), (",", ",")]
+)
+def test_read_file(tmp_path, delim, sep):
+    data = _generate_peds()
+    path = tmp_path / "peds.txt"
+    data[:, 2:] = data[:, 2:].round(8)
+    np.savetxt(path, data, fmt="%.8f", delimiter=sep)
+    npt.assert_array_equal(read_file(path, delim), data)
+    if sep.isspace():
+        # Surrounding whitespace is ignored
+        lines = path.read_text().splitlines()
+        path.write_text("\n".join(f" {line}{sep}" for line in lines))
+        npt.assert_array_equal(read_file(path, delim), data)
+
+
+@pytest.mark.parametrize("skip", [1, 3])
+@pytest.mark.parametrize("min_ped", [0, 2])
+def test_seq_windows(skip, min_ped):
+    data = _generate_peds()
+    seqs, num_peds_in_seq = seq_windows(data, 8, skip=skip, min_ped=min_ped)
+    expected_seqs, expected_num_peds = _naive_windows(data, 8, skip, min_ped)
+    npt.assert_array_equal(num_peds_in_seq, expected_num_peds)
+    npt.assert_array_equal(seqs, expected_seqs)
+
+
+def test_seq_windows_missing_frames():
+    frames = np.arange(10) * 10.0
+    xy = np.arange(20.0).reshape(10, 2)
+    rows = [np.column_stack([frames, np.full(10, ped), xy + ped]) for ped in range(4)]
+    # Pedestrian 2 misses a frame, pedestrian 3 has a frame twice, and pedestrian
+    # 4 has a frame twice and misses a later one, so has 8 rows in 8 frames
+    rows.append(rows[3] + [0, 1, 1, 1])
+    rows[2] = np.delete(rows[2], 4, axis=0)
+    rows[3] = np.insert(rows[3], 4, rows[3][4], axis=0)
+    rows[4] = np.delete(np.insert(rows[4], 3, rows[4][3], axis=0), 5, axis=0)
+    data = np.concatenate(rows)
+    seqs, num_peds_in_seq = seq_windows(data[np.argsort(data[:, 0])], 8)
+    npt.assert_array_equal(num_peds_in_seq, [2, 2, 2])
+    expected = [(xy[i : i + 8] + ped).T for i in range(3) for ped in range(2)]
+    npt.assert_array_equal(seqs, expected)
+
+
+def test_poly_fit_batch():
+    data = _generate_peds()
+    seqs, _ = seq_windows(data, 8)
+    expected = [poly_fit(seq, 5, 0.002) for seq in seqs]
+    npt.assert_array_equal(poly_fit_batch(seqs, 5, 0.002), expected)
+
+
+def test_trajectory_dataset(tmp_path):
+    for i in range(2):
+        np.savetxt(tmp_path / f"{i}.txt", _generate_peds(seed=i), delimiter="\t")
+    dataset = TrajectoryDataset(str(tmp_path), obs_len=4, pred_len=4, min_ped=1)
+    assert len(dataset) == len(dataset.seq_start_end)
+    obs_traj, pred_traj, obs_traj_rel, pred_traj_rel, non_linear, loss_mask = dataset[0]
+    assert obs_traj.shape[1:] == (2, 4)
+    assert pred_traj.shape == obs_traj.shape
+    npt.assert_allclose(obs_traj_rel[:, :, 1:], np.diff(obs_traj, axis=2), atol=1e-5)
+    assert loss_mask.shape == (len(obs_traj), 8)
+    assert len(non_linear) == len(obs_traj) > 1
+
+
+def test_trajectory_dataset_cache(tmp_path, monkeypatch):
+    data_dir, cache_dir = tmp_path / "data", tmp_path / "cache"
+    data_dir.mkdir()
+    for i in range(2):
+        np.savetxt(data_dir / f"{i}.txt", _generate_peds(seed=i), delimiter="\t")
+    dataset = TrajectoryDataset(str(data_dir), obs_len=4, pred_len=4, min_ped=1)
+    cached = TrajectoryDataset(
+        str(data_dir), obs_len=4, pred_len=4, min_ped=1, cache_dir=str(cache_dir)
+    )
+    (key,) = [p.name for p in cache_dir.iterdir()]
+    assert len(key) == 64
+
+    # Cached arrays are loaded without parsing files
+    def fail(*args, **kwargs):
+        raise AssertionError("files parsed despite the cache")
+
+    monkeypatch.setattr("traja.datasets.dataset.read_file", fail)
+    loaded = TrajectoryDataset(
+        str(data_dir), obs_len=4, pred_len=4, min_ped=1, cache_dir=str(cache_dir)
+    )
+    assert loaded.seq_start_end == cached.seq_start_end == dataset.seq_start_end
+    for expected, actual in zip(dataset[3], loaded[3]):
+        npt.assert_array_equal(actual.numpy(), expected.numpy())
+    monkeypatch.undo()
+
+    # Other arguments, or changed files, are cached separately
+    TrajectoryDataset(
+        str(data_dir), obs_len=4, pred_len=3, min_ped=1, cache_dir=str(cache_dir)
+    )
+    np.savetxt(data_dir / "0.txt", _generate_peds(seed=2), delimiter="\t")
+    TrajectoryDataset(
+        str(data_dir), obs_len=4, pred_len=4, min_ped=1, cache_dir=str(cache_dir)
+    )
+    assert len(list(cache_dir.iterdir())) == 3
+
+
+@pytest.mark.parametrize("cache_name", ["cache", None])
+def test_trajectory_dataset_cache_in_data_dir(tmp_path, cache_name):
+    for i in range(2):
+        np.savetxt(tmp_path / f"{i}.txt", _generate_peds(seed=i), delimiter="\t")
+    expected = TrajectoryDataset(str(tmp_path), obs_len=4, pred_len=4, min_ped=1)
+    cache_dir = tmp_path / cache_name if cache_name else tmp_path
+    for _ in range(2):
+        dataset = TrajectoryDataset(
+            str(tmp_path), obs_len=4, pred_len=4, min_ped=1, cache_dir=str(cache_dir)
+        )
+        assert dataset.seq_start_end == expected.seq_start_end
+    assert len([p for p in cache_dir.iterdir() if p.is_dir()]) == 1
+
+
+def test_trajectory_dataset_n_jobs(tmp_path):
+    for i in range(3):
+        np.savetxt(tmp_path / f"{i}.txt", _generate_peds(seed=i), delimiter="\t")
+    expected = TrajectoryDataset(str(tmp_path), obs_len=4, pred_len=4, min_ped=1)
+    dataset = TrajectoryDataset(
+        str(tmp_path), obs_len=4, pred_len=4, min_ped=1, n_jobs=2
+    )
+    assert dataset.seq_start_end == expected.seq_start_end
+    npt.assert_array_equal(dataset.obs_traj.numpy(), expected.obs_traj.numpy())
+    npt.assert_array_equal(dataset.pred_traj.numpy(), expected.pred_traj.numpy())
+
+
+def test_load_ped_data(tmp_path, monkeypatch):
+    # Splits are found by name in paths relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    splits = ["train", "val", "test"]
+    paths = [os.path.join("datasets", "eth", split) for split in splits]
+    for i, path in enumerate(paths):
+        os.makedirs(path)
+        for j in range(2):
+            data = _generate_peds(seed=10 * i + j)
+            np.savetxt(os.path.join(path, f"{j}.txt"), data, delimiter="\t")
+    monkeypatch.setattr(traja.datasets, "load_ped_datasets", lambda: paths)
+    dfs = traja.datasets.load_ped_data(n_jobs=2)
+    for i, split in enumerate(splits):
+        assert len(dfs[split]) == 2
+        for j, df in enumerate(dfs[split]):
+            assert list(df.columns) == ["frame_id", "ped_id", "x", "y"]
+            npt.assert_allclose(df.to_numpy(), _generate_peds(seed=10 * i + j))
+
+
+def _sequences(items):
+    """Returns sequences as sortable tuples of their observed coordinates."""
+    return sorted(tuple(item[0].numpy().ravel()) for item in items)
+
+
+def test_trajectory_iterable_dataset(tmp_path):
+    for i in range(3):
+        np.savetxt(tmp_path / f"{i}.txt", _generate_peds(seed=i), delimiter="\t")
+    kwargs = dict(obs_len=4, pred_len=4, min_ped=1)
+    dataset = TrajectoryDataset(str(tmp_path), **kwargs)
+    expected = [dataset[i] for i in range(len(dataset))]
+
+    # Unshuffled, sequences stream in the order of the dataset
+    streamed = list(TrajectoryIterableDataset(str(tmp_path), **kwargs))
+    assert len(streamed) == len(expected)
+    for items, expected_items in zip(streamed, expected):
+        for item, expected_item in zip(items, expected_items):
+            npt.assert_array_equal(item.numpy(), expected_item.numpy())
+
+    shuffled = TrajectoryIterableDataset(
+        str(tmp_path), shuffle_buffer=16, seed=0, **kwargs
+    )
+    first = list(shuffled)
+    assert _sequences(first) == _sequences(expected)
+    assert _sequences(first[:5]) != _sequences(expected[:5])
+    # Each iteration is the next epoch
+    assert not all(a[0].equal(b[0]) for a, b in zip(first, shuffled))
+    shuffled.set_epoch(0)
+    assert all(a[0].equal(b[0]) for a, b in zip(first, shuffled))
+
+
+def test_trajectory_iterable_dataset_subdirectory(tmp_path):
+    for i in range(2):
+        np.savetxt(tmp_path / f"{i}.txt", _generate_peds(seed=i), delimiter="\t")
+    (tmp_path / "cache").mkdir()
+    kwargs = dict(obs_len=4, pred_len=4, min_ped=1)
+    streamed = TrajectoryIterableDataset(str(tmp_path), **kwargs)
+    assert streamed.files == [str(tmp_path / f"{i}.txt") for i in range(2)]
+    assert len(list(streamed)) == len(TrajectoryDataset(str(tmp_path), **kwargs))
+
+
+def test_trajectory_iterable_dataset_workers(tmp_path):
+    for i in range(3):
+        np.savetxt(tmp_path / f"{i}.txt", _generate_peds(seed=i), delimiter="\t")
+    kwargs = dict(obs_len=4, pred_len=4, min_ped=1)
+    dataset = TrajectoryDataset(str(tmp_path), **kwargs)
+    expected = [dataset[i] for i in range(len(dataset))]
+    streamed = TrajectoryIterableDataset(str(tmp_path), shuffle_buffer=8, **kwargs)
+    loader = DataLoader(streamed, batch_size=4, num_workers=2, collate_fn=seq_collate)
+
+    # Each sequence is yielded by exactly one worker
+    observed = []
+    for obs_traj, *_, seq_start_end in loader:
+        for start, end in seq_start_end.tolist():
+            observed.append([obs_traj[:, start:end].permute(1, 2, 0)])
+    assert _sequences(observed) == _sequences(expected)
+
+
+@pytest.mark.parametrize("num_workers", [0, 2])
+def test_data_loader_streaming_epochs(tmp_path, num_workers):
+    for i in range(3):
+        np.savetxt(tmp_path / f"{i}.txt", _generate_peds(seed=i), delimiter="\t")
+    args = SimpleNamespace(
+        obs_len=4,
+        pred_len=4,
+        skip=1,
+        delim="\t",
+        batch_size=4,
+        loader_num_workers=num_workers,
+        streaming=True,
+        shuffle_buffer=16,
+    )
+    _, loader = data_loader(args, str(tmp_path))
+    epochs = [[batch[0] for batch in loader] for _ in range(2)]
+    assert not all(a.equal(b) for a, b in zip(*epochs))
+    assert sum(len(obs_traj[0]) for obs_traj in epochs[1]) == sum(
+        len(obs_traj[0]) for obs_traj in epochs[0]
+    )
+
+
+def test_bucket_batch_sampler():
+    rng = np.random.default_rng(0)
+    num_peds = rng.integers(2, 60, 200)
+
+    sampler = BucketBatchSampler(num_peds, batch_size=16, seed=0)
+    batches = list(sampler)
+    assert len(batches) == len(sampler) == 13
+    assert sorted(i for batch in batches for i in batch) == list(range(200))
+    # Batches cover narrow ranges of pedestrian counts
+    spreads = [np.ptp(num_peds[batch]) for batch in batches]
+    assert max(spreads) <= 10
+    # Each iteration is the next epoch
+    assert batches != list(sampler)
+    sampler.set_epoch(0)
+    assert batches == list(sampler)
+
+    sampler = BucketBatchSampler(num_peds, batch_size=16, drop_last=True)
+    assert all(len(batch) == 16 for batch in sampler) and len(sampler) == 12
+
+    sampler = BucketBatchSampler(num_peds, max_cost=3600)
+    batches = list(sampler)
+    assert len(batches) == len(sampler)
+    assert sorted(i for batch in batches for i in batch) == list(range(200))
+    costs = [np.sum(num_peds[batch] ** 2) for batch in batches]
+    assert max(costs) <= 3600
+    # Batches are full: the next sequence in sorted order would exceed the budget
+    batches = list(BucketBatchSampler(num_peds, max_cost=3600, shuffle=False))
+    for batch, next_batch in zip(batches, batches[1:]):
+        assert np.sum(num_peds[batch + next_batch[:1]] ** 2) > 3600
+
+    # Sequences over budget are batched alone
+    assert list(BucketBatchSampler([2, 70], max_cost=100, shuffle=False)) == [[0], [1]]
+    with pytest.raises(ValueError):
+        BucketBatchSampler(num_peds)
+
+
+def _assert_batches_equal(actual, expected):
+    for out, expected_out in zip(actual, expected):
+        assert out.shape == expected_out.shape
+        npt.assert_array_equal(out.numpy(), expected_out.numpy())
+
+
+def test_seq_collator(tmp_path):
+    np.savetxt(tmp_path / "0.txt", _generate_peds(n_peds=30), delimiter="\t")
+    dataset = TrajectoryDataset(str(tmp_path), obs_len=4, pred_len=4, min_ped=1)
+    batches = [list(range(len(dataset))), [5, 0, 3], [1, 2]]
+    expected = [seq_collate([dataset[i] for i in batch]) for batch in batches]
+
+    for collate, by_index in [(SeqCollator(), False), (SeqCollator(dataset), True)]:
+        collated = []
+        for batch in batches:
+            collated.append(collate(batch if by_index else [dataset[i] for i in batch]))
+            _assert_batches_equal(collated[-1], expected[len(collated) - 1])
+        # Buffers of the last two batches are in use, those of the first were reused
+        _assert_batches_equal(collated[1], expected[1])
+        assert collated[2][0].data_ptr() == collated[0][0].data_ptr()
+        with pytest.raises(ValueError, match="empty batch"):
+            collate([])
+
+    # In worker processes, every batch has its own buffers
+    loader = DataLoader(
+        range(len(dataset)),
+        batch_size=2,
+        num_workers=2,
+        collate_fn=SeqCollator(dataset),
+    )
+    batches = list(loader)
+    for i, batch in enumerate(batches):
+        expected = seq_collate([dataset[j] for j in range(2 * i, 2 * i + 2)])
+        _assert_batches_equal(batch, expected)
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        dict(streaming=True),
+        dict(streaming=False),
+        dict(bucket_batches=True),
+        dict(max_ped_cost=20),
+        dict(gather_batches=True, bucket_batches=True),
+    ],
+)
+def test_data_loader(tmp_path, options):
+    np.savetxt(tmp_path / "0.txt", _generate_peds(), delimiter="\t")
+    args = SimpleNamespace(
+        obs_len=4,
+        pred_len=4,
+        skip=1,
+        delim="\t",
+        batch_size=4,
+        loader_num_workers=0,
+        **options,
+    )
+    _, loader = data_loader(args, str(tmp_path))
+    num_seqs = 0
+    # The last, smaller batch may come first when batches are shuffled
+    for obs_traj, pred_traj, *_, seq_start_end in loader:
+        assert obs_traj.shape[0] == pred_traj.shape[0] == 4
+        assert obs_traj.shape[1] == seq_start_end[-1, 1]
+        if "max_ped_cost" in options:
+            counts = np.diff(seq_start_end.numpy(), axis=1)
+            assert (counts ** 2).sum() <= 20 or len(counts) == 1
+        else:
+            assert len(seq_start_end) <= 4
+        num_seqs += len(seq_start_end)
+    assert num_seqs == len(TrajectoryDataset(str(tmp_path), obs_len=4, pred_len=4))
@@ -0,0 +1,36 @@
+import subprocess
+import sys
+
+import traja
+
+# Only scipy.spatial.distance is imported, for ``euclidean``
+HEAVY_MODULES = (
+    "matplotlib",
+    "scipy.signal",
+    "scipy.interpolate",
+    "torch",
+    "shapely",
+    "seaborn",
+    "statsmodels",
+)
+
+
+def test_import_does_not_load_heavy_modules():
+    code = (
+        "import sys, traja; "
+        "assert not hasattr(traja, 'foo'); "
+        f"print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert out.stdout.strip() == ""
+
+
+def test_lazy_attributes():
+    assert callable(traja.plot)
+    assert callable(traja.euclidean)
+    assert "euclidean" in traja.trajectory.__all__
+    assert traja.plotting.plot is traja.plot
+    assert "plotting" in dir(traja)
+    assert traja._PLOTTING_EXPORTS == tuple(traja.plotting.__all__)
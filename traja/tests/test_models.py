@@ -0,0 +1,133 @@
+import copy
+
+import numpy as np
+import numpy.testing as npt
+import pytest
+import torch
+
+from traja.models.nn import (
+    PoolHiddenNet,
+    SocialPooling,
+    TrajectoryLSTM,
+    segment_batch_norm,
+    seq_chunks,
+    seq_pairs,
+)
+
+
+def _batch(seq_peds, h_dim, seed=0):
+    generator = torch.Generator().manual_seed(seed)
+    ends = torch.cumsum(torch.tensor(seq_peds), 0)
+    seq_start_end = torch.stack([ends - torch.tensor(seq_peds), ends], dim=1)
+    num_peds = int(ends[-1])
+    h_states = torch.randn(1, num_peds, h_dim, generator=generator)
+    end_pos = torch.randn(num_peds, 2, generator=generator)
+    return h_states, seq_start_end, end_pos
+
+
+def test_seq_pairs():
+    seq_start_end = torch.tensor([[0, 2], [2, 3], [5, 7]])
+    ped, other, row, num_peds = seq_pairs(seq_start_end)
+    assert ped.tolist() == [0, 0, 1, 1, 2, 5, 5, 6, 6]
+    assert other.tolist() == [0, 1, 0, 1, 2, 5, 6, 5, 6]
+    assert row.tolist() == [0, 0, 1, 1, 2, 3, 3, 4, 4]
+    assert num_peds == 5
+
+
+def test_seq_chunks():
+    seq_start_end = torch.tensor([[0, 2], [2, 3], [3, 8], [8, 10]])
+    assert seq_chunks(seq_start_end, 5) == [(0, 2), (2, 3), (3, 4)]
+    assert seq_chunks(seq_start_end, 100) == [(0, 4)]
+
+
+@pytest.mark.parametrize("max_pairs", [10, 2048])
+@pytest.mark.parametrize(
+    "batch_norm,train", [(False, True), (True, False), (True, True)]
+)
+def test_pool_hidden_net(batch_norm, train, max_pairs):
+    torch.manual_seed(0)
+    pool_net = PoolHiddenNet(
+        embedding_dim=8,
+        h_dim=16,
+        bottleneck_dim=32,
+        batch_norm=batch_norm,
+        max_pairs=max_pairs,
+    )
+    pool_net.train(train)
+    sequences_net = copy.deepcopy(pool_net)
+    h_states, seq_start_end, end_pos = _batch([3, 2, 5, 4], 16)
+    h_states.requires_grad_()
+
+    expected = sequences_net._forward_sequences(h_states, seq_start_end, end_pos)
+    (expected_grad,) = torch.autograd.grad(expected.sum(), h_states)
+    pool_h = pool_net(h_states, seq_start_end, end_pos)
+    (grad,) = torch.autograd.grad(pool_h.sum(), h_states)
+    assert pool_h.shape == (14, 32)
+    torch.testing.assert_close(pool_h, expected)
+    torch.testing.assert_close(grad, expected_grad)
+    # Including running statistics of batch normalization
+    for name, buffer in sequences_net.named_buffers():
+        torch.testing.assert_close(dict(pool_net.named_buffers())[name], buffer)
+
+
+@pytest.mark.parametrize("momentum", [0.1, None])
+def test_segment_batch_norm(momentum):
+    torch.manual_seed(0)
+    bn = torch.nn.BatchNorm1d(6, momentum=momentum)
+    expected_bn = copy.deepcopy(bn)
+    counts = [4, 9, 2, 25]
+    x = torch.randn(sum(counts), 6)
+
+    out = segment_batch_norm(bn, x, counts)
+    expected = torch.cat([expected_bn(rows) for rows in x.split(counts)])
+    torch.testing.assert_close(out, expected)
+    for name, buffer in expected_bn.named_buffers():
+        torch.testing.assert_close(dict(bn.named_buffers())[name], buffer)
+
+    # Running statistics are used in evaluation mode
+    bn.eval()
+    expected_bn.eval()
+    torch.testing.assert_close(segment_batch_norm(bn, x, counts), expected_bn(x))
+
+    bn.train()
+    with pytest.raises(ValueError):
+        segment_batch_norm(bn, x[:5], [4, 1])
+
+
+@pytest.mark.parametrize("train", [True, False])
+def test_social_pooling(train):
+    torch.manual_seed(0)
+    pool_net = SocialPooling(h_dim=16, grid_size=4, neighborhood_size=2.0)
+    pool_net.train(train)
+    h_states, seq_start_end, end_pos = _batch([3, 2, 5, 4, 1, 12], 16)
+    h_states.requires_grad_()
+
+    expected = pool_net._forward_sequences(h_states, seq_start_end, end_pos)
+    (expected_grad,) = torch.autograd.grad(expected.sum(), h_states)
+    pool_h = pool_net(h_states, seq_start_end, end_pos)
+    (grad,) = torch.autograd.grad(pool_h.sum(), h_states)
+    assert pool_h.shape == (27, 16)
+    torch.testing.assert_close(pool_h, expected)
+    torch.testing.assert_close(grad, expected_grad)
+
+
+def test_trajectory_lstm(capsys):
+    xy = np.column_stack([np.arange(50.0), np.arange(50.0) ** 2])
+    lstm = TrajectoryLSTM(xy, nb_steps=5, batch_size=4, epochs=4)
+
+    t_1_b, t_b = lstm.load_batch(starts=[0, 10, 20])
+    assert t_1_b.shape == (5, 3, 2)
+    # Targets are the next positions, ordered like the flattened predictions
+    npt.assert_array_equal(t_b.view(5, 3, 2)[:-1], t_1_b[1:])
+    npt.assert_array_equal(t_1_b[:, 1, 0], np.arange(10, 15))
+    assert lstm.load_batch()[0].shape == (5, 4, 2)
+
+    # The optimizer, and its moment estimates, persist across epochs and calls
+    optimizer = lstm.optimizer
+    state = lambda: optimizer.state[next(lstm.rnn.parameters())]
+    lstm.train(log_every=2)
+    assert lstm.optimizer is optimizer and int(state()["step"]) == 4
+    # 45 windows in batches of 4
+    lstm.train(epochs=1, full_epochs=True, log_every=1)
+    assert int(state()["step"]) == 4 + 12
+    assert "samples/s" in capsys.readouterr().out
@@ -6,6 +6,7 @@ import matplotlib
 
 matplotlib.use("Agg")
 import matplotlib.pyplot as plt
+from matplotlib.path import Path
 import pandas as pd
 
 import traja
@@ -37,6 +38,17 @@ def test_plot_3d():
     traja.plot_3d(df, interactive=False)
 
 
+def test_plot_3d_max_segments():
+    df = traja.generate(n=1000)
+    ax = traja.plot_3d(df, max_segments=100)
+    (lines,) = ax.collections
+    assert len(lines.get_array()) == 100
+    npt.assert_allclose(ax.get_zlim(), (df.index[0], df.index[-1]))
+
+    ax = traja.plot_3d(df, max_segments=None)
+    assert len(ax.collections[0].get_array()) == 999
+
+
 def test_plot_flow():
     traja.plot_flow(df, interactive=False)
 
@@ -128,3 +140,86 @@ def test_plot():
             ]
         ),
     )
+
+
+def test_plot_lod():
+    df = traja.generate(n=5000)
+    collection = traja.plot(df, interactive=False, lod=True)
+    n_points = len(collection.get_offsets())
+    assert 0 < n_points < len(df)
+
+    # Zooming in recomputes the drawn points
+    ax = collection.axes
+    ax.set_xlim(0, 10)
+    ax.set_ylim(0, 10)
+    offsets = collection.get_offsets()
+    assert len(offsets) < n_points
+    assert ((offsets >= 0) & (offsets <= 10)).all(axis=1).any()
+
+
+def _lod_segments(ax):
+    """Returns the drawn segments of the LOD path of `ax` in display coordinates."""
+    (path,) = [patch.get_path() for patch in ax.patches]
+    vertices = ax.transData.transform(path.vertices)
+    joined = path.codes[1:] == Path.LINETO
+    return np.stack([vertices[:-1], vertices[1:]], axis=1)[joined]
+
+
+def test_plot_lod_bound():
+    # A dense noisy trajectory with hundreds of points per pixel column
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 100, 100_000) + rng.normal(0, 0.001, 100_000)
+    df = traja.from_xy(np.column_stack([x, rng.normal(0, 1, 100_000)]))
+    collection = traja.plot(df, interactive=False, lod=True)
+    ax = collection.axes
+    width, height = ax.get_window_extent().size
+    assert len(_lod_segments(ax)) <= 8 * (int(width) + 2)
+    assert len(collection.get_offsets()) <= (int(width) + 2) * (int(height) + 2)
+
+
+def test_plot_lod_geometry():
+    # Three horizontal passes over the same columns
+    x = np.linspace(0, 100, 5000)
+    xy = np.concatenate(
+        [
+            np.column_stack([x[::step], np.full(5000, y)])
+            for step, y in [(1, 0.0), (-1, 50.0), (1, 100.0)]
+        ]
+    )
+    collection = traja.plot(traja.from_xy(xy), interactive=False, lod=True)
+    ax = collection.axes
+    segments = _lod_segments(ax)
+    # No chords across the view
+    assert np.abs(np.diff(segments[:, :, 0], axis=1)).max() <= 2
+    # Every point of the path is drawn
+    a, b = segments[:, 0], segments[:, 1]
+    ab = b - a
+    for points in np.array_split(ax.transData.transform(xy), 15):
+        ap = points[:, None] - a
+        s = np.clip((ap * ab).sum(-1) / np.maximum((ab * ab).sum(-1), 1e-12), 0, 1)
+        distance = np.linalg.norm(ap - s[..., None] * ab, axis=-1).min(axis=1)
+        assert distance.max() <= 1.5
+
+
+def test_plot_collection():
+    trjs = {f"car{i}": traja.generate(n=100, seed=i) for i in range(3)}
+    coll = traja.TrajaCollection(trjs)
+    lines = traja.plot_collection(coll, colors=["car"])
+    segments = lines.get_segments()
+    assert len(segments) == 3
+    for segment, trj in zip(segments, trjs.values()):
+        npt.assert_allclose(segment, trj.traja.xy)
+
+    lines = traja.plot_collection(coll, lod=True)
+    assert len(lines.get_segments()) == 3
+    assert sum(len(segment) for segment in lines.get_segments()) <= 300
+
+
+def test_plot_rolling_hull():
+    df = traja.generate(n=200)
+    plt.figure()
+    traja.plotting.plot_rolling_hull(df, window=20, step=10)
+    (outlines,) = plt.gca().collections
+    assert len(outlines.get_segments()) == 19
+    traja.plotting.plot_rolling_hull(df, window=20, step=10, areas=True)
+    traja.plotting.plot_rolling_hull_3d(df, window=20, step=10)
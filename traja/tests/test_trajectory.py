@@ -1,5 +1,6 @@
 import numpy as np
 import numpy.testing as npt
+import pandas as pd
 import pytest
 from pandas.util.testing import assert_series_equal
 
@@ -113,6 +114,58 @@ def test_smooth_sg(w):
         assert trj.shape == df_copy.shape
 
 
+def test_smooth_sg_gaps():
+    df_copy = traja.generate(n=200)
+    df_copy.loc[100:105, "x"] = np.nan
+    # The filter spreads missing rows by w // 2 on both sides of the gap
+    trj = traja.smooth_sg(df_copy, w=31)
+    assert trj.x.isna().sum() == 36
+    assert trj.x[85:121].isna().all()
+
+    trj = traja.smooth_sg(df_copy, w=31, fill=True)
+    assert trj.x.notna().all()
+
+
+@pytest.mark.parametrize("chunk_size", [11, 30, 1000])
+def test_smooth_sg_chunks(chunk_size):
+    df_copy = traja.generate(n=500)
+    expected = traja.smooth_sg(df_copy, w=11)
+    actual = traja.smooth_sg(df_copy, w=11, chunk_size=chunk_size)
+    npt.assert_array_equal(actual[["x", "y"]], expected[["x", "y"]])
+
+    chunks = [df_copy.iloc[i : i + chunk_size] for i in range(0, 500, chunk_size)]
+    actual = pd.concat(list(traja.smooth_sg_stream(iter(chunks), w=11)))
+    assert list(actual.index) == list(df_copy.index)
+    npt.assert_allclose(actual[["x", "y"]], expected[["x", "y"]])
+
+    coll = pd.concat(
+        [traja.generate(n=100, seed=i).assign(id=i) for i in range(3)],
+        ignore_index=True,
+    )
+    actual = traja.smooth_sg(coll, w=11, id_col="id", chunk_size=chunk_size)
+    for i in range(3):
+        expected = traja.smooth_sg(traja.generate(n=100, seed=i), w=11)
+        npt.assert_allclose(
+            actual.loc[actual["id"] == i, ["x", "y"]], expected[["x", "y"]]
+        )
+
+
+def test_smooth_one_euro():
+    df_copy = traja.generate(n=200)
+    smoothed = traja.smooth_one_euro(df_copy, min_cutoff=1.0, beta=0.01)
+    assert smoothed.shape == df_copy.shape
+    # Smoothing shortens the path
+    assert traja.length(smoothed) < traja.length(df_copy)
+
+    # Filtering incrementally gives the same result
+    f = traja.OneEuroFilter(min_cutoff=1.0, beta=0.01)
+    xy = df_copy[["x", "y"]].to_numpy()
+    chunks = [
+        f.filter(xy[i : i + 50], df_copy.time[i : i + 50]) for i in range(0, 200, 50)
+    ]
+    npt.assert_allclose(np.concatenate(chunks), smoothed[["x", "y"]])
+
+
 @pytest.mark.parametrize("lag", [1, 2])
 def test_angles(lag):
     df_copy = df.copy()
@@ -236,6 +289,36 @@ def test_resample_time():
     assert isinstance(trj, traja.TrajaDataFrame)
 
 
+@pytest.mark.parametrize("method", ["linear", "cubic"])
+def test_resample_interp(method):
+    rng = np.random.default_rng(0)
+    trjs = []
+    for i in range(3):
+        t = np.sort(rng.uniform(0, 10, 50))
+        trjs.append(traja.TrajaDataFrame({"x": np.sin(t), "y": t, "time": t, "id": i}))
+    coll = traja.TrajaDataFrame(pd.concat(trjs).sample(frac=1, random_state=0))
+    # Duplicate timestamps keep the first row
+    coll = pd.concat([coll, coll.assign(x=np.nan)], ignore_index=True)
+
+    resampled = traja.resample_interp(coll, 0.1, method=method, id_col="id")
+    assert list(resampled.columns) == ["id", "time", "x", "y"]
+    for i, trj in enumerate(trjs):
+        actual = resampled[resampled["id"] == i]
+        t = np.arange(trj.time.iloc[0], trj.time.iloc[-1] + 1e-9, 0.1)
+        npt.assert_allclose(actual.time, t)
+        npt.assert_allclose(actual.y, t)
+        if method == "linear":
+            npt.assert_allclose(actual.x, np.interp(t, trj.time, trj.x))
+        else:
+            npt.assert_allclose(actual.x, np.sin(t), atol=5e-3)
+
+    df_copy = df.copy()
+    df_copy["time"] = pd.to_datetime(df_copy.time, unit="s")
+    resampled = traja.resample_interp(df_copy.set_index("time"), "10L", method=method)
+    assert (np.diff(resampled.index) == pd.Timedelta("10ms")).all()
+    npt.assert_allclose(resampled.x.iloc[::2], df.x)
+
+
 def test_transitions():
     df_copy = df.copy()
     transitions = traja.transitions(df_copy)
@@ -322,6 +405,11 @@ def test_rediscretize_points():
 
     npt.assert_allclose(actual, expected, rtol=1e-1)
 
+    # All steps are of length R
+    rt = traja.rediscretize_points(df_copy, R=0.5, time_out=True)
+    npt.assert_allclose(np.hypot(*np.diff(rt.traja.xy, axis=0).T), 0.5)
+    assert rt.time.is_monotonic_increasing
+
 
 def test_calc_turn_angle():
     df_copy = df.copy()
@@ -500,6 +588,16 @@ def test_get_derivatives():
 
     npt.assert_allclose(actual, expected, rtol=1e-1)
 
+    derivs = traja.get_derivatives(df_copy, dtype=np.float32)
+    assert (derivs.dtypes == np.float32).all()
+    npt.assert_allclose(derivs[:10].to_numpy(), expected, rtol=1e-1)
+
+    # Repeated timestamps give missing, rather than infinite, speeds
+    df_copy.loc[3, "time"] = df_copy.loc[2, "time"]
+    derivs = traja.get_derivatives(df_copy)
+    assert np.isnan(derivs.speed[3])
+    assert not np.isinf(derivs.to_numpy()).any()
+
 
 def test_coords_to_flow():
     df_copy = df.copy()
@@ -638,3 +736,302 @@ def test_from_xy():
     expected = traja.from_xy(df_copy.traja.xy).values
     actual = df_copy.traja.xy
     npt.assert_allclose(expected, actual)
+
+
+def test_simplify():
+    df_copy = traja.generate(n=200)
+    simplified = traja.simplify(df_copy, epsilon=1.0)
+    assert isinstance(simplified, traja.TrajaDataFrame)
+    assert 2 < len(simplified) < len(df_copy)
+    npt.assert_allclose(simplified.time, df_copy.time[simplified.index])
+
+    from traja.contrib.rdp import rdp_iter, pldist
+
+    # Vectorized search matches the per-point reference implementation
+    expected = rdp_iter(
+        df_copy.traja.xy, 1.0, dist=lambda *args: pldist(*args), return_mask=True
+    )
+    npt.assert_equal(simplified.index, np.flatnonzero(expected))
+
+    coll = traja.TrajaCollection({i: traja.generate(n=100, seed=i) for i in range(3)})
+    simplified = traja.simplify(coll, epsilon=1.0, id_col="id")
+    for i in range(3):
+        expected = traja.simplify(traja.generate(n=100, seed=i), epsilon=1.0)
+        npt.assert_allclose(simplified[simplified.id == i].traja.xy, expected.traja.xy)
+
+
+@pytest.mark.parametrize("method", ["rdp", "vw"])
+def test_simplify_n_points(method):
+    df_copy = traja.generate(n=200)
+    indices = traja.simplify_indices(df_copy, n_points=20, method=method)
+    assert len(indices) == 20
+    assert indices[0] == 0 and indices[-1] == 199
+    assert (np.diff(indices) > 0).all()
+
+    simplified = traja.simplify(df_copy, n_points=20, method=method)
+    npt.assert_allclose(simplified.traja.xy, df_copy.traja.xy[indices])
+
+    coll = traja.TrajaCollection({i: traja.generate(n=100, seed=i) for i in range(3)})
+    simplified = traja.simplify(coll, n_points=10, id_col="id", method=method)
+    assert (simplified.groupby("id").size() == 10).all()
+
+
+def test_simplify_rdp_n_points_matches_epsilon():
+    xy = traja.generate(n=200).traja.xy
+    by_epsilon = traja.simplify_indices(xy, epsilon=1.0)
+    # Splitting the farthest segment first reaches the same result
+    by_count = traja.simplify_indices(xy, epsilon=1.0, n_points=len(xy))
+    npt.assert_equal(by_epsilon, by_count)
+
+
+def test_simplify_vw():
+    from traja.contrib.vw import vw
+
+    xy = np.array([[0, 0], [1, 0.1], [2, 0], [3, 3], [4, 3.01], [5, 3]])
+    npt.assert_equal(traja.simplify_indices(xy, epsilon=0.5, method="vw"), [0, 2, 3, 5])
+    npt.assert_allclose(vw(xy, epsilon=0.5), xy[[0, 2, 3, 5]])
+    with pytest.raises(ValueError):
+        traja.simplify_indices(xy)
+
+
+def test_rolling_hull_area():
+    from shapely.geometry import MultiPoint
+
+    df_copy = traja.generate(n=300)
+    df_copy.loc[150, "x"] = np.nan
+    areas, perimeters = traja.rolling_hull_area(df_copy, window=20, step=3)
+    xy = df_copy.traja.xy
+    starts = range(0, len(df_copy) - 20 + 1, 3)
+    assert len(areas) == len(perimeters) == len(starts)
+    for area, perimeter, start in zip(areas, perimeters, starts):
+        window = xy[start : start + 20]
+        if np.isnan(window).any():
+            assert np.isnan(area) and np.isnan(perimeter)
+            continue
+        hull = MultiPoint(window).convex_hull
+        npt.assert_allclose(area, hull.area)
+        npt.assert_allclose(perimeter, hull.length)
+
+
+def _naive_window_features(window):
+    xy = window[["x", "y"]].to_numpy()
+    steps = np.diff(xy, axis=0)
+    step_lengths = np.linalg.norm(steps, axis=1)
+    turns = np.diff(np.arctan2(steps[:, 1], steps[:, 0]))
+    p = step_lengths.mean()
+    b = step_lengths.std(ddof=1) / p
+    c, s = np.cos(turns).mean(), np.sin(turns).mean()
+    duration = window.time.iloc[-1] - window.time.iloc[0]
+    return dict(
+        length=step_lengths.sum(),
+        distance=np.linalg.norm(xy[-1] - xy[0]),
+        straightness=np.linalg.norm(xy[-1] - xy[0]) / step_lengths.sum(),
+        emax=c / (1 - c),
+        sinuosity=2 / np.sqrt(p * ((1 - c ** 2 - s ** 2) / ((1 - c) ** 2 + s ** 2) + b ** 2)),
+        mean_speed=step_lengths.sum() / duration,
+        hull_area=traja.to_shapely(window).convex_hull.area,
+        radius_of_gyration=np.sqrt(((xy - xy.mean(axis=0)) ** 2).sum(axis=1).mean()),
+    )
+
+
+def test_rolling_features():
+    df_copy = traja.generate(n=300)
+    features = traja.rolling_features(df_copy, window=30, step=7)
+    assert list(features.columns) == list(traja.trajectory.ROLLING_FEATURES)
+    npt.assert_equal(features.index, np.arange(0, 271, 7))
+    for start, row in features.iterrows():
+        expected = _naive_window_features(df_copy.iloc[start : start + 30])
+        npt.assert_allclose(row[list(expected)], list(expected.values()))
+
+    # Time-based windows cover [t, t + window)
+    features = traja.rolling_features(df_copy, window="1s", step=50)
+    for start, row in features.iterrows():
+        time = df_copy.time
+        window = df_copy[(time >= time[start]) & (time < time[start] + 1)]
+        expected = _naive_window_features(window)
+        npt.assert_allclose(row[list(expected)], list(expected.values()))
+
+    coll = traja.TrajaCollection({i: traja.generate(n=100, seed=i) for i in range(3)})
+    features = traja.rolling_features(
+        coll, window=20, step=5, features=["hull_area"], id_col="id", n_jobs=2
+    )
+    for i in range(3):
+        expected = traja.rolling_hull_area(traja.generate(n=100, seed=i), 20, 5)[0]
+        npt.assert_allclose(features[features.id == i].hull_area, expected)
+
+    with pytest.raises(ValueError):
+        traja.rolling_features(df_copy, features=["curvature"])
+
+    # Step lengths of rediscretized paths are constant up to rounding
+    rt = traja.rediscretize_points(traja.generate(3000, seed=1), R=0.7)
+    rt["time"] = np.arange(len(rt), dtype=float)
+    features = traja.rolling_features(rt, window=30, features=["sinuosity"])
+    assert features.sinuosity.notna().all()
+    for start in [0, 1000, len(features) - 1]:
+        expected = _naive_window_features(rt.iloc[start : start + 30])
+        npt.assert_allclose(features.sinuosity[start], expected["sinuosity"])
+
+
+def test_path_metrics():
+    df_copy = traja.generate(n=200)
+    expected = _naive_window_features(df_copy)
+    npt.assert_allclose(traja.straightness(df_copy), expected["straightness"])
+    npt.assert_allclose(traja.sinuosity(df_copy), expected["sinuosity"])
+    npt.assert_allclose(traja.emax(df_copy), expected["emax"])
+    npt.assert_allclose(
+        traja.radius_of_gyration(df_copy), expected["radius_of_gyration"]
+    )
+    npt.assert_allclose(expected["length"], traja.length(df_copy))
+
+    step_sizes = np.geomspace(1, 10, 5)
+    path_lengths = [
+        (len(traja.rediscretize_points(df_copy, R)) - 1) * R for R in step_sizes
+    ]
+    values = traja.fractal_dimension_values(df_copy, step_sizes)
+    npt.assert_allclose(values.path_length, path_lengths)
+    slope = np.polyfit(np.log(step_sizes), np.log(path_lengths), 1)[0]
+    npt.assert_allclose(traja.fractal_dimension(df_copy, step_sizes), 1 - slope)
+    npt.assert_allclose(
+        traja.fractal_dimension(df_copy, step_sizes, n_jobs=2), 1 - slope
+    )
+
+    coll = traja.TrajaCollection({i: traja.generate(n=100, seed=i) for i in range(3)})
+    coll.iloc[5, coll.columns.get_loc("x")] = np.nan
+    metrics = traja.path_metrics(coll, id_col="id", step_sizes=step_sizes, n_jobs=2)
+    assert list(metrics.index) == [0, 1, 2]
+    for i in range(3):
+        trj = traja.generate(n=100, seed=i)
+        if i == 0:
+            trj = trj.drop(trj.index[5])
+        expected = _naive_window_features(trj)
+        del expected["hull_area"]
+        row = metrics.loc[i]
+        npt.assert_allclose(row[list(expected)], list(expected.values()))
+        npt.assert_allclose(
+            row.fractal_dimension, traja.fractal_dimension(trj, step_sizes)
+        )
+
+    # Sinuosity is defined for paths of constant steps
+    for seed in range(20):
+        rt = traja.rediscretize_points(traja.generate(1000, seed=seed), 0.5)
+        rt["time"] = np.arange(len(rt), dtype=float)
+        expected = _naive_window_features(rt)["sinuosity"]
+        npt.assert_allclose(traja.sinuosity(rt), expected)
+        npt.assert_allclose(traja.path_metrics(rt).sinuosity, expected)
+
+
+def test_speed_intervals():
+    df_copy = traja.generate(n=200)
+    intervals = traja.speed_intervals(df_copy, faster_than=100)
+    assert list(intervals.columns) == [
+        "start_frame",
+        "start_time",
+        "stop_frame",
+        "stop_time",
+        "duration",
+    ]
+    speed = traja.get_derivatives(df_copy).speed.to_numpy()
+    for start, stop in intervals[["start_frame", "stop_frame"]].to_numpy():
+        assert (speed[start + 1 : stop + 1] > 100).all()
+
+    thresholds = [50, 100, 150]
+    coll = traja.TrajaCollection({i: traja.generate(n=100, seed=i) for i in range(3)})
+    intervals = traja.speed_intervals(coll, faster_than=thresholds, id_col="id")
+    assert list(intervals.columns[:3]) == ["id", "faster_than", "slower_than"]
+    for i in range(3):
+        for threshold in thresholds:
+            expected = traja.speed_intervals(
+                traja.generate(n=100, seed=i), faster_than=threshold
+            )
+            actual = intervals[
+                (intervals["id"] == i) & (intervals["faster_than"] == threshold)
+            ]
+            npt.assert_allclose(actual[expected.columns], expected)
+
+
+def test_use_dtype():
+    df_copy = traja.generate(n=1000)
+    expected_derivs = traja.get_derivatives(df_copy)
+    expected_grid = traja.grid_coordinates(df_copy.copy(), bins=(8, 8))
+    expected_rt = traja.rediscretize_points(df_copy, R=1.5)
+    with traja.use_dtype(np.float32):
+        assert traja.get_dtype() == np.float32
+        assert traja.calc_displacement(df_copy).dtype == np.float32
+        assert (traja.calc_derivatives(df_copy).dtypes == np.float32).all()
+        derivs = traja.get_derivatives(df_copy)
+        grid = traja.grid_coordinates(df_copy.copy(), bins=(8, 8))
+        rt = traja.rediscretize_points(df_copy, R=1.5)
+    assert traja.get_dtype() is None
+
+    assert (derivs.dtypes == np.float32).all()
+    # Acceleration is a difference of speeds, which loses relative precision
+    npt.assert_allclose(
+        derivs.drop(columns="acceleration"),
+        expected_derivs.drop(columns="acceleration"),
+        rtol=1e-6,
+    )
+    npt.assert_allclose(derivs.acceleration, expected_derivs.acceleration, rtol=1e-3)
+    npt.assert_array_equal(grid, expected_grid)
+    assert rt.x.dtype == np.float32
+    assert len(rt) == len(expected_rt)
+    npt.assert_allclose(rt[["x", "y"]], expected_rt[["x", "y"]], rtol=1e-4, atol=1e-4)
+
+    with pytest.raises(ValueError):
+        traja.set_dtype(np.int32)
+
+
+def test_fill_in_traj():
+    trjs = [traja.generate(n=100, seed=i) for i in range(3)]
+    coll = traja.TrajaDataFrame(
+        pd.concat([trj.assign(id=i) for i, trj in enumerate(trjs)])
+    )
+    coll = coll.reset_index(drop=True)
+    missing = [0, 10, 11, 12, 50, 150, 151, 199, 250]
+    coll.loc[missing, "x"] = np.nan
+    coll.loc[[12, 13], "y"] = np.nan
+
+    gaps = traja.find_gaps(coll, id_col="id", max_gap=3)
+    assert list(gaps.columns[:3]) == ["id", "start", "stop"]
+    assert list(gaps.start) == [0, 10, 50, 150, 199, 250]
+    assert list(gaps.stop) == [0, 13, 50, 151, 199, 250]
+    assert list(gaps.fillable) == [False, False, True, True, False, True]
+    npt.assert_allclose(gaps.duration[1], 0.1)
+
+    filled = traja.fill_in_traj(coll, id_col="id")
+    assert filled.x.isna().sum() == 2
+    for i in range(3):
+        trj = coll[coll["id"] == i]
+        actual = filled[filled["id"] == i]
+        valid = trj.x.notna() & trj.y.notna()
+        times = trj.time[valid]
+        inner = (trj.time >= times.iloc[0]) & (trj.time <= times.iloc[-1])
+        for col in ["x", "y"]:
+            # Coordinates of the other axis are kept
+            expected = np.where(
+                trj[col].isna(),
+                np.interp(trj.time, trj.time[valid], trj[col][valid]),
+                trj[col],
+            )
+            npt.assert_allclose(actual[col][inner], expected[inner])
+
+    filled, gaps = traja.fill_in_traj(
+        coll, max_gap="0.05s", id_col="id", return_gaps=True
+    )
+    assert list(gaps.filled) == [False, False, True, False, False, True]
+    assert filled.x.isna().sum() == 7
+
+    cubic = traja.fill_in_traj(coll, method="cubic", id_col="id")
+    npt.assert_allclose(cubic.x[50], np.mean(coll.x[[49, 51]]), atol=2)
+
+    line = traja.TrajaDataFrame(
+        {"x": np.arange(10.0), "y": 2 * np.arange(10.0), "time": np.arange(10.0)}
+    )
+    line.loc[[5, 8, 9], "x"] = np.nan
+    filled = traja.fill_in_traj(line, method="constant_velocity")
+    npt.assert_allclose(filled.x, np.arange(10.0))
+
+    # Rows are filled in time order, whatever their order in the frame
+    shuffled = coll.sample(frac=1, random_state=0)
+    expected = traja.fill_in_traj(coll, id_col="id")
+    actual = traja.fill_in_traj(shuffled, id_col="id").loc[coll.index]
+    npt.assert_allclose(actual[["x", "y"]], expected[["x", "y"]])
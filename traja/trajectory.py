@@ -1,6 +1,9 @@
+import bisect
 import logging
 import math
+import os
 from collections import OrderedDict
+from datetime import timedelta
 from typing import Callable, Optional, Union, Tuple
 
 import numpy as np
@@ -10,11 +13,12 @@ from pandas.core.dtypes.common import (
     is_datetime64_any_dtype,
     is_timedelta64_dtype,
 )
-from scipy import signal
-from scipy.spatial.distance import directed_hausdorff, euclidean
+from scipy.spatial.distance import euclidean
 
 import traja
 from traja import TrajaDataFrame
+from traja.config import _float_dtype, get_dtype
+from traja.parallel import map_jobs
 
 
 __all__ = [
@@ -25,6 +29,7 @@ __all__ = [
     "_has_cols",
     "_rediscretize_points",
     "_resample_time",
+    "OneEuroFilter",
     "angles",
     "calc_angle",
     "calc_derivatives",
@@ -36,21 +41,36 @@ __all__ = [
     "coords_to_flow",
     "distance_between",
     "distance",
+    "emax",
     "euclidean",
     "expected_sq_displacement",
     "fill_in_traj",
+    "find_gaps",
+    "fractal_dimension",
+    "fractal_dimension_values",
     "from_xy",
     "generate",
     "get_derivatives",
     "grid_coordinates",
     "length",
+    "path_metrics",
     "polar_to_z",
+    "radius_of_gyration",
     "rediscretize_points",
+    "resample_interp",
     "resample_time",
+    "rolling_features",
+    "rolling_hull_area",
     "rotate",
+    "simplify",
+    "simplify_indices",
+    "sinuosity",
+    "smooth_one_euro",
     "smooth_sg",
+    "smooth_sg_stream",
     "speed_intervals",
     "step_lengths",
+    "straightness",
     "to_shapely",
     "to_utm",
     "traj_from_coords",
@@ -61,13 +81,63 @@ __all__ = [
 logger = logging.getLogger("traja")
 
 
-def smooth_sg(trj: TrajaDataFrame, w: int = None, p: int = 3):
+def _trajectory_rows(trj: TrajaDataFrame, id_col: Optional[str] = None) -> list:
+    """Returns rows of each trajectory of `trj`, in order, or all rows if no `id_col`."""
+    if id_col is None:
+        return [slice(None)]
+    codes = pd.factorize(trj[id_col])[0]
+    order = np.argsort(codes, kind="stable")
+    order = order[codes[order] >= 0]
+    return np.split(order, np.flatnonzero(np.diff(codes[order])) + 1)
+
+
+def _savgol(values: np.ndarray, w: int, p: int) -> np.ndarray:
+    from scipy import signal
+
+    return signal.savgol_filter(values, window_length=w, polyorder=p, axis=0)
+
+
+def _smooth_sg_chunked(
+    values: np.ndarray, w: int, p: int, chunk_size: int
+) -> np.ndarray:
+    """Returns `values` smoothed in chunks of `chunk_size` rows.
+
+    Each chunk is filtered with `w` // 2 rows of overlap on either side, and chunks
+    at the ends with the first or last `w` rows, so results match filtering the full
+    array.
+    """
+    n = len(values)
+    halo = w // 2
+    smoothed = np.empty_like(values, dtype=float)
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        lo = max(min(start - halo, n - w), 0)
+        hi = min(max(stop + halo, w), n)
+        smoothed[start:stop] = _savgol(values[lo:hi], w, p)[start - lo : stop - lo]
+    return smoothed
+
+
+def smooth_sg(
+    trj: TrajaDataFrame,
+    w: int = None,
+    p: int = 3,
+    id_col: Optional[str] = None,
+    chunk_size: Optional[int] = None,
+    fill: bool = False,
+):
     """Returns ``DataFrame`` of trajectory after Savitzky-Golay filtering.
 
     Args:
       trj (:class:`~traja.frame.TrajaDataFrame`): Trajectory
       w (int): window size (Default value = None)
       p (int): polynomial order (Default value = 3)
+      id_col (str, optional): Column identifying trajectories of a collection, each of
+        which is smoothed separately. Trajectories shorter than `w` are not smoothed
+      chunk_size (int, optional): Number of rows filtered at once, to limit memory use
+        on very long trajectories. Chunks overlap, so results are the same
+      fill (bool): Fill in missing rows after filtering with
+        :func:`~traja.trajectory.fill_in_traj`. By default, missing rows stay missing,
+        along with the rows within `w` // 2 of them
 
     Returns:
       trj (:class:`~traja.frame.TrajaDataFrame`): Trajectory
@@ -83,16 +153,211 @@ def smooth_sg(trj: TrajaDataFrame, w: int = None, p: int = 3):
         3  -8.412910   7.335925  0.06
         4  -7.546492   5.756128  0.08
 
+    .. seealso::
+
+        :func:`~traja.trajectory.smooth_sg_stream` for smoothing streams of chunks
+
     """
     if w is None:
         w = p + 3 - p % 2
 
     if w % 2 != 1:
         raise Exception(f"Invalid smoothing parameter w ({w}): n must be odd")
+    if chunk_size is not None and chunk_size < 1:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+
+    xy = trj[["x", "y"]].to_numpy(dtype=float)
+    smoothed = xy.copy()
+    for rows in _trajectory_rows(trj, id_col):
+        values = xy[rows]
+        if id_col is not None and len(values) < w:
+            continue
+        if chunk_size is None:
+            smoothed[rows] = _savgol(values, w, p)
+        else:
+            smoothed[rows] = _smooth_sg_chunked(values, w, p, chunk_size)
+
     _trj = trj.copy()
-    _trj.x = signal.savgol_filter(_trj.x, window_length=w, polyorder=p, axis=0)
-    _trj.y = signal.savgol_filter(_trj.y, window_length=w, polyorder=p, axis=0)
-    _trj = fill_in_traj(_trj)
+    _trj.x = smoothed[:, 0]
+    _trj.y = smoothed[:, 1]
+    if fill:
+        _trj = fill_in_traj(_trj, id_col=id_col)
+    return _trj
+
+
+def smooth_sg_stream(chunks, w: int = None, p: int = 3):
+    """Yields Savitzky-Golay filtered chunks of a trajectory read in chunks.
+
+    For trajectories which do not fit in memory, eg, read with
+    ``pd.read_csv(path, chunksize=100000)``. The last `w` // 2 rows of each chunk are
+    held back until the next chunk arrives, so results are the same as smoothing the
+    whole trajectory with :func:`~traja.trajectory.smooth_sg`.
+
+    Args:
+      chunks (iterable of :class:`~pandas.DataFrame`): Consecutive chunks of a
+        trajectory, with ``x`` and ``y`` columns
+      w (int): window size (Default value = None)
+      p (int): polynomial order (Default value = 3)
+
+    Yields:
+      chunk (:class:`~pandas.DataFrame`): Smoothed rows, in order
+
+    .. doctest::
+
+        >> chunks = pd.read_csv("trajectory.csv", chunksize=100000)
+        >> for chunk in traja.smooth_sg_stream(chunks, w=101):
+        ..     chunk.to_csv("smoothed.csv", mode="a", header=False)
+
+    """
+    if w is None:
+        w = p + 3 - p % 2
+
+    if w % 2 != 1:
+        raise Exception(f"Invalid smoothing parameter w ({w}): n must be odd")
+    halo = w // 2
+    # Original, unsmoothed coordinates of rows before the pending rows, as context
+    # for the filter
+    history = np.empty((0, 2))
+    pending = None
+
+    def smooth(pending, history, keep):
+        values = np.concatenate([history, pending[["x", "y"]].to_numpy(dtype=float)])
+        smoothed = _savgol(values, w, p)[len(history) :]
+        # Unsmoothed context, as the filter is applied to the original coordinates
+        history = values[max(len(values) - keep - (w - 1), 0) : len(values) - keep]
+        chunk = pending.iloc[: len(pending) - keep].copy()
+        chunk["x"] = smoothed[: len(chunk), 0]
+        chunk["y"] = smoothed[: len(chunk), 1]
+        return chunk, history
+
+    for chunk in chunks:
+        pending = chunk if pending is None else pd.concat([pending, chunk])
+        if len(history) + len(pending) < w or len(pending) <= halo:
+            continue
+        smoothed, history = smooth(pending, history, halo)
+        pending = pending.iloc[len(smoothed) :]
+        yield smoothed
+    if pending is not None and len(pending):
+        yield smooth(pending, history, 0)[0]
+
+
+class OneEuroFilter(object):
+    """Incremental one-euro filter of 2D positions (Casiez, Roussel & Vogel, 2012).
+
+    A low-pass filter whose cutoff frequency increases with speed, smoothing jitter
+    at low speeds while limiting lag at high speeds. State is kept between calls, so
+    samples can be filtered one at a time or in chunks as they arrive.
+
+    Args:
+      min_cutoff (float): Cutoff frequency in Hz at zero speed. Lower values smooth
+        more (Default value = 1.0)
+      beta (float): Increase of the cutoff frequency with speed. Higher values lag
+        less (Default value = 0.0)
+      d_cutoff (float): Cutoff frequency in Hz for the speed estimate (Default value = 1.0)
+
+    .. doctest::
+
+        >>> f = traja.OneEuroFilter(min_cutoff=1.0, beta=0.1)
+        >>> f(0.0, 0.0, 0.0)
+        (0.0, 0.0)
+        >>> f(1.0, 1.0, 0.1)  # doctest: +ELLIPSIS
+        (0.4926..., 0.4926...)
+
+    """
+
+    def __init__(
+        self, min_cutoff: float = 1.0, beta: float = 0.0, d_cutoff: float = 1.0
+    ):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        """Forgets previous samples."""
+        self._x = self._y = self._t = None
+        self._dx = self._dy = 0.0
+
+    @staticmethod
+    def _alpha(cutoff: float, dt: float) -> float:
+        return 1.0 / (1.0 + 1.0 / (2 * math.pi * cutoff * dt))
+
+    def __call__(self, x: float, y: float, t: float) -> Tuple[float, float]:
+        """Returns filtered position of a sample at `x`, `y` and time `t` in seconds.
+
+        Missing samples are returned as is and do not change the state.
+        """
+        if math.isnan(x) or math.isnan(y):
+            return x, y
+        if self._t is None or not t > self._t:
+            if self._t is None:
+                self._x, self._y, self._t = x, y, t
+            return self._x, self._y
+        dt = t - self._t
+        a = self._alpha(self.d_cutoff, dt)
+        self._dx = a * (x - self._x) / dt + (1 - a) * self._dx
+        self._dy = a * (y - self._y) / dt + (1 - a) * self._dy
+        cutoff = self.min_cutoff + self.beta * math.hypot(self._dx, self._dy)
+        a = self._alpha(cutoff, dt)
+        self._x = a * x + (1 - a) * self._x
+        self._y = a * y + (1 - a) * self._y
+        self._t = t
+        return self._x, self._y
+
+    def filter(self, xy: np.ndarray, t: np.ndarray) -> np.ndarray:
+        """Returns filtered positions of a chunk of samples.
+
+        Args:
+          xy (:class:`numpy.ndarray`): Positions with shape ``(n, 2)``
+          t (:class:`numpy.ndarray`): Times in seconds
+
+        Returns:
+          xy (:class:`numpy.ndarray`): Filtered positions
+
+        """
+        # Python floats are faster than NumPy scalars in the loop
+        samples = zip(np.asarray(xy).tolist(), np.asarray(t).tolist())
+        filtered = [self(x, y, ti) for (x, y), ti in samples]
+        return np.array(filtered, dtype=float).reshape(-1, 2)
+
+
+def smooth_one_euro(
+    trj: TrajaDataFrame,
+    min_cutoff: float = 1.0,
+    beta: float = 0.0,
+    d_cutoff: float = 1.0,
+    id_col: Optional[str] = None,
+):
+    """Returns ``DataFrame`` of trajectory after one-euro filtering.
+
+    Unlike Savitzky-Golay filtering, each position only depends on earlier ones, so
+    the same filter can be applied incrementally to live data with
+    :class:`~traja.trajectory.OneEuroFilter`.
+
+    Args:
+      trj (:class:`~traja.frame.TrajaDataFrame`): Trajectory
+      min_cutoff (float): Cutoff frequency in Hz at zero speed (Default value = 1.0)
+      beta (float): Increase of the cutoff frequency with speed (Default value = 0.0)
+      d_cutoff (float): Cutoff frequency in Hz for the speed estimate (Default value = 1.0)
+      id_col (str, optional): Column identifying trajectories of a collection, each of
+        which is filtered separately
+
+    Returns:
+      trj (:class:`~traja.frame.TrajaDataFrame`): Trajectory
+
+    """
+    t = _time_seconds(trj)
+    if t is None:
+        raise Exception("Missing time information in trajectory.")
+    xy = trj[["x", "y"]].to_numpy(dtype=float)
+    smoothed = xy.copy()
+    for rows in _trajectory_rows(trj, id_col):
+        f = OneEuroFilter(min_cutoff, beta, d_cutoff)
+        smoothed[rows] = f.filter(xy[rows], t[rows])
+
+    _trj = trj.copy()
+    _trj.x = smoothed[:, 0]
+    _trj.y = smoothed[:, 1]
     return _trj
 
 
@@ -337,6 +602,8 @@ def distance_between(A: traja.TrajaDataFrame, B: traja.TrajaDataFrame, method="d
         distance (float): Distance
 
     """
+    from scipy.spatial.distance import directed_hausdorff
+
     if method == "hausdorff":
         dist0 = directed_hausdorff(A, B)[0]
         dist1 = directed_hausdorff(B, A)[0]
@@ -381,6 +648,667 @@ def to_shapely(trj):
     return tracks_shape
 
 
+def _lower_hull_chain(px: np.ndarray, py: np.ndarray, counts: np.ndarray):
+    """Builds the lower convex hull chains of many point sets in lockstep.
+
+    Args:
+      px, py (:class:`numpy.ndarray`): Coordinates with shape ``(n_sets, k)``, each row
+        sorted by x, then y
+      counts (:class:`numpy.ndarray`): Number of points of each set, trailing columns
+        are ignored
+
+    Returns:
+      hx, hy (:class:`numpy.ndarray`): Chain vertex coordinates from left to right,
+        valid up to `size`
+      size (:class:`numpy.ndarray`): Number of vertices of each chain
+
+    """
+    n_sets, k = px.shape
+    # Flat stacks, the top of set `i` is at ``i * k + size[i] - 1``
+    hx = np.zeros(n_sets * k)
+    hy = np.zeros(n_sets * k)
+    base = np.arange(n_sets) * k
+    size = np.zeros(n_sets, dtype=np.intp)
+    for j in range(k):
+        active = np.flatnonzero(counts > j)
+        x, y = px[active, j], py[active, j]
+        # Pop vertices not making a counter-clockwise turn with point `j`
+        candidates = np.flatnonzero(size[active] >= 2)
+        while len(candidates):
+            top = base[active[candidates]] + size[active[candidates]]
+            ax, ay = hx[top - 2], hy[top - 2]
+            cross = (hx[top - 1] - ax) * (y[candidates] - ay) - (hy[top - 1] - ay) * (
+                x[candidates] - ax
+            )
+            candidates = candidates[cross <= 0]
+            size[active[candidates]] -= 1
+            candidates = candidates[size[active[candidates]] >= 2]
+        top = base[active] + size[active]
+        hx[top] = x
+        hy[top] = y
+        size[active] += 1
+    return hx.reshape(n_sets, k), hy.reshape(n_sets, k), size
+
+
+def _compact(px: np.ndarray, py: np.ndarray, keep: np.ndarray):
+    """Moves the points selected by `keep` to the front of each row, keeping their order."""
+    counts = keep.sum(axis=1)
+    columns = np.cumsum(keep, axis=1) - 1
+    rows = np.broadcast_to(np.arange(len(px))[:, None], keep.shape)[keep]
+    cx = np.zeros((len(px), max(counts.max(initial=0), 1)))
+    cy = np.zeros_like(cx)
+    cx[rows, columns[keep]] = px[keep]
+    cy[rows, columns[keep]] = py[keep]
+    return cx, cy, counts
+
+
+def _hull_chains(px: np.ndarray, py: np.ndarray):
+    """Returns lower and upper hull chains of many point sets with sorted rows.
+
+    Points strictly inside the triangles spanned by the leftmost, rightmost and
+    lowest (or highest) points cannot be hull vertices and are skipped.
+    """
+    rows = np.arange(len(px))
+    lx, ly, rx, ry = px[:, :1], py[:, :1], px[:, -1:], py[:, -1:]
+
+    def cross(ax, ay, bx, by):
+        return (bx - ax) * (py - ay) - (by - ay) * (px - ax)
+
+    side = cross(lx, ly, rx, ry)
+    chains = []
+    for sign, extreme in ((1, np.argmin(py, axis=1)), (-1, np.argmax(py, axis=1))):
+        ex, ey = px[rows, extreme][:, None], py[rows, extreme][:, None]
+        inside = (
+            (sign * cross(lx, ly, ex, ey) > 0)
+            & (sign * cross(ex, ey, rx, ry) > 0)
+            & (sign * side < 0)
+        )
+        keep = (sign * side <= 0) & ~inside
+        if sign == 1:
+            cx, cy, counts = _compact(px, py, keep)
+            chains.append(_lower_hull_chain(cx, cy, counts))
+        else:
+            # The upper chain is the lower chain of the points rotated by 180 degrees
+            cx, cy, counts = _compact(-px[:, ::-1], -py[:, ::-1], keep[:, ::-1])
+            hx, hy, size = _lower_hull_chain(cx, cy, counts)
+            chains.append((-hx, -hy, size))
+    return chains
+
+
+def _rolling_hull_chains(
+    xy: np.ndarray, starts: np.ndarray, ends: np.ndarray, chunk_size: int
+):
+    """Yields convex hulls of windows ``xy[start:end]`` in chunks of windows.
+
+    Points are sorted once for the whole trajectory, so windows only sort integer ranks.
+    Windows shorter than the longest one are padded by repeating their last point.
+
+    Yields:
+      chunk (slice): Windows of the chunk
+      chains (tuple): Lower and upper chains from :func:`_lower_hull_chain`, the upper
+        chain from right to left
+      valid (:class:`numpy.ndarray`): Whether windows are free of missing coordinates
+
+    """
+    n = len(xy)
+    order = np.lexsort((xy[:, 1], xy[:, 0]))
+    rank = np.empty(n, dtype=np.intp)
+    rank[order] = np.arange(n)
+    n_missing = np.concatenate([[0], np.cumsum(~np.isfinite(xy).all(axis=1))])
+    for start in range(0, len(starts), chunk_size):
+        chunk = slice(start, start + chunk_size)
+        chunk_starts, chunk_ends = starts[chunk], ends[chunk]
+        offsets = np.arange((chunk_ends - chunk_starts).max())
+        indices = np.minimum(chunk_starts[:, None] + offsets, chunk_ends[:, None] - 1)
+        ranks = np.sort(rank[indices], axis=1)
+        px, py = xy[order[ranks], 0], xy[order[ranks], 1]
+        valid = n_missing[chunk_ends] == n_missing[chunk_starts]
+        yield chunk, _hull_chains(px, py), valid
+
+
+def _hull_measures(
+    xy: np.ndarray, starts: np.ndarray, ends: np.ndarray, chunk_size: int = 10000
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns area and perimeter of the convex hulls of windows ``xy[start:end]``."""
+    areas = np.full(len(starts), np.nan)
+    perimeters = np.full(len(starts), np.nan)
+    for chunk, chains, valid in _rolling_hull_chains(xy, starts, ends, chunk_size):
+        area = np.zeros(len(valid))
+        perimeter = np.zeros(len(valid))
+        for x, y, size in chains:
+            # Shoelace and edge lengths over consecutive chain vertices
+            edges = np.arange(x.shape[1] - 1) < (size[:, None] - 1)
+            cross = x[:, :-1] * y[:, 1:] - x[:, 1:] * y[:, :-1]
+            lengths = np.hypot(np.diff(x, axis=1), np.diff(y, axis=1))
+            area += np.where(edges, cross, 0).sum(axis=1)
+            perimeter += np.where(edges, lengths, 0).sum(axis=1)
+        areas[chunk] = np.where(valid, 0.5 * np.abs(area), np.nan)
+        perimeters[chunk] = np.where(valid, perimeter, np.nan)
+    return areas, perimeters
+
+
+def rolling_hull_area(
+    trj: TrajaDataFrame, window: int = 100, step: int = 1, chunk_size: int = 10000
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns area and perimeter of the convex hull of rolling windows of the trajectory.
+
+    Hulls are computed with Andrew's monotone chain algorithm on all windows of a chunk
+    at once. Windows containing missing coordinates have area and perimeter ``NaN``.
+
+    Args:
+      trj (:class:`~traja.frame.TrajaDataFrame`): Trajectory
+      window (int): Number of points per window
+      step (int): Number of points between the starts of consecutive windows
+      chunk_size (int): Number of windows processed at once, bounds memory use
+
+    Returns:
+      areas (:class:`numpy.ndarray`): Hull area of each window
+      perimeters (:class:`numpy.ndarray`): Hull perimeter of each window
+
+    .. doctest::
+
+        >>> df = traja.TrajaDataFrame({'x':[0,1,1,0,0],'y':[0,0,1,1,0]})
+        >>> areas, perimeters = traja.rolling_hull_area(df, window=4)
+        >>> areas
+        array([1., 1.])
+        >>> perimeters
+        array([4., 4.])
+
+    """
+    xy = trj[["x", "y"]].to_numpy(dtype=float)
+    starts, ends = _window_bounds(len(xy), window, step)
+    return _hull_measures(xy, starts, ends, chunk_size)
+
+
+def _rolling_hulls(
+    trj: TrajaDataFrame, window: int = 100, step: int = 1, chunk_size: int = 10000
+):
+    """Returns convex hull outlines of rolling windows for plotting.
+
+    Windows containing missing coordinates are skipped.
+
+    Returns:
+      starts (:class:`numpy.ndarray`): First row of each window
+      outlines (list of :class:`numpy.ndarray`): Closed hull outlines with shape ``(m, 2)``
+
+    """
+    xy = trj[["x", "y"]].to_numpy(dtype=float)
+    window_starts, window_ends = _window_bounds(len(xy), window, step)
+    starts, outlines = [], []
+    for chunk, chains, valid in _rolling_hull_chains(
+        xy, window_starts, window_ends, chunk_size
+    ):
+        (lower_x, lower_y, lower_size), (upper_x, upper_y, upper_size) = chains
+        for row in np.flatnonzero(valid):
+            lower, upper = lower_size[row] - 1, upper_size[row]
+            outlines.append(
+                np.column_stack(
+                    [
+                        np.concatenate([lower_x[row, :lower], upper_x[row, :upper]]),
+                        np.concatenate([lower_y[row, :lower], upper_y[row, :upper]]),
+                    ]
+                )
+            )
+        starts.append(window_starts[chunk][valid])
+    starts = np.concatenate(starts) if starts else np.empty(0, dtype=np.intp)
+    return starts, outlines
+
+
+ROLLING_FEATURES = (
+    "length",
+    "distance",
+    "straightness",
+    "sinuosity",
+    "emax",
+    "mean_speed",
+    "hull_area",
+    "radius_of_gyration",
+)
+
+
+def _time_seconds(trj: TrajaDataFrame) -> Optional[np.ndarray]:
+    """Returns time of each row in seconds, or ``None`` if `trj` has no time column."""
+    time_col = _get_time_col(trj)
+    if time_col is None:
+        return None
+    values = trj.index if time_col == "index" else trj[time_col]
+    if is_datetime64_any_dtype(values) or is_timedelta64_dtype(values):
+        values = pd.Series(values)
+        if values.empty:
+            return np.empty(0)
+        return ((values - values.iloc[0]) / pd.Timedelta(seconds=1)).to_numpy(float)
+    return np.asarray(values, dtype=float)
+
+
+def _window_bounds(
+    n: int, window, step: int = 1, t: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns first and past-the-end rows of rolling windows over `n` rows.
+
+    Args:
+      n (int): Number of rows
+      window (int or str or :class:`pandas.Timedelta`): Number of rows per window, or
+        duration of windows (eg, ``"10s"``)
+      step (int): Number of rows between the starts of consecutive windows
+      t (:class:`numpy.ndarray`, optional): Sorted time of rows in seconds, required
+        for time-based windows
+
+    Returns:
+      starts, ends (:class:`numpy.ndarray`): Windows are ``[start, end)``
+
+    """
+    if isinstance(window, (str, pd.Timedelta, timedelta)):
+        if t is None:
+            raise ValueError("Time-based windows require a time column.")
+        duration = pd.Timedelta(window).total_seconds()
+        starts = np.arange(0, n, step)
+        # Windows running past the end of the trajectory are incomplete
+        starts = starts[t[starts] + duration <= t[-1]] if n else starts
+        ends = np.searchsorted(t, t[starts] + duration, side="left")
+        return starts, np.maximum(ends, starts + 1)
+    starts = np.arange(0, max(n - window + 1, 0), step)
+    return starts, starts + window
+
+
+def _window_sums(values: np.ndarray, starts: np.ndarray, ends: np.ndarray):
+    """Returns sums of ``values[start:end]`` from prefix sums, missing values as zero."""
+    prefix = np.concatenate([[0.0], np.cumsum(np.nan_to_num(values))])
+    return prefix[ends] - prefix[starts]
+
+
+def _rolling_features(
+    xy: np.ndarray,
+    t: Optional[np.ndarray],
+    starts: np.ndarray,
+    ends: np.ndarray,
+    features: Tuple[str, ...],
+) -> dict:
+    """Computes rolling window `features` of one trajectory, see :func:`rolling_features`."""
+    n_missing = np.concatenate([[0], np.cumsum(~np.isfinite(xy).all(axis=1))])
+    valid = n_missing[ends] == n_missing[starts]
+    last = ends - 1
+    n_points = ends - starts
+
+    steps = np.diff(xy, axis=0)
+    step_lengths = np.hypot(steps[:, 0], steps[:, 1])
+    # Steps of window [start, end) are [start, end - 1)
+    length = _window_sums(step_lengths, starts, last)
+
+    out = OrderedDict()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if "length" in features:
+            out["length"] = length
+        if "distance" in features or "straightness" in features:
+            distance = np.hypot(*(xy[last] - xy[starts]).T)
+            if "distance" in features:
+                out["distance"] = distance
+            if "straightness" in features:
+                out["straightness"] = distance / length
+        if "sinuosity" in features or "emax" in features:
+            # Mean cosine and sine of turn angles between consecutive steps, which
+            # are [start, end - 2) in the window
+            headings = np.arctan2(steps[:, 1], steps[:, 0])
+            turns = np.diff(headings)
+            turn_end = np.maximum(ends - 2, starts)
+            n_turns = turn_end - starts
+            c = _window_sums(np.cos(turns), starts, turn_end) / n_turns
+            s = _window_sums(np.sin(turns), starts, turn_end) / n_turns
+        if "sinuosity" in features:
+            n_steps = n_points - 1
+            p = length / n_steps
+            # Center step lengths to limit cancellation in the sums of squares,
+            # which leaves rounding errors below zero on constant steps
+            offset = np.nanmean(step_lengths)
+            sum_sq = _window_sums((step_lengths - offset) ** 2, starts, last)
+            var = (sum_sq - n_steps * (p - offset) ** 2) / (n_steps - 1)
+            b = np.sqrt(np.maximum(var, 0)) / p
+            out["sinuosity"] = 2 / np.sqrt(
+                p * ((1 - c ** 2 - s ** 2) / ((1 - c) ** 2 + s ** 2) + b ** 2)
+            )
+        if "emax" in features:
+            out["emax"] = c / (1 - c)
+        if "mean_speed" in features:
+            duration = (t[last] - t[starts]) if t is not None else (last - starts)
+            out["mean_speed"] = length / duration
+        if "hull_area" in features:
+            out["hull_area"], _ = _hull_measures(xy, starts, ends)
+        if "radius_of_gyration" in features:
+            # Center coordinates to limit cancellation in the sums of squares
+            centered = xy - np.nanmean(xy, axis=0)
+            mean_x = _window_sums(centered[:, 0], starts, ends) / n_points
+            mean_y = _window_sums(centered[:, 1], starts, ends) / n_points
+            mean_sq = (
+                _window_sums((centered ** 2).sum(axis=1), starts, ends) / n_points
+            )
+            out["radius_of_gyration"] = np.sqrt(
+                np.maximum(mean_sq - mean_x ** 2 - mean_y ** 2, 0)
+            )
+    for feature in out:
+        out[feature] = np.where(valid, out[feature], np.nan)
+    return out
+
+
+def rolling_features(
+    trj: TrajaDataFrame,
+    window: Union[int, str, pd.Timedelta] = 100,
+    step: int = 1,
+    features: Optional[Tuple[str, ...]] = None,
+    id_col: Optional[str] = None,
+    n_jobs: Optional[int] = 1,
+) -> pd.DataFrame:
+    """Returns features of rolling windows of the trajectory.
+
+    All features are computed together from prefix sums over the trajectory, so the
+    cost does not depend on the window size (except for ``hull_area``). Available
+    features are:
+
+    - ``length``: path length
+    - ``distance``: distance between the ends of the window
+    - ``straightness``: distance over path length
+    - ``sinuosity``: sinuosity index of Benhamou (2004), as in ``trajr``
+    - ``emax``: maximum expected displacement of Cheung et al. (2007), see :func:`emax`
+    - ``mean_speed``: path length over duration (per row without time column)
+    - ``hull_area``: area of the convex hull, see :func:`rolling_hull_area`
+    - ``radius_of_gyration``: root mean square distance of points to their centroid
+
+    Windows containing missing coordinates have ``NaN`` features.
+
+    Args:
+      trj (:class:`~traja.frame.TrajaDataFrame`): Trajectory
+      window (int or str): Number of rows per window, or duration of windows (eg, ``"10s"``)
+      step (int): Number of rows between the starts of consecutive windows
+      features (tuple of str, optional): Features to compute, default is all
+      id_col (str, optional): Column identifying trajectories of a collection, each
+        of which is processed separately
+      n_jobs (int): Number of trajectories processed in parallel, ``-1`` for all CPUs
+
+    Returns:
+      features (:class:`~pandas.DataFrame`): Features of each window, indexed by the
+        first row of the window
+
+    .. doctest::
+
+        >>> df = traja.TrajaDataFrame({'x':[0,1,2,2,2],'y':[0,0,0,1,2]})
+        >>> traja.rolling_features(df, window=3, features=('straightness','mean_speed'))
+           straightness  mean_speed
+        0      1.000000         1.0
+        1      0.707107         1.0
+        2      1.000000         1.0
+
+    """
+    features = tuple(features) if features is not None else ROLLING_FEATURES
+    unknown = set(features) - set(ROLLING_FEATURES)
+    if unknown:
+        raise ValueError(
+            f"Unknown features {sorted(unknown)}, choose from {ROLLING_FEATURES}"
+        )
+
+    if id_col is not None:
+        groups = [
+            (id, trj.iloc[indices])
+            for id, indices in trj.groupby(id_col, sort=False).indices.items()
+        ]
+
+        def process(group):
+            id, group_trj = group
+            result = rolling_features(group_trj, window, step, features)
+            result.insert(0, id_col, id)
+            return result
+
+        results = map_jobs(process, groups, n_jobs)
+        if not results:
+            return pd.DataFrame(columns=[id_col, *features])
+        return pd.concat(results)
+
+    xy = trj[["x", "y"]].to_numpy(dtype=float)
+    t = _time_seconds(trj)
+    starts, ends = _window_bounds(len(xy), window, step, t)
+    values = _rolling_features(xy, t, starts, ends, features)
+    return pd.DataFrame(values, index=trj.index[starts], columns=list(features))
+
+
+PATH_METRICS = (
+    "length",
+    "distance",
+    "straightness",
+    "sinuosity",
+    "emax",
+    "mean_speed",
+    "radius_of_gyration",
+)
+
+
+def _path_metric(trj: TrajaDataFrame, feature: str) -> float:
+    """Returns `feature` of :func:`rolling_features` for the whole trajectory,
+    ignoring rows with missing coordinates."""
+    xy = trj[["x", "y"]].to_numpy(dtype=float)
+    finite = np.isfinite(xy).all(axis=1)
+    t = _time_seconds(trj) if feature == "mean_speed" else None
+    if t is not None:
+        t = t[finite]
+    starts, ends = np.array([0]), np.array([finite.sum()])
+    if not ends[0]:
+        return np.nan
+    return float(_rolling_features(xy[finite], t, starts, ends, (feature,))[feature][0])
+
+
+def straightness(trj: TrajaDataFrame) -> float:
+    """Returns straightness index of the trajectory, distance between its ends over
+    path length.
+
+    Args:
+      trj (:class:`~traja.frame.TrajaDataFrame`): Trajectory
+
+    Returns:
+      straightness (float): Straightness index between 0 and 1
+
+    .. doctest::
+
+        >>> df = traja.TrajaDataFrame({'x':[0,1,1],'y':[0,0,1]})
+        >>> round(traja.straightness(df), 6)
+        0.707107
+
+    """
+    return _path_metric(trj, "straightness")
+
+
+def sinuosity(trj: TrajaDataFrame) -> float:
+    """Returns sinuosity index of the trajectory.
+
+    Uses the corrected sinuosity of Benhamou (2004), which accounts for variable step
+    lengths, as ``TrajSinuosity2`` in trajr.
+
+    Args:
+      trj (:class:`~traja.frame.TrajaDataFrame`): Trajectory
+
+    Returns:
+      sinuosity (float): Sinuosity index
+
+    """
+    return _path_metric(trj, "sinuosity")
+
+
+def emax(trj: TrajaDataFrame, eMaxB: bool = False) -> float:
+    """Returns maximum expected displacement of the trajectory.
+
+    E-max of Cheung et al. (2007) is a dimensionless measure of straightness, larger
+    for straighter paths. ``eMaxB`` scales it by the mean step length, as in trajr.
+
+    Args:
+      trj (:class:`~traja.frame.TrajaDataFrame`): Trajectory
+      eMaxB (bool): Return E-max b, in spatial units
+
+    Returns:
+      emax (float): E-max a (or b)
+
+    """
+    value = _path_metric(trj, "emax")
+    if eMaxB:
+        value *= np.nanmean(step_lengths(trj))
+    return value
+
+
+def radius_of_gyration(trj: TrajaDataFrame) -> float:
+    """Returns radius of gyration of the trajectory, root mean square distance of its
+    points to their centroid.
+
+    Args:
+      trj (:class:`~traja.frame.TrajaDataFrame`): Trajectory
+
+    Returns:
+      radius (float): Radius of gyration
+
+    .. doctest::
+
+        >>> df = traja.TrajaDataFrame({'x':[0,2,2,0],'y':[0,0,2,2]})
+        >>> traja.radius_of_gyration(df)
+        1.4142135623730951
+
+    """
+    return _path_metric(trj, "radius_of_gyration")
+
+
+def _arc_length(points: np.ndarray) -> np.ndarray:
+    """Returns cumulative path length at each of `points`, accumulated in float64."""
+    steps = np.diff(points, axis=0)
+    return np.concatenate([[0.0], np.cumsum(np.hypot(*steps.T), dtype=np.float64)])
+
+
+def _rediscretized_length(points: np.ndarray, arc_length: np.ndarray, R: float):
+    """Returns path length of `points` rediscretized to step length `R`."""
+    n_points = len(_rediscretize_kernel(points, R, arc_length)[0])
+    return (n_points - 1) * R if n_points >= 2 else np.nan
+
+
+def fractal_dimension_values(
+    trj: TrajaDataFrame, step_sizes, n_jobs: Optional[int] = 1
+) -> pd.DataFrame:
+    """Returns path length of the trajectory rediscretized to each of `step_sizes`.
+
+    The cumulative arc length of the trajectory is computed once and shared by all
+    step sizes.
+
+    Args:
+      trj (:class:`~traja.frame.TrajaDataFrame`): Trajectory
+      step_sizes (array-like): Step lengths, eg, ``np.geomspace(1, 10, 20)``
+      n_jobs (int): Number of step sizes processed in parallel processes, ``-1`` for
+        all CPUs
+
+    Returns:
+      values (:class:`~pandas.DataFrame`): Columns ``step_size`` and ``path_length``,
+        ``NaN`` where a step is too large for the path
+
+    """
+    from functools import partial
+
+    step_sizes = np.asarray(step_sizes, dtype=float)
+    points = trj[["x", "y"]].dropna().to_numpy(dtype=float)
+    if not len(points):
+        path_lengths = np.full(len(step_sizes), np.nan)
+    else:
+        arc_length = _arc_length(points)
+        # Smallest steps are slowest, start them first
+        order = np.argsort(step_sizes)
+        lengths = map_jobs(
+            partial(_rediscretized_length, points, arc_length),
+            step_sizes[order].tolist(),
+            n_jobs,
+            processes=True,
+        )
+        path_lengths = np.empty(len(step_sizes))
+        path_lengths[order] = lengths
+    return pd.DataFrame({"step_size": step_sizes, "path_length": path_lengths})
+
+
+def fractal_dimension(
+    trj: TrajaDataFrame, step_sizes, n_jobs: Optional[int] = 1
+) -> float:
+    """Returns fractal dimension of the trajectory.
+
+    The dimension is ``1 - slope`` of the regression of log path length on log step
+    length over `step_sizes` (Nams, 1996), as ``TrajFractalDimension`` in trajr.
+
+    Args:
+      trj (:class:`~traja.frame.TrajaDataFrame`): Trajectory
+      step_sizes (array-like): Step lengths, eg, ``np.geomspace(1, 10, 20)``
+      n_jobs (int): Number of step sizes processed in parallel processes, ``-1`` for
+        all CPUs
+
+    Returns:
+      dimension (float): Fractal dimension, between 1 (straight) and 2
+
+    """
+    values = fractal_dimension_values(trj, step_sizes, n_jobs=n_jobs).dropna()
+    if len(values) < 2:
+        return np.nan
+    slope, _ = np.polyfit(np.log(values.step_size), np.log(values.path_length), 1)
+    return 1 - slope
+
+
+def path_metrics(
+    trj: TrajaDataFrame,
+    id_col: Optional[str] = None,
+    step_sizes=None,
+    n_jobs: Optional[int] = 1,
+) -> pd.DataFrame:
+    """Returns summary path metrics of each trajectory.
+
+    Metrics are ``length``, ``distance``, ``straightness``, ``sinuosity``, ``emax``,
+    ``mean_speed`` and ``radius_of_gyration``, see :func:`rolling_features`, and
+    ``fractal_dimension`` if `step_sizes` are given. They are computed for all
+    trajectories of a collection together, from a single pass over steps. Rows with
+    missing coordinates are ignored.
+
+    Args:
+      trj (:class:`~traja.frame.TrajaDataFrame`): Trajectory
+      id_col (str, optional): Column identifying trajectories of a collection
+      step_sizes (array-like, optional): Step lengths for :func:`fractal_dimension`
+      n_jobs (int): Number of trajectories processed in parallel for fractal
+        dimension, ``-1`` for all CPUs
+
+    Returns:
+      metrics (:class:`~pandas.DataFrame`): One row of metrics per trajectory
+
+    .. doctest::
+
+        >>> df = traja.TrajaDataFrame({'x':[0,1,1],'y':[0,0,1]})
+        >>> traja.path_metrics(df)[['length','distance','straightness']]
+           length  distance  straightness
+        0     2.0  1.414214      0.707107
+
+    """
+    xy = trj[["x", "y"]].to_numpy(dtype=float)
+    t = _time_seconds(trj)
+    finite = np.isfinite(xy).all(axis=1)
+    if id_col is not None:
+        codes, ids = pd.factorize(trj[id_col], sort=False)
+        # Order rows by trajectory, keeping the order within each trajectory
+        order = np.argsort(codes, kind="stable")
+        order = order[finite[order] & (codes[order] >= 0)]
+        codes = codes[order]
+        present = np.flatnonzero(np.bincount(codes, minlength=len(ids)))
+        starts = np.searchsorted(codes, present)
+        ends = np.searchsorted(codes, present, side="right")
+        index = pd.Index(ids[present], name=id_col)
+    else:
+        order = np.flatnonzero(finite)
+        starts, ends = np.array([0]), np.array([len(order)])
+        index = pd.RangeIndex(1)
+        if not len(order):
+            starts, ends = starts[:0], ends[:0]
+    values = _rolling_features(
+        xy[order], t[order] if t is not None else None, starts, ends, PATH_METRICS
+    )
+    metrics = pd.DataFrame(values, index=index[: len(starts)], columns=PATH_METRICS)
+
+    if step_sizes is not None:
+        groups = [trj.iloc[order[start:end]] for start, end in zip(starts, ends)]
+        metrics["fractal_dimension"] = map_jobs(
+            lambda group: fractal_dimension(group, step_sizes), groups, n_jobs
+        )
+    return metrics
+
+
 def transition_matrix(grid_indices1D: np.ndarray):
     """Returns ``np.ndarray`` of Markov transition probability matrix for grid cell transitions.
 
@@ -550,25 +1478,30 @@ def grid_coordinates(
     # Drop nan for converting to int
     trj.dropna(subset=["x", "y"], inplace=True)
 
-    xmin = trj.x.min() if xlim is None else xlim[0]
-    xmax = trj.x.max() if xlim is None else xlim[1]
-    ymin = trj.y.min() if ylim is None else ylim[0]
-    ymax = trj.y.max() if ylim is None else ylim[1]
+    x, y = trj.x, trj.y
+    dtype = get_dtype()
+    if dtype is not None:
+        x, y = x.astype(dtype, copy=False), y.astype(dtype, copy=False)
+
+    xmin = x.min() if xlim is None else xlim[0]
+    xmax = x.max() if xlim is None else xlim[1]
+    ymin = y.min() if ylim is None else ylim[0]
+    ymax = y.max() if ylim is None else ylim[1]
 
     bins = _bins_to_tuple(trj, bins)
 
     if not xlim:
-        xbin = pd.cut(trj.x, bins[0], labels=False)
+        xbin = pd.cut(x, bins[0], labels=False)
     else:
         xmin, xmax = xlim
-        xbinarray = np.linspace(xmin, xmax, bins[0])
-        xbin = np.digitize(trj.x, xbinarray)
+        xbinarray = np.linspace(xmin, xmax, bins[0], dtype=dtype)
+        xbin = np.digitize(x, xbinarray)
     if not ylim:
-        ybin = pd.cut(trj.y, bins[1], labels=False)
+        ybin = pd.cut(y, bins[1], labels=False)
     else:
         ymin, ymax = ylim
-        ybinarray = np.linspace(ymin, ymax, bins[1])
-        ybin = np.digitize(trj.y, ybinarray)
+        ybinarray = np.linspace(ymin, ymax, bins[1], dtype=dtype)
+        ybin = np.digitize(y, ybinarray)
 
     if assign:
         trj["xbin"] = xbin
@@ -712,6 +1645,9 @@ def resample_time(trj: TrajaDataFrame, step_time: str, new_fps: Optional[bool] =
 
     ``step_time`` should be expressed as a number-time unit combination, eg "2S" for 2 seconds and “2100L” for 2100 milliseconds.
 
+    For long recordings or collections, :func:`~traja.trajectory.resample_interp` is
+    much faster.
+
     Args:
         trj (:class:`~traja.frame.TrajaDataFrame`): Trajectory
         step_time (str): step time interval / offset string (eg, '2S' (seconds), '50L' (milliseconds), '50N' (nanoseconds))
@@ -770,6 +1706,173 @@ def resample_time(trj: TrajaDataFrame, step_time: str, new_fps: Optional[bool] =
     return _trj
 
 
+def _interp_brackets(
+    group: np.ndarray, t: np.ndarray, query_group: np.ndarray, query_t: np.ndarray
+) -> np.ndarray:
+    """Returns number of samples at or before each query.
+
+    Samples and queries are both sorted by group, then time, so the sample before a
+    query is the previous sample of the merged sort order.
+    """
+    n = len(t)
+    is_query = np.concatenate(
+        [np.zeros(n, dtype=bool), np.ones(len(query_t), dtype=bool)]
+    )
+    # Samples sort before queries at the same time
+    order = np.lexsort(
+        (is_query, np.concatenate([t, query_t]), np.concatenate([group, query_group]))
+    )
+    merged_query = is_query[order]
+    samples_before = np.cumsum(~merged_query)
+    right = np.empty(len(query_t), dtype=int)
+    right[order[merged_query] - n] = samples_before[merged_query]
+    return right
+
+
+def _hermite_slopes(t: np.ndarray, values: np.ndarray, first: np.ndarray) -> np.ndarray:
+    """Returns slopes of the parabola through each sample and its neighbors.
+
+    Slopes at the first and last samples of each trajectory are those of the adjacent
+    segment, and zero for single samples.
+    """
+    slopes = np.zeros_like(values)
+    if len(t) < 2:
+        return slopes
+    h = np.diff(t)[:, None]
+    # Secant i joins samples i and i + 1, which may belong to different trajectories
+    secants = np.diff(values, axis=0) / h
+    last = np.append(first[1:], True)
+    only_next = first & ~last
+    only_prev = last & ~first
+    slopes[only_next] = secants[only_next[:-1]]
+    slopes[only_prev] = secants[only_prev[1:]]
+    i = np.flatnonzero(~first & ~last)
+    h0, h1 = h[i - 1], h[i]
+    slopes[i] = (h0 * secants[i] + h1 * secants[i - 1]) / (h0 + h1)
+    return slopes
+
+
+def resample_interp(
+    trj: TrajaDataFrame,
+    step_time: Union[float, int, str, pd.Timedelta],
+    method: str = "linear",
+    id_col: Optional[str] = None,
+) -> TrajaDataFrame:
+    """Returns a ``TrajaDataFrame`` interpolated at consistent `step_time` intervals.
+
+    Unlike :func:`~traja.trajectory.resample_time`, time is handled as float seconds and
+    numeric columns are interpolated directly with numpy, so long recordings and many
+    trajectories are resampled in one pass. Each trajectory is sampled from its first
+    timestamp. Rows with duplicate timestamps are dropped, keeping the first.
+
+    Args:
+        trj (:class:`~traja.frame.TrajaDataFrame`): Trajectory
+        step_time (float or str or :class:`pandas.Timedelta`): Time step, in units of a
+          numeric time column, or as a duration, eg, ``"50L"`` (50 milliseconds)
+        method (str): ``"linear"``, or ``"cubic"`` for piecewise cubic Hermite
+          interpolation with the slope of the parabola through each sample and its
+          neighbors
+        id_col (str, optional): Column identifying trajectories of a collection, each of
+          which is resampled separately
+
+    Returns:
+        trj (:class:`~traja.frame.TrajaDataFrame`): Trajectory with the id column, if
+          any, the time column, and the interpolated numeric columns
+
+    .. doctest::
+
+        >>> df = traja.TrajaDataFrame({'x':[0.,1.,3.],'y':[0.,2.,2.],'time':[0.,1.,2.]})
+        >>> traja.resample_interp(df, 0.5)
+           time    x    y
+        0   0.0  0.0  0.0
+        1   0.5  0.5  1.0
+        2   1.0  1.0  2.0
+        3   1.5  2.0  2.0
+        4   2.0  3.0  2.0
+
+    """
+    if method not in ("linear", "cubic"):
+        raise ValueError(f"method must be 'linear' or 'cubic', got {method!r}")
+    time_col = _get_time_col(trj)
+    if time_col is None:
+        raise Exception("Missing time information in trajectory.")
+    times = trj.index if time_col == "index" else trj[time_col]
+    if isinstance(step_time, (str, pd.Timedelta, timedelta)):
+        step = pd.to_timedelta(step_time).total_seconds()
+    else:
+        step = float(step_time)
+    if not step > 0:
+        raise ValueError(f"step_time must be positive, got {step_time}")
+
+    columns = [
+        col
+        for col in trj.select_dtypes(include="number").columns
+        if col not in (time_col, id_col)
+    ]
+    t = _time_seconds(trj)
+    values = trj[columns].to_numpy(dtype=float)
+    if id_col is not None:
+        codes, ids = pd.factorize(trj[id_col])
+    else:
+        codes, ids = np.zeros(len(trj), dtype=int), None
+
+    # Sort by trajectory and time, and drop duplicate timestamps
+    order = np.lexsort((t, codes))
+    order = order[(codes[order] >= 0) & ~np.isnan(t[order])]
+    codes, t, values = codes[order], t[order], values[order]
+    first = np.ones(len(t), dtype=bool)
+    first[1:] = codes[1:] != codes[:-1]
+    keep = first.copy()
+    keep[1:] |= t[1:] != t[:-1]
+    codes, t, values, first = codes[keep], t[keep], values[keep], first[keep]
+    group = np.cumsum(first) - 1
+    starts = np.flatnonzero(first)
+    ends = np.append(starts[1:], len(t))
+
+    # Uniform times of each trajectory, from its first timestamp
+    counts = np.floor((t[ends - 1] - t[starts]) / step + 1e-9).astype(int) + 1
+    query_group = np.repeat(np.arange(len(starts)), counts)
+    k = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    query_t = t[starts][query_group] + k * step
+
+    right = _interp_brackets(group, t, query_group, query_t)
+    last = ends[query_group] - 1
+    lo = np.minimum(right - 1, last)
+    hi = np.minimum(lo + 1, last)
+    h = t[hi] - t[lo]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s = np.where(hi > lo, (query_t - t[lo]) / h, 0.0)[:, None]
+    if method == "linear":
+        result = values[lo] + s * (values[hi] - values[lo])
+    else:
+        slopes = _hermite_slopes(t, values, first)
+        h = h[:, None]
+        s2, s3 = s ** 2, s ** 3
+        result = (
+            (2 * s3 - 3 * s2 + 1) * values[lo]
+            + (s3 - 2 * s2 + s) * h * slopes[lo]
+            + (3 * s2 - 2 * s3) * values[hi]
+            + (s3 - s2) * h * slopes[hi]
+        )
+
+    data = OrderedDict()
+    if id_col is not None:
+        data[id_col] = np.asarray(ids)[codes[starts]][query_group]
+    if is_datetime64_any_dtype(times) or is_timedelta64_dtype(times):
+        origin = pd.Series(times).iloc[0]
+        new_times = origin + pd.to_timedelta(query_t, unit="s")
+    else:
+        new_times = query_t
+    name = time_col if time_col != "index" else (times.name or "time")
+    data[name] = new_times
+    for i, col in enumerate(columns):
+        data[col] = result[:, i]
+    resampled = traja.TrajaDataFrame(data)
+    if time_col == "index":
+        resampled = resampled.set_index(name)
+    return resampled
+
+
 def rotate(df, angle: Union[float, int] = 0, origin: tuple = None):
     """Returns a ``TrajaDataFrame`` Rotate a trajectory `angle` in radians.
 
@@ -844,89 +1947,234 @@ def rediscretize_points(trj: TrajaDataFrame, R: Union[float, int], time_out=Fals
     return rt
 
 
-def _rediscretize_points(
-    trj: TrajaDataFrame, R: Union[float, int], time_out=False
-) -> dict:
-    """Helper function for :func:`traja.trajectory.rediscretize`.
+def simplify_indices(
+    trj: TrajaDataFrame,
+    epsilon: Optional[float] = None,
+    n_points: Optional[int] = None,
+    method: str = "rdp",
+    id_col: Optional[str] = None,
+) -> np.ndarray:
+    """Returns positional indices of the rows kept by trajectory simplification.
+
+    Shared interface of the simplification algorithms; see :func:`traja.trajectory.simplify`.
+
+    Args:
+      trj (:class:`traja.frame.TrajaDataFrame` or :class:`numpy.ndarray`): Trajectory
+        or array of xy coordinates
+      epsilon (float, optional): Tolerance. For ``"rdp"`` the maximum distance between
+        the original and the simplified path, for ``"vw"`` the minimum effective area
+        of kept points
+      n_points (int, optional): Maximum number of points kept per trajectory
+      method (str): ``"rdp"`` (Ramer-Douglas-Peucker) or ``"vw"`` (Visvalingam-Whyatt)
+      id_col (str, optional): Column identifying trajectories of a collection, each
+        of which is simplified separately
+
+    Returns:
+      indices (:class:`numpy.ndarray`): Sorted positional indices of kept rows
+
+    .. doctest::
+
+        >>> traja.simplify_indices(np.array([[0,0],[1,0.1],[2,0],[3,0]]), epsilon=0.5)
+        array([0, 3])
+
+    """
+    from traja.contrib.rdp import _rdp_segments, rdp_n_points
+
+    if epsilon is None and n_points is None:
+        raise ValueError("At least one of epsilon and n_points must be provided.")
+    if n_points is not None and n_points < 2:
+        raise ValueError(f"n_points must be at least 2, got {n_points}")
+    if method not in ("rdp", "vw"):
+        raise ValueError(f"method must be 'rdp' or 'vw', got {method!r}")
+
+    if isinstance(trj, pd.DataFrame):
+        xy = trj[["x", "y"]].to_numpy(dtype=float)
+    else:
+        xy = np.asarray(trj, dtype=float)
+    finite = np.isfinite(xy).all(axis=1)
+    if id_col is not None:
+        groups = list(trj.groupby(id_col, sort=False).indices.values())
+    else:
+        groups = [np.arange(len(xy))]
+    groups = [idx[finite[idx]] for idx in groups]
+    groups = [idx for idx in groups if len(idx)]
+
+    mask = np.zeros(len(xy), dtype=bool)
+    if not groups:
+        return np.flatnonzero(mask)
+
+    if method == "rdp" and n_points is None:
+        # Simplify all trajectories together, each as its own initial segment
+        order = np.concatenate(groups)
+        lengths = np.array([len(idx) for idx in groups])
+        ends = np.cumsum(lengths) - 1
+        starts = ends - lengths + 1
+        keep = _rdp_segments(xy[order], starts, ends, epsilon)
+        mask[order[keep]] = True
+    elif method == "rdp":
+        for idx in groups:
+            keep = rdp_n_points(
+                xy[idx], n_points, epsilon=epsilon or 0, return_mask=True
+            )
+            mask[idx[keep]] = True
+    else:
+        from traja.contrib.vw import vw_mask
+
+        for idx in groups:
+            mask[idx[vw_mask(xy[idx], epsilon=epsilon, n_points=n_points)]] = True
+    return np.flatnonzero(mask)
+
+
+def simplify(
+    trj: TrajaDataFrame,
+    epsilon: Optional[float] = None,
+    id_col: Optional[str] = None,
+    n_points: Optional[int] = None,
+    method: str = "rdp",
+) -> TrajaDataFrame:
+    """Returns a simplified ``TrajaDataFrame``.
+
+    Rows which can be dropped while keeping the path within ``epsilon`` of the original
+    are removed. Alternatively, ``n_points`` bounds the number of rows kept per
+    trajectory, eg, for rendering. All other columns (eg, time) and metadata are
+    preserved. Rows with missing coordinates are dropped.
+
+    Available methods are ``"rdp"`` (Ramer-Douglas-Peucker, default) and ``"vw"``
+    (Visvalingam-Whyatt, where ``epsilon`` is the minimum triangle area of kept points).
 
     Args:
       trj (:class:`traja.frame.TrajaDataFrame`): Trajectory
-      R (float): Rediscretized step length (eg, 0.02)
+      epsilon (float, optional): Maximum distance between the original and the simplified path
+      id_col (str, optional): Column identifying trajectories of a collection, each
+        of which is simplified separately
+      n_points (int, optional): Maximum number of points kept per trajectory
+      method (str): Simplification algorithm, ``"rdp"`` or ``"vw"``
 
     Returns:
-      output (dict): Containing:
-        result (:class:`numpy.ndarray`): Rediscretized coordinates
-        time_vals (optional, list of floats or datetimes): Time points corresponding to result
+      trj (:class:`traja.frame.TrajaDataFrame`): Simplified trajectory
+
+    .. doctest::
+
+        >>> df = traja.TrajaDataFrame({'x':[0,1,2,3],'y':[0,0.1,0,0],'time':[0.,0.2,0.4,0.6]})
+        >>> traja.simplify(df, epsilon=0.5)
+           x    y  time
+        0  0  0.0   0.0
+        3  3  0.0   0.6
 
     """
-    # TODO: Implement with complex numbers
-    points = trj[["x", "y"]].dropna().values.astype("float64")
-    n_points = len(points)
-    result = np.empty((128, 2))
-    p0 = points[0]
-    result[0] = p0
-    step_nr = 0
-    candidate_start = 1  # running index of candidate
+    indices = simplify_indices(
+        trj, epsilon=epsilon, n_points=n_points, method=method, id_col=id_col
+    )
+    return trj.iloc[indices]
 
-    time_vals = []
-    if time_out:
-        time_col = _get_time_col(trj)
-        time = trj[time_col][0]
-        time_vals.append(time)
 
-    while candidate_start <= n_points:
+def _rediscretize_kernel(
+    points: np.ndarray, R: float, arc_length: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Rediscretizes `points` to steps of length `R`, following Bovet and Benhamou (1988).
+
+    Each new point is on the first input segment ending at least `R` away from the
+    previous new point. Input points closer than `R` along the path cannot be that far,
+    so they are skipped with a binary search on the cumulative arc length, and the
+    remaining candidates are checked in vectorized blocks.
+
+    Args:
+      points (:class:`numpy.ndarray`): Coordinates with shape ``(n, 2)``, without
+        missing values
+      R (float): Step length
+      arc_length (:class:`numpy.ndarray`, optional): Cumulative path length at each of
+        `points`, to share between calls with different `R`
+
+    Returns:
+      result (:class:`numpy.ndarray`): Rediscretized coordinates
+      indices (:class:`numpy.ndarray`): Index of the input point ending the segment of
+        each new point, ``0`` for the first
+
+    """
+    n_points = len(points)
+    if arc_length is None:
+        arc_length = _arc_length(points)
+    xs, ys = points[:, 0], points[:, 1]
+    # Python floats are faster than NumPy scalars in the scalar code below
+    x_list, y_list, arc_list = xs.tolist(), ys.tolist(), arc_length.tolist()
+    # Guard against rounding where the path is straight and arc length equals
+    # distance, and against the rounding error of the cumulative sum
+    eps = np.finfo(points.dtype).eps
+    skip = R * (1 - max(1e-9, 16 * eps)) - max(1e-12, eps) * arc_list[-1]
+
+    px, py = x_list[0], y_list[0]
+    result_x, result_y, indices = [px], [py], [0]
+    position = 0.0  # arc length at the last new point
+    candidate_start = 1
+    while candidate_start < n_points:
         # Find the first point `curr_ind` for which |points[curr_ind] - p_0| >= R
-        curr_ind = np.NaN
-        for i in range(
-            candidate_start, n_points
-        ):  # range of search space for next point
-            d = np.linalg.norm(points[i] - result[step_nr])
-            if d >= R:
-                curr_ind = i  # curr_ind is in [candidate, n_points)
-                if time_out:
-                    time = trj[time_col][i]
-                    time_vals.append(time)
-                break
-        if np.isnan(curr_ind):
+        lo = max(candidate_start, bisect.bisect_left(arc_list, position + skip))
+        if lo >= n_points:
             # End of path
             break
+        if math.hypot(x_list[lo] - px, y_list[lo] - py) >= R:
+            curr_ind = lo
+        else:
+            curr_ind = None
+            lo += 1
+            block = 16
+            while lo < n_points:
+                hi = min(lo + block, n_points)
+                hits = np.flatnonzero(np.hypot(xs[lo:hi] - px, ys[lo:hi] - py) >= R)
+                if len(hits):
+                    curr_ind = lo + int(hits[0])
+                    break
+                lo = hi
+                block *= 2
+            if curr_ind is None:
+                # End of path
+                break
 
         # The next point may lie on the same segment
         candidate_start = curr_ind
 
         # The next point lies on the segment p[k-1], p[k]
-        curr_result_x = result[step_nr][0]
-        prev_x = points[curr_ind - 1, 0]
-        curr_result_y = result[step_nr][1]
-        prev_y = points[curr_ind - 1, 1]
-
-        # a = 1 if points[k, 0] <= xk_1 else 0
-        lambda_ = np.arctan2(
-            points[curr_ind, 1] - prev_y, points[curr_ind, 0] - prev_x
-        )  # angle
-        cos_l = np.cos(lambda_)
-        sin_l = np.sin(lambda_)
-        U = (curr_result_x - prev_x) * cos_l + (curr_result_y - prev_y) * sin_l
-        V = (curr_result_y - prev_y) * cos_l - (curr_result_x - prev_x) * sin_l
+        prev_x, prev_y = x_list[curr_ind - 1], y_list[curr_ind - 1]
+        dx, dy = x_list[curr_ind] - prev_x, y_list[curr_ind] - prev_y
+        segment_length = math.hypot(dx, dy)
+        cos_l, sin_l = dx / segment_length, dy / segment_length
+        U = (px - prev_x) * cos_l + (py - prev_y) * sin_l
+        V = (py - prev_y) * cos_l - (px - prev_x) * sin_l
 
         # Compute distance H between (X_{i+1}, Y_{i+1}) and (x_{k-1}, y_{k-1})
-        H = U + np.sqrt(abs(R ** 2 - V ** 2))
-        XIp1 = H * cos_l + prev_x
-        YIp1 = H * sin_l + prev_y
+        H = U + math.sqrt(abs(R ** 2 - V ** 2))
+        px, py = H * cos_l + prev_x, H * sin_l + prev_y
+        position = arc_list[curr_ind - 1] + H
+        result_x.append(px)
+        result_y.append(py)
+        indices.append(curr_ind)
 
-        # Increase array size progressively to make the code run (significantly) faster
-        if len(result) <= step_nr + 1:
-            result = np.concatenate((result, np.empty_like(result)))
+    result = np.column_stack([result_x, result_y]).astype(points.dtype, copy=False)
+    return result, np.array(indices)
+
+
+def _rediscretize_points(
+    trj: TrajaDataFrame, R: Union[float, int], time_out=False
+) -> dict:
+    """Helper function for :func:`traja.trajectory.rediscretize`.
 
-        # Save the point
-        result[step_nr + 1] = np.array([XIp1, YIp1])
-        step_nr += 1
+    Args:
+      trj (:class:`traja.frame.TrajaDataFrame`): Trajectory
+      R (float): Rediscretized step length (eg, 0.02)
 
-    # Truncate result
-    result = result[: step_nr + 1]
+    Returns:
+      output (dict): Containing:
+        result (:class:`numpy.ndarray`): Rediscretized coordinates
+        time_vals (optional, list of floats or datetimes): Time points corresponding to result
+
+    """
+    points = trj[["x", "y"]].dropna().to_numpy(dtype=_float_dtype())
+    result, indices = _rediscretize_kernel(points, R)
     output = {"rt": result}
     if time_out:
-        output["time"] = time_vals
+        time_col = _get_time_col(trj)
+        time = trj[time_col]
+        output["time"] = [time[i] for i in indices]
     return output
 
 
@@ -1007,6 +2255,9 @@ def calc_displacement(trj: TrajaDataFrame, lag=1):
     displacement = np.sqrt(
         np.power(trj.x.shift(lag) - trj.x, 2) + np.power(trj.y.shift(lag) - trj.y, 2)
     )
+    dtype = get_dtype()
+    if dtype is not None:
+        displacement = displacement.astype(dtype, copy=False)
     displacement.name = "displacement"
     return displacement
 
@@ -1053,6 +2304,11 @@ def calc_derivatives(trj: TrajaDataFrame):
                 f"Format (example {trj[time_col][0]}) not recognized as datetime"
             )
 
+    # Time is accumulated in float64 before any downcasting
+    dtype = get_dtype()
+    if dtype is not None:
+        displacement_time = displacement_time.astype(dtype, copy=False)
+
     # TODO: Create DataFrame directly
     derivs = pd.DataFrame(
         OrderedDict(displacement=displacement, displacement_time=displacement_time)
@@ -1099,16 +2355,115 @@ def calc_heading(trj: TrajaDataFrame):
     return trj.heading
 
 
+def _group_speeds(trj: TrajaDataFrame, id_col: Optional[str] = None):
+    """Returns speed of each row of each trajectory, ordered by trajectory.
+
+    Returns:
+      speed (:class:`numpy.ndarray`): Speed, ``NaN`` for the first row of trajectories
+      times (:class:`numpy.ndarray`): Seconds since the start of the trajectory
+      offsets (:class:`numpy.ndarray`): First row of each trajectory
+      ids (:class:`numpy.ndarray` or None): Id of each trajectory
+
+    """
+    time_col = _get_time_col(trj)
+    if time_col is None:
+        raise Exception("Missing time information in trajectory.")
+    xy = trj[["x", "y"]].to_numpy(dtype=float)
+    t = _time_seconds(trj)
+    if id_col is not None:
+        codes, ids = pd.factorize(trj[id_col], sort=False)
+        # Order rows by trajectory, keeping the order within each trajectory
+        order = np.argsort(codes, kind="stable")
+        order = order[codes[order] >= 0]
+        xy, t, codes = xy[order], t[order], codes[order]
+        present = np.flatnonzero(np.bincount(codes, minlength=len(ids)))
+        offsets = np.searchsorted(codes, present)
+        ids = np.asarray(ids)[present]
+    else:
+        offsets = np.array([0]) if len(xy) else np.array([], dtype=int)
+        ids = None
+
+    first = np.zeros(len(xy), dtype=bool)
+    first[offsets] = True
+    group = np.cumsum(first) - 1
+    times = t - t[offsets][group]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        speed = np.empty(len(xy))
+        speed[1:] = np.hypot(*np.diff(xy, axis=0).T) / np.diff(times)
+    speed[first] = np.nan
+    return speed, times, offsets, ids
+
+
+def _first_per_group(positions, groups, n_groups, last=False):
+    """Returns first (or last) of sorted `positions` of each group, ``-1`` if none."""
+    result = np.full(n_groups, -1)
+    if last:
+        positions, groups = positions[::-1], groups[::-1]
+    unique, index = np.unique(groups, return_index=True)
+    result[unique] = positions[index]
+    return result
+
+
+def _speed_intervals(speed, offsets, faster_than, slower_than):
+    """Returns start and stop rows of intervals of `speed` within the thresholds."""
+    n = len(speed)
+    flags = np.ones(n, dtype=bool)
+    if faster_than is not None:
+        flags &= speed > faster_than
+    if slower_than is not None:
+        flags &= speed < slower_than
+
+    # Transitions between rows i and i + 1 of the same trajectory
+    ends = np.append(offsets[1:], n) - 1
+    same = np.ones(max(n - 1, 0), dtype=bool)
+    same[ends[ends < n - 1]] = False
+    changes = np.diff(flags.astype(np.int8))
+    stops = np.flatnonzero((changes == -1) & same)
+    starts = np.flatnonzero((changes == 1) & same)
+
+    first = np.zeros(n, dtype=bool)
+    first[offsets] = True
+    group = np.cumsum(first) - 1
+    n_groups = len(offsets)
+    first_start = _first_per_group(starts, group[starts], n_groups)
+    last_start = _first_per_group(starts, group[starts], n_groups, last=True)
+    first_stop = _first_per_group(stops, group[stops], n_groups)
+    last_stop = _first_per_group(stops, group[stops], n_groups, last=True)
+    has_start, has_stop = first_start >= 0, first_stop >= 0
+
+    # Handle situation where interval begins or ends outside of trajectory
+    # Assume interval started at beginning of trajectory, since we don't know what
+    # happened before that
+    prepend = has_stop & (~has_start | (first_stop < first_start))
+    last_start = np.where(prepend & ~has_start, offsets + 1, last_start)
+    # Similarly, assume that interval can't extend past end of trajectory
+    append = (has_start | has_stop) & (~has_stop | (last_start > last_stop))
+    starts = np.sort(np.concatenate([starts, offsets[prepend] + 1]))
+    stops = np.sort(np.concatenate([stops, ends[append]]))
+    return starts, stops, group
+
+
 def speed_intervals(
-    trj: TrajaDataFrame, faster_than: float = None, slower_than: float = None
+    trj: TrajaDataFrame,
+    faster_than: Union[float, np.ndarray] = None,
+    slower_than: Union[float, np.ndarray] = None,
+    id_col: Optional[str] = None,
 ) -> pd.DataFrame:
     """Calculate speed time intervals.
 
     Returns a dictionary of time intervals where speed is slower and/or faster than specified values.
 
+    Speeds are calculated once, so many thresholds can be passed as arrays at once. Arrays
+    of `faster_than` and `slower_than` are paired elementwise, and the result then
+    includes the thresholds of each interval as ``faster_than`` and ``slower_than``
+    columns.
+
     Args:
-      faster_than (float, optional): Minimum speed threshold. (Default value = None)
-      slower_than (float or int, optional): Maximum speed threshold. (Default value = None)
+      faster_than (float or array-like, optional): Minimum speed threshold. (Default value = None)
+      slower_than (float or array-like, optional): Maximum speed threshold. (Default value = None)
+      id_col (str, optional): Column identifying trajectories of a collection, each of
+        which is processed separately. Frames then count from the start of each
+        trajectory
 
     Returns:
       result (:class:`~pd.DataFrame`) -- time intervals as dataframe
@@ -1130,64 +2485,55 @@ def speed_intervals(
         4           17        0.34          18       0.36      0.02
 
     """
-    derivs = get_derivatives(trj)
-
     if faster_than is None and slower_than is None:
         raise Exception(
             "Parameters faster_than and slower_than are both None, at least one must be provided."
         )
-
-    # Calculate trajectory speeds
-    speed = derivs["speed"].values
-    times = derivs["speed_times"].values
-    times[0] = 0.0
-    flags = np.full(len(speed), 1)
-
-    if faster_than is not None:
-        flags = flags & (speed > faster_than)
-    if slower_than is not None:
-        flags = flags & (speed < slower_than)
-
-    changes = np.diff(flags)
-    stop_frames = np.where(changes == -1)[0]
-    start_frames = np.where(changes == 1)[0]
-
-    # Handle situation where interval begins or ends outside of trajectory
-    if len(start_frames) > 0 or len(stop_frames) > 0:
-        # Assume interval started at beginning of trajectory, since we don't know what happened before that
-        if len(stop_frames) > 0 and (
-            len(start_frames) == 0 or stop_frames[0] < start_frames[0]
-        ):
-            start_frames = np.append(1, start_frames)
-        # Similarly, assume that interval can't extend past end of trajectory
-        if (
-            len(stop_frames) == 0
-            or start_frames[len(start_frames) - 1] > stop_frames[len(stop_frames) - 1]
-        ):
-            stop_frames = np.append(stop_frames, len(speed) - 1)
-
-    stop_times = times[stop_frames]
-    start_times = times[start_frames]
-
-    durations = stop_times - start_times
-    result = traja.TrajaDataFrame(
-        OrderedDict(
-            start_frame=start_frames,
-            start_time=start_times,
-            stop_frame=stop_frames,
-            stop_time=stop_times,
-            duration=durations,
-        )
+    multiple = np.ndim(faster_than) > 0 or np.ndim(slower_than) > 0
+    thresholds = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(faster_than, dtype=float)),
+        np.atleast_1d(np.asarray(slower_than, dtype=float)),
     )
-    return result
 
-
-def get_derivatives(trj: TrajaDataFrame):
+    speed, times, offsets, ids = _group_speeds(trj, id_col)
+    results = []
+    for faster, slower in zip(*thresholds):
+        starts, stops, group = _speed_intervals(
+            speed,
+            offsets,
+            None if faster_than is None else faster,
+            None if slower_than is None else slower,
+        )
+        columns = OrderedDict()
+        if id_col is not None:
+            columns[id_col] = ids[group[starts]]
+        if multiple:
+            columns["faster_than"] = np.full(len(starts), faster)
+            columns["slower_than"] = np.full(len(starts), slower)
+        # Times are relative to the start of each trajectory, with the first at zero
+        columns["start_frame"] = starts - offsets[group[starts]]
+        columns["start_time"] = times[starts]
+        columns["stop_frame"] = stops - offsets[group[stops]]
+        columns["stop_time"] = times[stops]
+        columns["duration"] = times[stops] - times[starts]
+        results.append(pd.DataFrame(columns))
+    result = pd.concat(results, ignore_index=True)
+    return traja.TrajaDataFrame(result)
+
+
+def get_derivatives(trj: TrajaDataFrame, dtype=None):
     """Returns derivatives ``displacement``, ``displacement_time``, ``speed``, ``speed_times``, ``acceleration``,
     ``acceleration_times`` as dictionary.
 
+    Derivatives are calculated in place in a single preallocated block, so memory use
+    is about one copy of the output. Infinite values, eg, from repeated timestamps, are
+    replaced by ``NaN``.
+
     Args:
         trj (:class:`~traja.frame.TrajaDataFrame`): Trajectory
+        dtype (optional): Floating point type of the output, eg, ``np.float32`` to
+          halve memory use. Time is accumulated and differenced in float64 regardless.
+          (Default value = :func:`traja.get_dtype`, else ``np.float64``)
 
     Returns:
       derivs (:class:`~pd.DataFrame`) : Derivatives
@@ -1202,31 +2548,72 @@ def get_derivatives(trj: TrajaDataFrame):
         2      1.414214                0.4  7.071068          0.4           0.0                 0.4
 
     """
-    if not _has_cols(trj, ["displacement", "displacement_time"]):
-        derivs = calc_derivatives(trj)
-        d = derivs["displacement"]
-        t = derivs["displacement_time"]
-    else:
-        d = trj.displacement
-        t = trj.displacement_time
-        derivs = OrderedDict(displacement=d, displacement_time=t)
-    if is_datetime_or_timedelta_dtype(t):
-        # Convert to float divisible series
-        # TODO: Add support for other time units
-        t = t.dt.total_seconds()
-    v = d[1 : len(d)] / t.diff()
-    v.rename("speed")
-    vt = t[1 : len(t)].rename("speed_times")
-    # Calculate linear acceleration
-    a = v.diff() / vt.diff().rename("acceleration")
-    at = vt[1 : len(vt)].rename("accleration_times")
-
-    data = dict(speed=v, speed_times=vt, acceleration=a, acceleration_times=at)
-    derivs = derivs.merge(pd.DataFrame(data), left_index=True, right_index=True)
+    dtype = _float_dtype(dtype)
+    n = len(trj)
+    # Columns are contiguous, and are used as scratch space before being filled
+    out = np.empty((n, 6), dtype=dtype, order="F")
+    d, t, v, vt, a, at = out.T
+    # Cumulative time and time steps, in float64 to keep resolution of long recordings
+    t64, dt64 = (t, vt) if dtype == np.float64 else (np.empty(n), np.empty(n))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if "displacement" in trj:
+            d[:] = trj.displacement.to_numpy(dtype=dtype)
+        elif n:
+            x = trj.x.to_numpy(dtype=float)
+            y = trj.y.to_numpy(dtype=float)
+            np.subtract(x[1:], x[:-1], out=v[1:])
+            np.subtract(y[1:], y[:-1], out=a[1:])
+            np.hypot(v[1:], a[1:], out=d[1:])
+            d[0] = np.nan
+
+        if "displacement_time" in trj:
+            displacement_time = trj.displacement_time
+            if is_datetime_or_timedelta_dtype(displacement_time):
+                # Convert to float divisible series
+                displacement_time = displacement_time.dt.total_seconds()
+            t64[:] = displacement_time.to_numpy(dtype=float)
+        else:
+            seconds = _time_seconds(trj)
+            if seconds is None:
+                raise Exception("Missing time information in trajectory.")
+            if n:
+                # Cumulative seconds, skipping missing timestamps
+                np.subtract(seconds[1:], seconds[:-1], out=dt64[1:])
+                dt64[1:][np.isnan(dt64[1:])] = 0
+                t64[0] = 0
+                np.cumsum(dt64[1:], out=t64[1:])
+
+        if n:
+            np.subtract(t64[1:], t64[:-1], out=dt64[1:])
+            np.divide(d[1:], dt64[1:], out=v[1:])
+            v[0] = np.nan
+            # Calculate linear acceleration
+            np.subtract(v[1:], v[:-1], out=a[1:])
+            np.divide(a[1:], dt64[1:], out=a[1:])
+            a[0] = np.nan
+            if t is not t64:
+                t[:] = t64
+            vt[:] = t
+            vt[0] = np.nan
+            at[:] = t
+            at[:2] = np.nan
 
     # Replace infinite values
-    derivs.replace([np.inf, -np.inf], np.nan)
-    return derivs
+    for column in out.T:
+        column[np.isinf(column)] = np.nan
+    return pd.DataFrame(
+        out,
+        index=trj.index,
+        columns=[
+            "displacement",
+            "displacement_time",
+            "speed",
+            "speed_times",
+            "acceleration",
+            "acceleration_times",
+        ],
+        copy=False,
+    )
 
 
 def _get_xylim(trj: TrajaDataFrame) -> Tuple[Tuple, Tuple]:
@@ -1298,9 +2685,246 @@ def from_xy(xy: np.ndarray):
     return df
 
 
-def fill_in_traj(trj: TrajaDataFrame):
-    # FIXME: Implement
-    return trj
+def _gap_limit(max_gap) -> Tuple[Optional[int], Optional[float]]:
+    """Returns maximum gap as number of rows, or as seconds."""
+    if max_gap is None:
+        return None, None
+    if isinstance(max_gap, (str, pd.Timedelta, timedelta)):
+        return None, pd.to_timedelta(max_gap).total_seconds()
+    return int(max_gap), None
+
+
+def _find_gaps(trj: TrajaDataFrame, id_col: Optional[str] = None) -> dict:
+    """Helper function for :func:`traja.trajectory.find_gaps`.
+
+    Rows are ordered by trajectory and time, and gaps are described by ordered rows.
+
+    Returns:
+      gaps (dict): Containing:
+        order (:class:`numpy.ndarray`): Rows of `trj` ordered by trajectory and time
+        t (:class:`numpy.ndarray`): Time in seconds of ordered rows, or their position
+          if `trj` has no time
+        codes (:class:`numpy.ndarray`): Trajectory of ordered rows
+        ids (:class:`numpy.ndarray` or None): Id of each trajectory code
+        xy (:class:`numpy.ndarray`): Coordinates of ordered rows
+        starts, stops (:class:`numpy.ndarray`): First and last missing row of each gap
+        before, after (:class:`numpy.ndarray`): Row before and after each gap, ``-1``
+          at the start or end of a trajectory
+        duration (:class:`numpy.ndarray`): Time from the row before to the row after
+          each gap, or to its first or last missing row at the start or end of a
+          trajectory
+
+    """
+    n = len(trj)
+    if id_col is not None:
+        codes, ids = pd.factorize(trj[id_col])
+        ids = np.asarray(ids)
+    else:
+        codes, ids = np.zeros(n, dtype=int), None
+    t = _time_seconds(trj)
+    if t is None:
+        t = np.arange(n, dtype=float)
+    order = np.lexsort((t, codes))
+    order = order[codes[order] >= 0]
+    codes, t = codes[order], t[order]
+    xy = trj[["x", "y"]].to_numpy(dtype=float)[order]
+    missing = np.isnan(xy).any(axis=1)
+
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = codes[1:] != codes[:-1]
+    last = np.append(first[1:], True)
+    # Runs of missing rows, restarting at each trajectory
+    starts = np.flatnonzero(missing & (first | ~np.roll(missing, 1)))
+    stops = np.flatnonzero(missing & (last | ~np.roll(missing, -1)))
+    before = np.where(first[starts], -1, starts - 1)
+    after = np.where(last[stops], -1, stops + 1)
+    duration = (
+        t[np.where(after >= 0, after, stops)] - t[np.where(before >= 0, before, starts)]
+    )
+    return dict(
+        order=order,
+        t=t,
+        codes=codes,
+        ids=ids,
+        xy=xy,
+        starts=starts,
+        stops=stops,
+        before=before,
+        after=after,
+        duration=duration,
+    )
+
+
+def _gap_table(
+    trj: TrajaDataFrame, gaps: dict, fillable: np.ndarray, id_col: Optional[str] = None
+) -> pd.DataFrame:
+    """Returns table of `gaps` found by :func:`_find_gaps`."""
+    order, starts, stops = gaps["order"], gaps["starts"], gaps["stops"]
+    table = OrderedDict()
+    if id_col is not None:
+        table[id_col] = gaps["ids"][gaps["codes"][starts]]
+    table["start"] = trj.index[order[starts]]
+    table["stop"] = trj.index[order[stops]]
+    table["length"] = stops - starts + 1
+    if _get_time_col(trj) is not None:
+        table["duration"] = gaps["duration"]
+    else:
+        table["duration"] = np.nan
+    table["fillable"] = fillable
+    return pd.DataFrame(table)
+
+
+def _within_max_gap(trj: TrajaDataFrame, gaps: dict, max_gap) -> np.ndarray:
+    """Returns whether each of `gaps` is no longer than `max_gap`."""
+    max_rows, max_seconds = _gap_limit(max_gap)
+    within = np.ones(len(gaps["starts"]), dtype=bool)
+    if max_rows is not None:
+        within &= gaps["stops"] - gaps["starts"] + 1 <= max_rows
+    if max_seconds is not None:
+        if _get_time_col(trj) is None:
+            raise Exception("Missing time information in trajectory.")
+        within &= gaps["duration"] <= max_seconds
+    return within
+
+
+def find_gaps(
+    trj: TrajaDataFrame, id_col: Optional[str] = None, max_gap=None
+) -> pd.DataFrame:
+    """Returns table of gaps, runs of rows with missing ``x`` or ``y``, eg, from tracker dropouts.
+
+    Args:
+      trj (:class:`~traja.frame.TrajaDataFrame`): Trajectory
+      id_col (str, optional): Column identifying trajectories of a collection, so gaps
+        do not extend across trajectories
+      max_gap (int or str, optional): Longest gap to mark as fillable, as number of
+        rows or as duration, eg, ``"1s"``
+
+    Returns:
+      gaps (:class:`~pandas.DataFrame`): One row per gap with columns ``start`` and
+        ``stop``, the index of the first and last missing rows, ``length`` in rows,
+        ``duration`` in seconds from the valid row before the gap to the valid row
+        after it (or to its first or last missing row at the start or end of a
+        trajectory), and ``fillable``, whether the gap is between valid rows and within
+        `max_gap`, so can be interpolated
+
+    .. doctest::
+
+        >>> df = traja.TrajaDataFrame({'x':[0,np.nan,np.nan,3,4],'y':[0,1,2,3,np.nan],'time':[0.,1.,2.,3.,4.]})
+        >>> traja.find_gaps(df)
+           start  stop  length  duration  fillable
+        0      1     2       2       3.0      True
+        1      4     4       1       1.0     False
+
+    """
+    gaps = _find_gaps(trj, id_col)
+    fillable = (gaps["before"] >= 0) & (gaps["after"] >= 0)
+    fillable &= _within_max_gap(trj, gaps, max_gap)
+    return _gap_table(trj, gaps, fillable, id_col)
+
+
+def fill_in_traj(
+    trj: TrajaDataFrame,
+    method: str = "linear",
+    max_gap=None,
+    id_col: Optional[str] = None,
+    return_gaps: bool = False,
+):
+    """Returns trajectory with gaps of missing ``x`` and ``y`` filled in.
+
+    Gaps, as found by :func:`~traja.trajectory.find_gaps`, are filled in one pass over
+    all gaps and trajectories. Rows are interpolated in time, or by position if the
+    trajectory has no time. Gaps at the start of trajectories are not filled.
+
+    Args:
+      trj (:class:`~traja.frame.TrajaDataFrame`): Trajectory
+      method (str): ``"linear"``, ``"cubic"`` for cubic Hermite interpolation with the
+        slopes of the parabolas through the valid rows around the gap and their
+        neighbors, or ``"constant_velocity"`` to continue with the velocity of the last
+        step before the gap, which also fills gaps at the end of trajectories
+      max_gap (int or str, optional): Longest gap to fill, as number of rows or as
+        duration, eg, ``"1s"``. Longer gaps stay missing
+      id_col (str, optional): Column identifying trajectories of a collection, so gaps
+        are filled from rows of the same trajectory only
+      return_gaps (bool): Also return the table of gaps, with column ``filled``
+
+    Returns:
+      trj (:class:`~traja.frame.TrajaDataFrame`): Trajectory
+      gaps (:class:`~pandas.DataFrame`, optional): Table of gaps
+
+    .. doctest::
+
+        >>> df = traja.TrajaDataFrame({'x':[0,np.nan,np.nan,3,4],'y':[0,1,2,3,np.nan],'time':[0.,1.,2.,3.,4.]})
+        >>> traja.fill_in_traj(df)
+             x    y  time
+        0  0.0  0.0   0.0
+        1  1.0  1.0   1.0
+        2  2.0  2.0   2.0
+        3  3.0  3.0   3.0
+        4  4.0  NaN   4.0
+
+    """
+    if method not in ("linear", "cubic", "constant_velocity"):
+        raise ValueError(
+            f"method must be 'linear', 'cubic' or 'constant_velocity', got {method!r}"
+        )
+    gaps = _find_gaps(trj, id_col)
+    t, codes, xy = gaps["t"], gaps["codes"], gaps["xy"]
+    starts, before, after = gaps["starts"], gaps["before"], gaps["after"]
+    valid = ~np.isnan(xy).any(axis=1)
+    within = _within_max_gap(trj, gaps, max_gap)
+    fillable = (before >= 0) & (after >= 0) & within
+    if method == "constant_velocity":
+        # Needs a valid step before the gap, within the same trajectory
+        prev = np.maximum(before - 1, 0)
+        fill = (before >= 1) & valid[prev] & (codes[prev] == codes[starts]) & within
+    else:
+        fill = fillable
+
+    # Missing rows of the gaps to fill
+    lengths = (gaps["stops"] - starts + 1)[fill]
+    gap = np.repeat(np.flatnonzero(fill), lengths)
+    rows = (
+        starts[gap]
+        + np.arange(lengths.sum())
+        - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    )
+    lo = before[gap]
+    if method == "constant_velocity":
+        prev = lo - 1
+        with np.errstate(divide="ignore", invalid="ignore"):
+            velocity = (xy[lo] - xy[prev]) / (t[lo] - t[prev])[:, None]
+        filled = xy[lo] + velocity * (t[rows] - t[lo])[:, None]
+    else:
+        hi = after[gap]
+        h = (t[hi] - t[lo])[:, None]
+        s = (t[rows] - t[lo])[:, None] / h
+        if method == "linear":
+            filled = xy[lo] + s * (xy[hi] - xy[lo])
+        else:
+            valid_codes = codes[valid]
+            valid_first = np.ones(len(valid_codes), dtype=bool)
+            valid_first[1:] = valid_codes[1:] != valid_codes[:-1]
+            slopes = np.zeros_like(xy)
+            slopes[valid] = _hermite_slopes(t[valid], xy[valid], valid_first)
+            s2, s3 = s ** 2, s ** 3
+            filled = (
+                (2 * s3 - 3 * s2 + 1) * xy[lo]
+                + (s3 - 2 * s2 + s) * h * slopes[lo]
+                + (3 * s2 - 2 * s3) * xy[hi]
+                + (s3 - s2) * h * slopes[hi]
+            )
+
+    # Keep coordinates which are only missing in the other axis
+    filled = np.where(np.isnan(xy[rows]), filled, xy[rows])
+
+    filled_trj = trj.copy()
+    columns = [trj.columns.get_loc("x"), trj.columns.get_loc("y")]
+    filled_trj.iloc[gaps["order"][rows], columns] = filled
+    if return_gaps:
+        table = _gap_table(trj, gaps, fillable, id_col)
+        table["filled"] = fill
+        return filled_trj, table
+    return filled_trj
 
 
 def _get_time_col(trj: TrajaDataFrame):